@@ -0,0 +1,114 @@
+import base64
+import json
+import logging
+import threading
+import time
+from typing import Dict, MutableMapping
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
+
+logger = logging.getLogger(__name__)
+
+# One pool per client, shared by every thread and rerun in the process
+CLIENT_CONFIG = Config(
+    max_pool_connections=50,
+    retries={'max_attempts': 5, 'mode': 'adaptive'},
+    connect_timeout=5,
+    read_timeout=60,
+    tcp_keepalive=True,
+)
+REFRESH_LEEWAY = 300   # seconds before expiry at which tokens are renewed
+
+_lock = threading.Lock()
+_sessions = {}
+_clients = {}
+
+
+def get_session(region: str, access_key: str = None, secret_key: str = None) -> boto3.session.Session:
+    """The process-wide session for these credentials (boto3 sessions must not be shared while being built)."""
+    key = (region, access_key, secret_key)
+    with _lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = _sessions[key] = boto3.session.Session(
+                aws_access_key_id=access_key, aws_secret_access_key=secret_key, region_name=region)
+        return session
+
+
+def get_client(service: str, region: str, access_key: str = None, secret_key: str = None):
+    """A cached client per service and credentials; clients themselves are thread-safe."""
+    key = (service, region, access_key, secret_key)
+    with _lock:
+        client = _clients.get(key)
+    if client is not None:
+        return client
+    session = get_session(region, access_key, secret_key)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            # Client creation loads service models; do it once, never per rerun
+            client = _clients[key] = session.client(service, config=CLIENT_CONFIG)
+        return client
+
+
+def decode_jwt_claims(token: str) -> Dict:
+    """Claims of a JWT without verifying its signature.
+
+    Only for tokens received directly from Cognito over TLS (initiate_auth responses);
+    anything presented by a client must be verified against the pool's JWKS instead.
+    """
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        return json.loads(base64.urlsafe_b64decode(payload))
+    except (IndexError, ValueError) as e:
+        raise ValueError(f"Malformed JWT: {e}") from e
+
+
+def token_expiry(tokens: Dict) -> float:
+    """Epoch seconds at which the access token expires."""
+    return float(decode_jwt_claims(tokens['AccessToken'])['exp'])
+
+
+def needs_refresh(tokens: Dict, leeway: float = REFRESH_LEEWAY, now: float = None) -> bool:
+    return token_expiry(tokens) - (now if now is not None else time.time()) <= leeway
+
+
+def refresh_tokens(cognito, client_id: str, tokens: Dict) -> Dict:
+    """New access and ID tokens from the refresh token (REFRESH_TOKEN_AUTH keeps the old refresh token)."""
+    response = cognito.initiate_auth(
+        ClientId=client_id,
+        AuthFlow='REFRESH_TOKEN_AUTH',
+        AuthParameters={'REFRESH_TOKEN': tokens['RefreshToken']},
+    )
+    refreshed = dict(tokens)
+    refreshed.update(response['AuthenticationResult'])
+    return refreshed
+
+
+def ensure_fresh_tokens(state: MutableMapping, cognito, client_id: str) -> bool:
+    """Renew the signed-in user's tokens shortly before they expire.
+
+    `state` is the session state holding 'tokens'. Returns False when the session
+    can no longer be renewed (refresh token expired or revoked, or Cognito is
+    unreachable once the access token has expired) and the user must sign in again.
+    """
+    tokens = state.get('tokens')
+    if not tokens:
+        return False
+    if not needs_refresh(tokens):
+        return True
+    try:
+        state['tokens'] = refresh_tokens(cognito, client_id, tokens)
+    except ClientError as e:
+        logger.info("Token refresh failed: %s", e.response['Error']['Message'])
+        return False
+    except BotoCoreError as e:
+        # Endpoint or connection errors: keep a still-valid token and retry on the next rerun
+        logger.warning("Token refresh could not reach Cognito: %s", e)
+        return token_expiry(tokens) > time.time()
+    state['claims'] = decode_jwt_claims(state['tokens']['IdToken'])
+    return True
+
@@ -0,0 +1,177 @@
+import hashlib
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_FIELDS = ['challenge', 'starter_code', 'test_cases', 'hints', 'constraints', 'examples']
+LIST_FIELDS = ['test_cases', 'hints', 'constraints', 'examples']
+
+
+def validate_challenge(challenge: Dict) -> Dict:
+    """Raise ValueError when a generated challenge is missing anything the page needs."""
+    if not isinstance(challenge, dict):
+        raise ValueError("Challenge must be a JSON object")
+
+    missing_fields = [field for field in REQUIRED_FIELDS if field not in challenge]
+    if missing_fields:
+        raise ValueError(f"Missing required fields: {', '.join(missing_fields)}")
+
+    for field in LIST_FIELDS:
+        if not isinstance(challenge[field], list) or not challenge[field]:
+            raise ValueError(f"Field '{field}' must be a non-empty list")
+
+    for test_case in challenge['test_cases']:
+        if not isinstance(test_case, dict) or not all(k in test_case for k in ['input', 'expected', 'explanation']):
+            raise ValueError("Invalid test case format")
+    return challenge
+
+
+def normalize_topic(topic: str) -> str:
+    return ' '.join(topic.lower().split())
+
+
+class ChallengePool:
+    """Validated challenges stored per (topic, difficulty) bucket, with per-user serve tracking"""
+
+    def __init__(self, db_path='challenge_pool.db'):
+        self.db_path = db_path
+        self._init_db()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def _init_db(self):
+        conn = self._connect()
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''CREATE TABLE IF NOT EXISTS challenges (
+                                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                                topic TEXT NOT NULL,
+                                difficulty TEXT NOT NULL,
+                                content_hash TEXT NOT NULL UNIQUE,
+                                payload TEXT NOT NULL,
+                                created_at TEXT NOT NULL)''')
+            conn.execute('''CREATE INDEX IF NOT EXISTS idx_challenges_bucket
+                            ON challenges (topic, difficulty)''')
+            conn.execute('''CREATE TABLE IF NOT EXISTS served_challenges (
+                                user_id TEXT NOT NULL,
+                                challenge_id INTEGER NOT NULL,
+                                served_at TEXT NOT NULL,
+                                PRIMARY KEY (user_id, challenge_id))''')
+            conn.commit()
+        finally:
+            conn.close()
+
+    def add(self, topic: str, difficulty: str, challenge: Dict) -> Optional[int]:
+        """Store a validated challenge; returns its id, or None if an identical one exists."""
+        validate_challenge(challenge)
+        payload = json.dumps(challenge, sort_keys=True)
+        content_hash = hashlib.sha256(payload.encode()).hexdigest()
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                '''INSERT OR IGNORE INTO challenges (topic, difficulty, content_hash, payload, created_at)
+                   VALUES (?, ?, ?, ?, ?)''',
+                (normalize_topic(topic), difficulty, content_hash, payload, datetime.now().isoformat()))
+            conn.commit()
+            return cursor.lastrowid if cursor.rowcount else None
+        finally:
+            conn.close()
+
+    def take(self, user_id: str, topic: str, difficulty: str) -> Optional[Dict]:
+        """Serve a random challenge from the bucket that this user has not seen yet."""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                '''SELECT c.id, c.payload FROM challenges c
+                   WHERE c.topic = ? AND c.difficulty = ?
+                     AND NOT EXISTS (SELECT 1 FROM served_challenges s
+                                     WHERE s.user_id = ? AND s.challenge_id = c.id)
+                   ORDER BY RANDOM() LIMIT 1''',
+                (normalize_topic(topic), difficulty, user_id)).fetchone()
+            if row is None:
+                return None
+            self._mark_served(conn, user_id, row[0])
+            return json.loads(row[1])
+        finally:
+            conn.close()
+
+    def mark_served(self, user_id: str, challenge_id: int) -> None:
+        conn = self._connect()
+        try:
+            self._mark_served(conn, user_id, challenge_id)
+        finally:
+            conn.close()
+
+    def _mark_served(self, conn, user_id: str, challenge_id: int) -> None:
+        conn.execute('''INSERT OR IGNORE INTO served_challenges (user_id, challenge_id, served_at)
+                        VALUES (?, ?, ?)''', (user_id, challenge_id, datetime.now().isoformat()))
+        conn.commit()
+
+    def unseen_stock(self, user_id: str, topic: str, difficulty: str) -> int:
+        conn = self._connect()
+        try:
+            return conn.execute(
+                '''SELECT COUNT(*) FROM challenges c
+                   WHERE c.topic = ? AND c.difficulty = ?
+                     AND NOT EXISTS (SELECT 1 FROM served_challenges s
+                                     WHERE s.user_id = ? AND s.challenge_id = c.id)''',
+                (normalize_topic(topic), difficulty, user_id)).fetchone()[0]
+        finally:
+            conn.close()
+
+
+class ChallengeRefiller:
+    """Background workers that keep a minimum unseen stock in every watched bucket"""
+
+    def __init__(self, pool: ChallengePool, min_stock: int = 3, workers: int = 2,
+                 max_attempts: int = 6, retry_delay: float = 2.0):
+        self.pool = pool
+        self.min_stock = min_stock
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._queue = queue.Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+        for i in range(workers):
+            threading.Thread(target=self._worker, name=f'challenge-refill-{i}', daemon=True).start()
+
+    def watch(self, user_id: str, topic: str, difficulty: str,
+              generate: Callable[[str, str], Dict]) -> None:
+        """Queue a refill for the bucket if this user is running low; cheap to call every time."""
+        bucket = (user_id, normalize_topic(topic), difficulty)
+        with self._lock:
+            if bucket in self._pending:
+                return
+            self._pending.add(bucket)
+        self._queue.put((bucket, topic, generate))
+
+    def _worker(self) -> None:
+        while True:
+            bucket, topic, generate = self._queue.get()
+            user_id, _, difficulty = bucket
+            try:
+                self._refill(user_id, topic, difficulty, generate)
+            except Exception:
+                logger.exception("Challenge refill failed for %s/%s", topic, difficulty)
+            finally:
+                with self._lock:
+                    self._pending.discard(bucket)
+
+    def _refill(self, user_id: str, topic: str, difficulty: str, generate: Callable[[str, str], Dict]) -> None:
+        attempts = 0
+        while (self.pool.unseen_stock(user_id, topic, difficulty) < self.min_stock
+               and attempts < self.max_attempts):
+            attempts += 1
+            try:
+                self.pool.add(topic, difficulty, generate(topic, difficulty))
+            except Exception as e:
+                logger.warning("Discarding generated challenge for %s/%s: %s", topic, difficulty, e)
+                time.sleep(self.retry_delay)
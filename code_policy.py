@@ -0,0 +1,177 @@
+import ast
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from typing import Dict, List
+
+from code_sandbox import ALLOWED_MODULES
+
+
+PolicyViolation = namedtuple('PolicyViolation', ['rule', 'detail', 'line'])
+
+# A dunder anywhere in a string, e.g. "__class__.__base__" fed to a lookup by name
+_DUNDER = re.compile(r'__\w+__')
+# Calls that turn a string into an attribute access
+ATTRIBUTE_LOOKUPS = {'getattr', 'setattr', 'delattr', 'hasattr', '__getattribute__', 'attrgetter', 'methodcaller'}
+
+# Declarative policy: edit the lists, not the visitor
+DEFAULT_POLICY = {
+    'allowed_imports': sorted(ALLOWED_MODULES),
+    'denied_calls': [
+        'exec', 'eval', 'compile', 'open', '__import__', 'input', 'breakpoint',
+        'globals', 'locals', 'vars', 'getattr', 'setattr', 'delattr', 'help',
+        'memoryview', 'exit', 'quit',
+    ],
+    'denied_attributes': [
+        'system', 'popen', 'fork', 'rmtree', 'unlink', 'attrgetter', 'methodcaller',
+        '__builtins__', '__globals__', '__subclasses__', '__bases__', '__base__',
+        '__mro__', '__class__', '__code__', '__closure__', '__dict__',
+        '__getattribute__', '__loader__', '__spec__', '__reduce__', '__reduce_ex__',
+        'f_globals', 'f_locals', 'f_back', 'f_builtins', 'gi_frame', 'cr_frame', 'tb_frame',
+    ],
+    'denied_names': ['__builtins__', '__import__', '__loader__', '__spec__', 'builtins'],
+}
+
+
+class AnalysisReport:
+    def __init__(self, violations: List[PolicyViolation], syntax_error: str = None,
+                 elapsed_ms: float = 0.0, cached: bool = False):
+        self.violations = violations
+        self.syntax_error = syntax_error
+        self.elapsed_ms = elapsed_ms
+        self.cached = cached
+
+    @property
+    def allowed(self) -> bool:
+        return self.syntax_error is None and not self.violations
+
+
+class _PolicyVisitor(ast.NodeVisitor):
+    """Checks imports, calls, attributes and names in a single walk, once imported names are known"""
+
+    def __init__(self, policy: Dict):
+        self.allowed_imports = set(policy['allowed_imports'])
+        self.denied_calls = set(policy['denied_calls'])
+        self.denied_attributes = set(policy['denied_attributes'])
+        self.denied_names = set(policy['denied_names'])
+        self.module_names = set()   # names bound by import statements
+        self.violations = []
+
+    def _flag(self, rule: str, detail: str, node: ast.AST) -> None:
+        self.violations.append(PolicyViolation(rule, detail, getattr(node, 'lineno', 0)))
+
+    def _check_module(self, module: str, node: ast.AST) -> None:
+        if module.split('.')[0] not in self.allowed_imports:
+            self._flag('import', f"import of '{module}'", node)
+
+    def visit_Module(self, node):
+        # Imports anywhere in the file name modules, even when used above the import
+        for child in ast.walk(node):
+            if isinstance(child, ast.Import):
+                self.module_names.update(alias.asname or alias.name.split('.')[0] for alias in child.names)
+            elif isinstance(child, ast.ImportFrom):
+                # `from collections import abc` binds a module too
+                self.module_names.update(alias.asname or alias.name for alias in child.names)
+        self.generic_visit(node)
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            self._check_module(alias.name, node)
+        self.generic_visit(node)
+
+    def visit_ImportFrom(self, node):
+        if node.level:
+            self._flag('import', 'relative import', node)
+        else:
+            self._check_module(node.module or '', node)
+        for alias in node.names:
+            if alias.name.startswith('_'):
+                self._flag('attribute', f"import of private name '{alias.name}'", node)
+            elif alias.name in self.denied_attributes:
+                self._flag('attribute', f"import of '{alias.name}'", node)
+        self.generic_visit(node)
+
+    def visit_Call(self, node):
+        func = node.func
+        if isinstance(func, ast.Name) and func.id in self.denied_calls:
+            self._flag('call', f"call to '{func.id}'", node)
+        elif isinstance(func, ast.Attribute) and func.attr in self.denied_calls:
+            self._flag('call', f"call to '.{func.attr}'", node)
+        name = func.id if isinstance(func, ast.Name) else getattr(func, 'attr', None)
+        if name in ATTRIBUTE_LOOKUPS:
+            for arg in node.args:
+                self._check_lookup(arg)
+        self.generic_visit(node)
+
+    def visit_Subscript(self, node):
+        # obj.__dict__['__globals__'] style lookups
+        self._check_lookup(node.slice)
+        self.generic_visit(node)
+
+    def _check_lookup(self, node: ast.AST) -> None:
+        """Flag a string that names a dunder where it is used to look something up."""
+        if isinstance(node, ast.Constant) and isinstance(node.value, str) and _DUNDER.search(node.value):
+            self._flag('name', f"dunder lookup '{node.value[:40]}'", node)
+
+    def visit_Attribute(self, node):
+        if node.attr in self.denied_attributes:
+            self._flag('attribute', f"access to '.{node.attr}'", node)
+        elif node.attr.startswith('_') and self._is_module(node.value):
+            self._flag('attribute', f"access to private module attribute '.{node.attr}'", node)
+        self.generic_visit(node)
+
+    def _is_module(self, node: ast.AST) -> bool:
+        # random._os, collections.abc._sys: a chain of attributes rooted at an imported name
+        while isinstance(node, ast.Attribute):
+            node = node.value
+        return isinstance(node, ast.Name) and node.id in self.module_names
+
+    def visit_Name(self, node):
+        if node.id in self.denied_names:
+            self._flag('name', f"use of '{node.id}'", node)
+        self.generic_visit(node)
+
+    def visit_Constant(self, node):
+        # Catches getattr-free tricks such as obj.__dict__['__builtins__']
+        if isinstance(node.value, str) and node.value in self.denied_names:
+            self._flag('name', f"string reference to '{node.value}'", node)
+
+
+class CodePolicy:
+    """Static allow/deny policy over submitted code with results cached by code hash"""
+
+    def __init__(self, policy: Dict = None, max_cached: int = 512):
+        self.policy = policy or DEFAULT_POLICY
+        self.max_cached = max_cached
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def analyze(self, code: str) -> AnalysisReport:
+        start = time.perf_counter()
+        code_hash = hashlib.sha256(code.encode()).hexdigest()
+        with self._lock:
+            cached = self._cache.get(code_hash)
+            if cached is not None:
+                self._cache.move_to_end(code_hash)
+        if cached is not None:
+            violations, syntax_error = cached
+            return AnalysisReport(violations, syntax_error,
+                                  (time.perf_counter() - start) * 1000, cached=True)
+
+        violations, syntax_error = self._evaluate(code)
+        with self._lock:
+            self._cache[code_hash] = (violations, syntax_error)
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+        return AnalysisReport(violations, syntax_error, (time.perf_counter() - start) * 1000)
+
+    def _evaluate(self, code: str):
+        try:
+            tree = ast.parse(code)
+        except SyntaxError as e:
+            return [], str(e)
+        visitor = _PolicyVisitor(self.policy)
+        visitor.visit(tree)
+        return visitor.violations, None
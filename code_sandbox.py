@@ -0,0 +1,339 @@
+import builtins
+import importlib
+import io
+import math
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+import types
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+try:
+    import resource  # POSIX only; limits are skipped where it is unavailable
+except ImportError:
+    resource = None
+
+
+SAFE_BUILTIN_NAMES = [
+    'abs', 'all', 'any', 'bin', 'bool', 'chr', 'dict', 'divmod', 'enumerate',
+    'filter', 'float', 'format', 'frozenset', 'hash', 'hex', 'int', 'isinstance',
+    'issubclass', 'iter', 'len', 'list', 'map', 'max', 'min', 'next', 'oct',
+    'ord', 'pow', 'print', 'range', 'repr', 'reversed', 'round', 'set', 'slice',
+    'sorted', 'str', 'sum', 'tuple', 'zip', 'object', 'property', 'staticmethod',
+    'classmethod', 'super', 'hasattr', 'callable', 'Exception', 'ValueError', 'TypeError', 'KeyError',
+    'IndexError', 'ZeroDivisionError', 'StopIteration', 'ArithmeticError',
+    'RuntimeError', 'NotImplementedError', 'AssertionError', 'True', 'False', 'None',
+]
+
+# random and operator are left out: random._os and operator.attrgetter both reach os
+ALLOWED_MODULES = {
+    'math', 'collections', 'collections.abc', 'itertools', 'functools', 'heapq', 'bisect',
+    're', 'string', 'statistics', 'typing', 'dataclasses',
+}
+# Public names that still evaluate or look up arbitrary strings
+HIDDEN_ATTRIBUTES = {
+    'typing': {'get_type_hints', 'ForwardRef', 'evaluate_forward_ref'},
+    'string': {'Formatter'},
+}
+SANDBOX_UID = 65534   # nobody; workers started as root switch to it
+
+_module_views = {}
+
+
+def _module_view(name: str) -> types.ModuleType:
+    """A stand-in module with the public, non-module names of an allowed module.
+
+    Modules re-export what they import (dataclasses.builtins, typing.sys), so user
+    code only ever sees these views, never the real modules.
+    """
+    view = _module_views.get(name)
+    if view is None:
+        module = importlib.import_module(name)
+        view = types.ModuleType(name)
+        hidden = HIDDEN_ATTRIBUTES.get(name, ())
+        for attr, value in vars(module).items():
+            if attr.startswith('_') or attr in hidden:
+                continue
+            if isinstance(value, types.ModuleType):
+                if f"{name}.{attr}" not in ALLOWED_MODULES:
+                    continue
+                value = _module_view(f"{name}.{attr}")
+            setattr(view, attr, value)
+        _module_views[name] = view
+    return view
+
+
+def _restricted_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level != 0 or name not in ALLOWED_MODULES:
+        raise ImportError(f"Import of '{name}' is not allowed")
+    return _module_view(name if fromlist else name.split('.')[0])
+
+
+def _safe_builtins() -> Dict:
+    safe = {name: getattr(builtins, name) for name in SAFE_BUILTIN_NAMES if hasattr(builtins, name)}
+    safe['__import__'] = _restricted_import
+    safe['__build_class__'] = builtins.__build_class__
+    safe['__name__'] = 'solution'
+    return safe
+
+
+def _address_space_bytes() -> int:
+    """Current virtual memory size, so the limit is relative to what the worker has already loaded."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[0]) * resource.getpagesize()
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _apply_memory_limit(memory_limit_mb: int) -> None:
+    if resource is None or not memory_limit_mb:
+        return
+    try:
+        limit = _address_space_bytes() + memory_limit_mb * 1024 * 1024
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    except (ValueError, OSError):
+        pass
+
+
+def _apply_cpu_limit(cpu_seconds: float) -> None:
+    """RLIMIT_CPU counts the whole process lifetime, so re-arm it per job."""
+    if resource is None or not cpu_seconds:
+        return
+    try:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        used = usage.ru_utime + usage.ru_stime
+        _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        soft = int(math.ceil(used + cpu_seconds))
+        if hard != resource.RLIM_INFINITY:
+            soft = min(soft, hard)
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+    except (ValueError, OSError):
+        pass
+
+
+def _isolate_worker(memory_limit_mb: int) -> None:
+    """OS-level confinement, applied once before the worker accepts any job.
+
+    The environment is emptied and every allowed module is imported up front; then
+    the worker drops root and may not open any new file descriptor, so files,
+    sockets and subprocesses are out of reach even if Python-level checks are bypassed.
+    """
+    os.environ.clear()
+    for name in sorted(ALLOWED_MODULES):
+        importlib.import_module(name)
+    for name in sorted(ALLOWED_MODULES):
+        _module_view(name)
+    _apply_memory_limit(memory_limit_mb)
+    os.chdir('/')
+    if hasattr(os, 'setuid') and os.geteuid() == 0:
+        os.setgroups([])
+        os.setgid(SANDBOX_UID)
+        os.setuid(SANDBOX_UID)
+    if resource is not None:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (0, 0))
+
+
+def _execute_job(job: Dict) -> Dict:
+    """Run one call of the user's function in a fresh namespace."""
+    namespace = {'__builtins__': _safe_builtins()}
+    try:
+        exec(compile(job['code'], '<solution>', 'exec'), namespace)
+    except MemoryError:
+        return {'status': 'error', 'error': 'Memory limit exceeded while loading code', 'elapsed_ms': 0.0}
+    except Exception as e:
+        return {'status': 'error', 'error': f"Error executing code: {e}", 'elapsed_ms': 0.0}
+
+    func = namespace.get(job.get('function', 'solution'))
+    if not callable(func):
+        return {'status': 'error', 'error': f"Function '{job.get('function', 'solution')}' is not defined",
+                'elapsed_ms': 0.0}
+
+    start = time.perf_counter()
+    try:
+        if job.get('mode') == 'benchmark':
+            return _benchmark_call(func, job['input'], job.get('repeat', 3))
+        result = func(job['input'])
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        return {'status': 'ok', 'output': str(result), 'elapsed_ms': elapsed_ms}
+    except MemoryError:
+        return {'status': 'error', 'error': 'Memory limit exceeded',
+                'elapsed_ms': (time.perf_counter() - start) * 1000}
+    except RecursionError:
+        return {'status': 'error', 'error': 'Maximum recursion depth exceeded',
+                'elapsed_ms': (time.perf_counter() - start) * 1000}
+    except Exception as e:
+        return {'status': 'error', 'error': f"{type(e).__name__}: {e}",
+                'elapsed_ms': (time.perf_counter() - start) * 1000}
+
+
+def _benchmark_call(func, call_input, repeat: int) -> Dict:
+    """Best-of-n timing, then one traced call for peak memory (tracing skews timing)."""
+    best = float('inf')
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        func(call_input)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func(call_input)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'status': 'ok', 'output': '', 'elapsed_ms': best * 1000, 'peak_kb': peak / 1024}
+
+
+def _worker_main(conn, memory_limit_mb: int) -> None:
+    """Loop of a pre-started worker: receive a job, run it, send the result back."""
+    # User prints should not end up in the server log
+    sys.stdout = io.StringIO()
+    _isolate_worker(memory_limit_mb)
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            break
+        if job is None:
+            break
+        _apply_cpu_limit(job.get('cpu_seconds'))
+        result = _execute_job(job)
+        sys.stdout = io.StringIO()
+        try:
+            conn.send(result)
+        except (OSError, ValueError):
+            break
+
+
+class _Worker:
+    def __init__(self, ctx, memory_limit_mb: int):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, memory_limit_mb), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    def kill(self) -> None:
+        try:
+            self.process.kill()
+            self.process.join(timeout=1)
+        finally:
+            self.conn.close()
+
+
+class SandboxPool:
+    """Pre-started worker processes that run user code with CPU, memory and wall-clock limits"""
+
+    def __init__(self, workers: int = 4, cpu_seconds: float = 2, wall_seconds: float = 5,
+                 memory_limit_mb: int = 256):
+        # Never fork the server itself: a fork carries its memory, environment and secrets
+        start_methods = multiprocessing.get_all_start_methods()
+        if 'forkserver' in start_methods:
+            self._ctx = multiprocessing.get_context('forkserver')
+            self._ctx.set_forkserver_preload([__name__])
+        else:
+            self._ctx = multiprocessing.get_context('spawn')
+        self.cpu_seconds = cpu_seconds
+        self.wall_seconds = wall_seconds
+        self.memory_limit_mb = memory_limit_mb
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        for _ in range(workers):
+            self._idle.put(_Worker(self._ctx, memory_limit_mb))
+        self._dispatcher = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='sandbox')
+
+    def run_tests(self, code: str, test_cases: List[Dict], function: str = 'solution') -> List[Dict]:
+        """Run every test case in parallel; results come back in test-case order."""
+        futures = [
+            self._dispatcher.submit(self.run_call, code, test['input'], function)
+            for test in test_cases
+        ]
+        results = []
+        for test, future in zip(test_cases, futures):
+            result = future.result()
+            result['input'] = test['input']
+            result['expected'] = test['expected']
+            result['passed'] = (result['status'] == 'ok' and
+                                result['output'].strip() == str(test['expected']).strip())
+            results.append(result)
+        return results
+
+    def run_call(self, code: str, call_input, function: str = 'solution',
+                 wall_seconds: float = None, cpu_seconds: float = None,
+                 mode: str = 'run', repeat: int = 3) -> Dict:
+        """Run a single call on an idle worker, killing and replacing it on timeout.
+
+        With mode='benchmark' the worker reports best-of-`repeat` time and peak
+        traced memory instead of the output.
+        """
+        wall_seconds = wall_seconds or self.wall_seconds
+        job = {
+            'code': code,
+            'input': call_input,
+            'function': function,
+            'cpu_seconds': cpu_seconds or self.cpu_seconds,
+            'mode': mode,
+            'repeat': repeat,
+        }
+        worker = self._idle.get()
+        start = time.perf_counter()
+        healthy = True
+        try:
+            worker.conn.send(job)
+            if worker.conn.poll(wall_seconds):
+                result = worker.conn.recv()
+            else:
+                healthy = False
+                result = {'status': 'timeout',
+                          'error': f"Time limit exceeded ({wall_seconds:g}s wall clock)"}
+        except (EOFError, OSError, BrokenPipeError):
+            healthy = False
+            result = {'status': 'killed', 'error': self._describe_exit(worker, job['cpu_seconds'])}
+        finally:
+            wall_ms = (time.perf_counter() - start) * 1000
+            if not healthy or not worker.is_alive():
+                worker.kill()
+                worker = _Worker(self._ctx, self.memory_limit_mb)
+            self._idle.put(worker)
+
+        result['wall_ms'] = wall_ms
+        result.setdefault('elapsed_ms', wall_ms)
+        return result
+
+    def _describe_exit(self, worker: _Worker, cpu_seconds: float) -> str:
+        worker.process.join(timeout=1)
+        exitcode = worker.process.exitcode
+        if hasattr(signal, 'SIGXCPU') and exitcode == -signal.SIGXCPU:
+            return f"CPU time limit exceeded ({cpu_seconds:g}s)"
+        if exitcode == -signal.SIGKILL:
+            return "Process was killed (memory limit exceeded?)"
+        return f"Sandbox process exited unexpectedly (exit code {exitcode})"
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._dispatcher.shutdown(wait=False)
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                worker.conn.send(None)
+            except (OSError, ValueError):
+                pass
+            worker.kill()
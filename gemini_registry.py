@@ -0,0 +1,77 @@
+import hashlib
+import threading
+import time
+
+try:
+    import google.generativeai as genai
+except ImportError:  # the DIY page cannot run without it; tests pass a stand-in
+    genai = None
+
+
+HEALTH_CHECK_INTERVAL = 600
+
+
+class GeminiHandle:
+    """A validated model handle plus the cost of validating it"""
+
+    def __init__(self, model, validation_ms: float):
+        self.model = model
+        self.validation_ms = validation_ms
+        self.last_checked = time.monotonic()
+
+
+class GeminiRegistry:
+    """Validated Gemini handles cached per API key hash for the process lifetime"""
+
+    def __init__(self, health_check_interval: float = HEALTH_CHECK_INTERVAL):
+        self.health_check_interval = health_check_interval
+        self._handles = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_hash(api_key: str) -> str:
+        return hashlib.sha256(api_key.encode()).hexdigest()
+
+    def get(self, api_key: str):
+        """Return (handle, cached); only the first use of a key pays for a live probe"""
+        key_hash = self.key_hash(api_key)
+        with self._lock:
+            handle = self._handles.get(key_hash)
+        if handle is not None:
+            # configure() is process-wide and other pages set their own key on every run,
+            # so point it back at this key (local only, no request) before the handle is used
+            genai.configure(api_key=api_key, transport="rest")
+            self._health_check(key_hash, handle, api_key)
+            return handle, True
+
+        handle = self._validate(api_key)
+        with self._lock:
+            self._handles[key_hash] = handle
+        return handle, False
+
+    def _validate(self, api_key: str) -> GeminiHandle:
+        start = time.perf_counter()
+        genai.configure(api_key=api_key, transport="rest")
+        model = genai.GenerativeModel('gemini-pro')
+
+        # Test the configuration with a simple prompt
+        try:
+            response = model.generate_content("Return the word 'test' if you can read this.")
+        except Exception as e:
+            raise Exception(f"API test failed: {str(e)}")
+        if not (response and response.text):
+            raise Exception("Failed to get valid response from API")
+        return GeminiHandle(model, (time.perf_counter() - start) * 1000)
+
+    def _health_check(self, key_hash: str, handle: GeminiHandle, api_key: str) -> None:
+        """Metadata lookup instead of a generation; drops the handle if the key stopped working"""
+        if time.monotonic() - handle.last_checked < self.health_check_interval:
+            return
+        handle.last_checked = time.monotonic()
+        try:
+            genai.configure(api_key=api_key, transport="rest")
+            genai.get_model('models/gemini-pro')
+        except Exception as e:
+            with self._lock:
+                self._handles.pop(key_hash, None)
+            raise Exception(f"API health check failed: {str(e)}")
@@ -0,0 +1,235 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List
+from urllib.parse import urlsplit
+
+import requests
+
+
+SLOW_LATENCY_MS = 2000
+# Servers that reject HEAD but usually answer GET
+HEAD_UNSUPPORTED = {403, 405, 501}
+# Rate limiting says nothing about whether the resource exists
+TRANSIENT_STATUSES = {429}
+# Consecutive 4xx/5xx answers before a link counts as dead
+DEAD_AFTER_FAILURES = 3
+
+
+class LinkHealthIndex:
+    """Last known status and latency per link, stored in SQLite"""
+
+    def __init__(self, db_path='link_health.db'):
+        self.db_path = db_path
+        conn = self._connect()
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''CREATE TABLE IF NOT EXISTS link_health (
+                                link TEXT PRIMARY KEY,
+                                status INTEGER,
+                                ok INTEGER NOT NULL,
+                                latency_ms REAL,
+                                etag TEXT,
+                                last_modified TEXT,
+                                error TEXT,
+                                checked_at REAL NOT NULL,
+                                failures INTEGER NOT NULL DEFAULT 0)''')
+            if 'failures' not in {row['name'] for row in conn.execute('PRAGMA table_info(link_health)')}:
+                # Indexes created before failures were counted
+                conn.execute('ALTER TABLE link_health ADD COLUMN failures INTEGER NOT NULL DEFAULT 0')
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def get_many(self, links: Iterable[str]) -> Dict[str, Dict]:
+        links = list(set(links))
+        records = {}
+        conn = self._connect()
+        try:
+            # Stay well below SQLite's bound-parameter limit
+            for i in range(0, len(links), 500):
+                chunk = links[i:i + 500]
+                rows = conn.execute(
+                    f"SELECT * FROM link_health WHERE link IN ({','.join('?' * len(chunk))})", chunk)
+                records.update({row['link']: dict(row) for row in rows})
+        finally:
+            conn.close()
+        return records
+
+    def upsert_many(self, records: List[Dict]) -> None:
+        conn = self._connect()
+        try:
+            conn.executemany(
+                '''INSERT INTO link_health (link, status, ok, latency_ms, etag, last_modified, error, checked_at,
+                                           failures)
+                   VALUES (:link, :status, :ok, :latency_ms, :etag, :last_modified, :error, :checked_at,
+                           :failures)
+                   ON CONFLICT(link) DO UPDATE SET
+                       status = excluded.status, ok = excluded.ok, latency_ms = excluded.latency_ms,
+                       etag = excluded.etag, last_modified = excluded.last_modified,
+                       error = excluded.error, checked_at = excluded.checked_at,
+                       failures = excluded.failures''',
+                records)
+            conn.commit()
+        finally:
+            conn.close()
+
+
+def is_dead(record: Dict) -> bool:
+    """Only repeated 4xx/5xx answers clear 'ok'; timeouts and DNS errors never do."""
+    return record is not None and not record['ok']
+
+
+def is_slow(record: Dict, slow_ms: float = SLOW_LATENCY_MS) -> bool:
+    return bool(record is not None and record['ok'] and (record['latency_ms'] or 0) > slow_ms)
+
+
+class LinkHealthChecker:
+    """Checks many links concurrently with HEAD (GET fallback) and per-host politeness limits"""
+
+    def __init__(self, index: LinkHealthIndex, concurrency: int = 64, per_host: int = 4,
+                 min_host_interval: float = 0.1, timeout: float = 10, max_age: float = 24 * 3600,
+                 refresh_interval: float = 900, retry_interval: float = 3600):
+        self.index = index
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.min_host_interval = min_host_interval
+        self.timeout = timeout
+        self.max_age = max_age
+        # Links with an unconfirmed failure are re-checked sooner than max_age
+        self.retry_interval = retry_interval
+        self.refresh_interval = refresh_interval
+        self._last_refresh = None
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='link-health')
+        self._sessions = threading.local()
+        self._running = threading.Lock()
+
+    def links_in_catalog(self, categorized_content: Dict) -> List[str]:
+        return sorted({
+            resource['link']
+            for content in categorized_content.values()
+            for resources in content.values()
+            for resource in resources
+            if resource.get('link', '').startswith(('http://', 'https://'))
+        })
+
+    def refresh_in_background(self, categorized_content: Dict) -> bool:
+        """Re-check stale links on a daemon thread; returns False if a run is active or was recent."""
+        if self._last_refresh is not None and time.monotonic() - self._last_refresh < self.refresh_interval:
+            return False
+        if not self._running.acquire(blocking=False):
+            return False
+        self._last_refresh = time.monotonic()
+
+        def run():
+            try:
+                self.check_stale(self.links_in_catalog(categorized_content))
+            finally:
+                self._running.release()
+
+        threading.Thread(target=run, name='link-health-refresh', daemon=True).start()
+        return True
+
+    def check_stale(self, links: List[str]) -> List[Dict]:
+        known = self.index.get_many(links)
+        now = time.time()
+        stale = [link for link in links
+                 if link not in known or known[link]['checked_at'] < now - self._recheck_after(known[link])]
+        return self.check(stale, known) if stale else []
+
+    def _recheck_after(self, record: Dict) -> float:
+        unsettled = record['error'] or (record['failures'] and record['ok'])
+        return self.retry_interval if unsettled else self.max_age
+
+    def check(self, links: List[str], known: Dict[str, Dict] = None) -> List[Dict]:
+        """Check links now and store the results in the index."""
+        if known is None:
+            known = self.index.get_many(links)
+        records = asyncio.run(self._check_all(links, known))
+        self.index.upsert_many(records)
+        return records
+
+    async def _check_all(self, links: List[str], known: Dict[str, Dict]) -> List[Dict]:
+        global_limit = asyncio.Semaphore(self.concurrency)
+        host_limits = {}
+        host_next_start = {}
+        host_locks = {}
+
+        async def check_one(link: str) -> Dict:
+            host = urlsplit(link).netloc.lower()
+            host_limit = host_limits.setdefault(host, asyncio.Semaphore(self.per_host))
+            host_lock = host_locks.setdefault(host, asyncio.Lock())
+            async with global_limit, host_limit:
+                # Space out request starts per host
+                async with host_lock:
+                    delay = host_next_start.get(host, 0) - time.monotonic()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    host_next_start[host] = time.monotonic() + self.min_host_interval
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._executor, self._probe, link, known.get(link))
+
+        return await asyncio.gather(*(check_one(link) for link in links))
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._sessions, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers['User-Agent'] = 'PersonalizedLearning-LinkChecker/1.0'
+            self._sessions.session = session
+        return session
+
+    def _probe(self, link: str, previous: Dict = None) -> Dict:
+        headers = {}
+        if previous and previous['ok']:
+            if previous.get('etag'):
+                headers['If-None-Match'] = previous['etag']
+            if previous.get('last_modified'):
+                headers['If-Modified-Since'] = previous['last_modified']
+
+        record = {'link': link, 'status': None, 'ok': 0, 'latency_ms': None, 'etag': None,
+                  'last_modified': None, 'error': None, 'checked_at': time.time(), 'failures': 0}
+        session = self._session()
+        start = time.perf_counter()
+        try:
+            response = session.head(link, headers=headers, allow_redirects=True, timeout=self.timeout)
+            if response.status_code in HEAD_UNSUPPORTED:
+                response = session.get(link, headers=headers, allow_redirects=True,
+                                       timeout=self.timeout, stream=True)
+                response.close()
+            record['latency_ms'] = (time.perf_counter() - start) * 1000
+
+            if response.status_code == 304 and previous:
+                # Unchanged since the last successful check
+                record.update(status=previous['status'], ok=1,
+                              etag=previous.get('etag'), last_modified=previous.get('last_modified'))
+            elif response.status_code in TRANSIENT_STATUSES:
+                return self._transient(record, previous, f"HTTP {response.status_code}")
+            elif response.status_code >= 400:
+                failures = (previous['failures'] if previous else 0) + 1
+                record.update(status=response.status_code, ok=int(failures < DEAD_AFTER_FAILURES),
+                              failures=failures)
+            else:
+                record.update(status=response.status_code, ok=1, etag=response.headers.get('ETag'),
+                              last_modified=response.headers.get('Last-Modified'))
+        except requests.RequestException as e:
+            return self._transient(record, previous, type(e).__name__)
+        return record
+
+    @staticmethod
+    def _transient(record: Dict, previous: Dict, error: str) -> Dict:
+        """A timeout, DNS or connection error: keep the last known state, note the error."""
+        if previous:
+            for field in ('status', 'ok', 'latency_ms', 'etag', 'last_modified', 'failures'):
+                record[field] = previous[field]
+        else:
+            record['ok'] = 1   # unknown is not dead
+        record['error'] = error
+        return record
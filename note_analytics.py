@@ -0,0 +1,77 @@
+import re
+from collections import Counter
+from datetime import date
+from typing import Dict, List
+
+from note_store import Note
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def count_words(text: str) -> int:
+    return len(_WORD_RE.findall(text))
+
+
+class NoteAnalytics:
+    """Dashboard counters maintained as per-note deltas.
+
+    Each note's contribution (notebook, tags, word count, creation day) is cached,
+    so an edit subtracts the old contribution and adds the new one without touching
+    any other note. Words are only recounted when the content changed.
+    """
+
+    def __init__(self):
+        self.word_count = 0
+        self.notes_per_notebook = Counter()
+        self.tags_frequency = Counter()
+        self.activity = Counter()     # creation day -> notes
+        self._contributions = {}      # note id -> (notebook, tags, words, day)
+
+    def __len__(self):
+        return len(self._contributions)
+
+    def add(self, note: Note, word_count: int = None) -> None:
+        """Count a note in; pass word_count when it is already known to skip reading the content."""
+        if note.id in self._contributions:
+            self.remove(note.id)
+        if word_count is None:
+            word_count = count_words(note.content)
+        self._apply((note.notebook, tuple(note.tags), word_count,
+                     date.fromtimestamp(note.created_ts).isoformat()), note.id)
+
+    def update(self, note: Note, content_changed: bool = True) -> None:
+        previous = self._contributions.get(note.id)
+        if previous is None or content_changed:
+            self.add(note)
+            return
+        self.remove(note.id)
+        self._apply((note.notebook, tuple(note.tags), previous[2], previous[3]), note.id)
+
+    def remove(self, note_id: str) -> None:
+        contribution = self._contributions.pop(note_id, None)
+        if contribution is None:
+            return
+        notebook, tags, words, day = contribution
+        self.word_count -= words
+        _decrement(self.notes_per_notebook, notebook)
+        for tag in tags:
+            _decrement(self.tags_frequency, tag)
+        _decrement(self.activity, day)
+
+    def _apply(self, contribution, note_id: str) -> None:
+        notebook, tags, words, day = contribution
+        self._contributions[note_id] = contribution
+        self.word_count += words
+        self.notes_per_notebook[notebook] += 1
+        for tag in tags:
+            self.tags_frequency[tag] += 1
+        self.activity[day] += 1
+
+    def activity_over_time(self) -> List[Dict]:
+        return [{"date": day, "count": count} for day, count in sorted(self.activity.items())]
+
+
+def _decrement(counter: Counter, key) -> None:
+    counter[key] -= 1
+    if counter[key] <= 0:
+        del counter[key]
@@ -0,0 +1,196 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterable, Optional
+
+from note_db import NoteConflictError, NoteDatabase
+from note_store import Note
+
+logger = logging.getLogger(__name__)
+
+METADATA_FIELDS = ("title", "notebook", "tags", "color", "pinned")
+
+
+class _Pending:
+    __slots__ = ('note_id', 'snapshot', 'fields', 'base_version', 'first_dirty', 'last_dirty', 'edits', 'delete')
+
+    def __init__(self, note_id, base_version, now):
+        self.note_id = note_id
+        self.snapshot = None
+        self.fields = set()
+        self.base_version = base_version   # updated_at currently in the database; None = not stored yet
+        self.first_dirty = now
+        self.last_dirty = now
+        self.edits = 0
+        self.delete = False
+
+
+class NoteAutosaver:
+    """Coalesces note edits and writes them from a background thread.
+
+    `mark_dirty` only snapshots the changed fields under a lock, so the render thread
+    never waits on SQLite. A note is written once it has been quiet for `debounce`
+    seconds, or at the latest `max_delay` seconds after its first unsaved edit.
+    """
+
+    def __init__(self, db: NoteDatabase, debounce: float = 1.5, max_delay: float = 10,
+                 latency_window: int = 200):
+        self.db = db
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self._pending: Dict[str, _Pending] = {}
+        self._saving = set()
+        self._conflicts = {}
+        self._latencies = deque(maxlen=latency_window)
+        self._counters = {'edits': 0, 'saves': 0, 'bytes_changed': 0, 'bytes_written': 0}
+        self._cond = threading.Condition()
+        threading.Thread(target=self._run, name=f'note-autosave-{db.owner}', daemon=True).start()
+
+    def mark_dirty(self, note: Note, fields: Iterable[str], base_version: Optional[str]) -> None:
+        """Record an edit. `base_version` is the note's updated_at before this edit (None for new notes)."""
+        fields = set(fields)
+        now = time.monotonic()
+        with self._cond:
+            pending = self._pending.get(note.id)
+            if pending is None:
+                pending = self._pending[note.id] = _Pending(note.id, base_version, now)
+            pending.fields |= fields
+            pending.last_dirty = now
+            pending.edits += 1
+            # Snapshot now so the writer never reads a note the page is still mutating
+            pending.snapshot = _snapshot(note, pending.fields)
+            self._counters['edits'] += 1
+            self._counters['bytes_changed'] += sum(_size(getattr(note, field)) for field in fields)
+            self._cond.notify()
+
+    def mark_deleted(self, note_id: str) -> None:
+        with self._cond:
+            pending = self._pending.get(note_id)
+            if pending is not None and pending.base_version is None and not pending.delete:
+                # Never written: nothing to delete
+                del self._pending[note_id]
+                return
+            pending = self._pending[note_id] = _Pending(note_id, None, time.monotonic())
+            pending.delete = True
+            self._cond.notify()
+
+    def is_pending(self, note_id: str) -> bool:
+        with self._cond:
+            return note_id in self._pending or note_id in self._saving
+
+    def pop_conflicts(self) -> Dict[str, str]:
+        with self._cond:
+            conflicts, self._conflicts = self._conflicts, {}
+            return conflicts
+
+    def flush(self, timeout: float = 5) -> bool:
+        """Write everything now and wait for it (tests, shutdown); False on timeout."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            for pending in self._pending.values():
+                pending.first_dirty = pending.last_dirty = float('-inf')
+            self._cond.notify()
+            while self._pending or self._saving:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def stats(self) -> Dict:
+        with self._cond:
+            latencies = sorted(self._latencies)
+            counters = dict(self._counters)
+            pending = len(self._pending)
+        edits, saves = counters['edits'], counters['saves']
+        return {
+            'pending': pending,
+            'edits': edits,
+            'saves': saves,
+            'edits_per_save': edits / saves if saves else 0.0,
+            'save_p50_ms': latencies[len(latencies) // 2] if latencies else 0.0,
+            'save_p95_ms': latencies[int(len(latencies) * 0.95)] if latencies else 0.0,
+            # Bytes sent to SQLite per byte the user actually changed
+            'write_amplification': (counters['bytes_written'] / counters['bytes_changed']
+                                    if counters['bytes_changed'] else 0.0),
+        }
+
+    def _due(self, now: float):
+        due, wake_at = [], None
+        for note_id, pending in self._pending.items():
+            if note_id in self._saving:
+                continue
+            ready_at = min(pending.last_dirty + self.debounce, pending.first_dirty + self.max_delay)
+            if pending.delete or ready_at <= now:
+                due.append(pending)
+            else:
+                wake_at = ready_at if wake_at is None else min(wake_at, ready_at)
+        return due, wake_at
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                due, wake_at = self._due(time.monotonic())
+                while not due:
+                    self._cond.wait(None if wake_at is None else max(0.0, wake_at - time.monotonic()))
+                    due, wake_at = self._due(time.monotonic())
+                for pending in due:
+                    del self._pending[pending.note_id]
+                    self._saving.add(pending.note_id)
+            for pending in due:
+                self._write(pending)
+
+    def _write(self, pending: _Pending) -> None:
+        start = time.perf_counter()
+        written = 0
+        try:
+            if pending.delete:
+                self.db.delete(pending.note_id)
+            else:
+                self.db.save(pending.snapshot, expected_updated_at=pending.base_version,
+                             fields=pending.fields)
+                written = _written_bytes(pending.snapshot, pending.fields)
+        except NoteConflictError as e:
+            with self._cond:
+                self._conflicts[pending.note_id] = str(e)
+        except Exception:
+            logger.exception("Autosave failed for note %s", pending.note_id)
+            with self._cond:
+                self._conflicts[pending.note_id] = "Autosave failed; your latest edits were not stored"
+        else:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with self._cond:
+                self._latencies.append(elapsed_ms)
+                self._counters['saves'] += 1
+                self._counters['bytes_written'] += written
+        finally:
+            with self._cond:
+                self._saving.discard(pending.note_id)
+                self._cond.notify_all()
+
+
+def _snapshot(note: Note, fields: set) -> Note:
+    copy = Note.__new__(Note)
+    for field in ("id", "created_ts", "updated_ts") + METADATA_FIELDS:
+        value = getattr(note, field)
+        setattr(copy, field, list(value) if isinstance(value, list) else value)
+    # Only touch the body when it changed, so lazy notes stay unloaded
+    copy.content = note.content if "content" in fields else None
+    return copy
+
+
+def _size(value) -> int:
+    if isinstance(value, str):
+        return len(value.encode())
+    if isinstance(value, list):
+        return sum(len(str(item).encode()) for item in value)
+    return 1
+
+
+def _written_bytes(snapshot: Note, fields: set) -> int:
+    written = sum(_size(getattr(snapshot, field)) for field in METADATA_FIELDS)
+    if "content" in fields:
+        # Body row plus its FTS copy
+        written += 2 * _size(snapshot.content)
+    return written
@@ -0,0 +1,406 @@
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from note_analytics import count_words
+from note_search import parse_query, tokenize
+from note_store import Note, NoteRepository
+
+
+class NoteConflictError(Exception):
+    """The note was changed by someone else since it was loaded."""
+
+
+def content_hash(content: str) -> str:
+    """Fingerprint of a note body, ignoring line endings and surrounding whitespace."""
+    return hashlib.sha256(content.replace('\r\n', '\n').strip().encode()).hexdigest()
+
+
+class LazyNote(Note):
+    """A note whose content is only read from the database on first access."""
+
+    __slots__ = ('_loader', '_content', 'word_count')
+
+    def __init__(self, loader, word_count: int = 0, **kwargs):
+        super().__init__(**kwargs)
+        self._loader = loader
+        self._content = None
+        self.word_count = word_count
+
+    @classmethod
+    def from_row(cls, row, loader) -> 'LazyNote':
+        # Skips Note.__init__: no throwaway uuid or timestamp per loaded row
+        note = cls.__new__(cls)
+        note.id = row['id']
+        note.title = row['title']
+        note.notebook = row['notebook']
+        note.tags = json.loads(row['tags'])
+        note.color = sys.intern(row['color'])
+        note.created_at = row['created_at']
+        note.updated_at = row['updated_at']
+        note.pinned = bool(row['pinned'])
+        note.word_count = row['word_count']
+        note._loader = loader
+        note._content = None
+        return note
+
+    @property
+    def content(self):
+        if self._content is None:
+            self._content = self._loader(self.id)
+        return self._content
+
+    @content.setter
+    def content(self, value):
+        self._content = value
+
+    @property
+    def content_loaded(self) -> bool:
+        return self._content is not None
+
+
+def content_loaded(note: Note) -> bool:
+    return getattr(note, 'content_loaded', True)
+
+
+class NoteDatabase:
+    """Durable note storage for one owner: metadata, bodies and an FTS5 index in SQLite.
+
+    Listing reads only the metadata table; bodies are fetched per note when first
+    used. Writes are per-note upserts guarded by updated_at, so a stale editor gets
+    a NoteConflictError instead of silently overwriting a newer version.
+    """
+
+    def __init__(self, db_path='notes.db', owner='guest'):
+        self.db_path = db_path
+        self.owner = owner
+        self._init_db()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        conn = self._connect()
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''CREATE TABLE IF NOT EXISTS notes (
+                                id TEXT PRIMARY KEY,
+                                owner TEXT NOT NULL,
+                                title TEXT NOT NULL,
+                                notebook TEXT NOT NULL,
+                                tags TEXT NOT NULL,
+                                color TEXT NOT NULL,
+                                created_at TEXT NOT NULL,
+                                updated_at TEXT NOT NULL,
+                                pinned INTEGER NOT NULL DEFAULT 0,
+                                word_count INTEGER NOT NULL DEFAULT 0)''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_notes_owner ON notes (owner, notebook)')
+            # Bodies live apart from the metadata so listing never pages them in
+            conn.execute('''CREATE TABLE IF NOT EXISTS note_bodies (
+                                id TEXT PRIMARY KEY REFERENCES notes (id) ON DELETE CASCADE,
+                                content TEXT NOT NULL,
+                                content_hash TEXT)''')
+            if 'content_hash' not in {row['name'] for row in conn.execute('PRAGMA table_info(note_bodies)')}:
+                # Databases created before imports deduplicated; backfilled by content_hashes()
+                conn.execute('ALTER TABLE note_bodies ADD COLUMN content_hash TEXT')
+            # FTS rows share the rowid of their notes row
+            conn.execute('CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(title, content)')
+            conn.commit()
+        finally:
+            conn.close()
+
+    def load_notes(self) -> List[LazyNote]:
+        """Metadata for every note of this owner; content stays on disk until accessed."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                '''SELECT id, title, notebook, tags, color, created_at, updated_at, pinned, word_count
+                   FROM notes WHERE owner = ?''', (self.owner,)).fetchall()
+        finally:
+            conn.close()
+        return [LazyNote.from_row(row, self.load_body) for row in rows]
+
+    def load_repository(self) -> NoteRepository:
+        return NoteRepository(self.load_notes())
+
+    def load_body(self, note_id: str) -> str:
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT content FROM note_bodies WHERE id = ?', (note_id,)).fetchone()
+            return row['content'] if row else ""
+        finally:
+            conn.close()
+
+    def save(self, note: Note, expected_updated_at: Optional[str] = None, fields=None) -> None:
+        """Insert a new note, or update one that still has `expected_updated_at` in storage.
+
+        When `fields` is given, the body is only rewritten if "content" is among them.
+        """
+        conn = self._connect()
+        try:
+            with conn:
+                self._save(conn, note, expected_updated_at, fields)
+        finally:
+            conn.close()
+
+    def save_many(self, notes: Iterable[Note]) -> int:
+        """Insert notes in one transaction (bulk loads); returns how many were written."""
+        conn = self._connect()
+        written = 0
+        try:
+            with conn:
+                for note in notes:
+                    self._save(conn, note, None, None)
+                    written += 1
+        finally:
+            conn.close()
+        return written
+
+    def _save(self, conn, note: Note, expected_updated_at: Optional[str], fields) -> None:
+        has_body = content_loaded(note) and (fields is None or "content" in fields)
+        values = {
+            'id': note.id, 'owner': self.owner, 'title': note.title, 'notebook': note.notebook,
+            'tags': json.dumps(note.tags), 'color': note.color, 'created_at': note.created_at,
+            'updated_at': note.updated_at, 'pinned': int(note.pinned),
+            'word_count': count_words(note.content) if has_body else None,
+            'expected': expected_updated_at,
+        }
+        if expected_updated_at is None:
+            cursor = conn.execute(
+                '''INSERT INTO notes (id, owner, title, notebook, tags, color, created_at, updated_at,
+                                      pinned, word_count)
+                   VALUES (:id, :owner, :title, :notebook, :tags, :color, :created_at, :updated_at,
+                           :pinned, COALESCE(:word_count, 0))
+                   ON CONFLICT (id) DO NOTHING''', values)
+        else:
+            cursor = conn.execute(
+                '''UPDATE notes SET title = :title, notebook = :notebook, tags = :tags, color = :color,
+                                    updated_at = :updated_at, pinned = :pinned,
+                                    word_count = COALESCE(:word_count, word_count)
+                   WHERE id = :id AND owner = :owner AND updated_at = :expected''', values)
+        if cursor.rowcount == 0:
+            raise NoteConflictError(f"Note '{note.title or note.id}' was changed elsewhere")
+
+        # Metadata-only edits (pin, retag, move) leave the body alone
+        rowid = conn.execute('SELECT rowid FROM notes WHERE id = ?', (note.id,)).fetchone()[0]
+        if has_body:
+            conn.execute('INSERT OR REPLACE INTO note_bodies (id, content, content_hash) VALUES (?, ?, ?)',
+                         (note.id, note.content, content_hash(note.content)))
+            if expected_updated_at is not None:
+                conn.execute('DELETE FROM notes_fts WHERE rowid = ?', (rowid,))
+            conn.execute('INSERT INTO notes_fts (rowid, title, content) VALUES (?, ?, ?)',
+                         (rowid, note.title, note.content))
+        else:
+            conn.execute('UPDATE notes_fts SET title = ? WHERE rowid = ?', (note.title, rowid))
+
+    def delete(self, note_id: str) -> bool:
+        conn = self._connect()
+        try:
+            with conn:
+                row = conn.execute('SELECT rowid FROM notes WHERE id = ? AND owner = ?',
+                                   (note_id, self.owner)).fetchone()
+                if row is None:
+                    return False
+                conn.execute('DELETE FROM notes WHERE rowid = ?', (row[0],))
+                conn.execute('DELETE FROM note_bodies WHERE id = ?', (note_id,))
+                conn.execute('DELETE FROM notes_fts WHERE rowid = ?', (row[0],))
+            return True
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _match_expression(query: str) -> Optional[str]:
+        """FTS5 MATCH string: every clause required, the last bare term also matches as a prefix."""
+        terms, phrases = parse_query(query)
+        if not terms and not phrases:
+            return None
+        clauses = [f'"{term}"' for term in terms]
+        if clauses:
+            clauses[-1] += '*'
+        clauses += ['"' + ' '.join(phrase) + '"' for phrase in phrases]
+        return ' AND '.join(clauses)
+
+    def search(self, query: str, limit: int = 50, offset: int = 0) -> List[str]:
+        """Note ids ranked by FTS5 bm25, with the title weighted x2."""
+        match = self._match_expression(query)
+        if match is None:
+            return []
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                '''SELECT notes.id FROM notes_fts JOIN notes ON notes.rowid = notes_fts.rowid
+                   WHERE notes_fts MATCH ? AND notes.owner = ?
+                   ORDER BY bm25(notes_fts, 2.0, 1.0) LIMIT ? OFFSET ?''',
+                (match, self.owner, limit, offset)).fetchall()
+            return [row['id'] for row in rows]
+        finally:
+            conn.close()
+
+    def count_matches(self, query: str) -> int:
+        match = self._match_expression(query)
+        if match is None:
+            return 0
+        conn = self._connect()
+        try:
+            return conn.execute(
+                '''SELECT COUNT(*) FROM notes_fts JOIN notes ON notes.rowid = notes_fts.rowid
+                   WHERE notes_fts MATCH ? AND notes.owner = ?''', (match, self.owner)).fetchone()[0]
+        finally:
+            conn.close()
+
+    def iter_notes(self, notebook: Optional[str] = None, note_ids: Optional[List[str]] = None,
+                   batch_size: int = 500) -> Iterator[Dict]:
+        """Stream full notes (to_dict() shape) in list order, `batch_size` rows at a time.
+
+        Bodies are read straight from the cursor and never cached on the loaded notes,
+        so exporting a whole workspace holds one batch in memory at most.
+        """
+        where, params = 'notes.owner = ?', [self.owner]
+        if notebook is not None:
+            where += ' AND notes.notebook = ?'
+            params.append(notebook)
+        if note_ids is not None:
+            if not note_ids:
+                return
+            where += f" AND notes.id IN ({','.join('?' * len(note_ids))})"
+            params.extend(note_ids)
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                f'''SELECT notes.id, title, notebook, tags, color, created_at, updated_at, pinned,
+                           COALESCE(note_bodies.content, '') AS content
+                    FROM notes LEFT JOIN note_bodies ON note_bodies.id = notes.id
+                    WHERE {where}
+                    ORDER BY pinned DESC, updated_at DESC, notes.id''', params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield {
+                        "id": row['id'], "title": row['title'], "content": row['content'],
+                        "notebook": row['notebook'], "tags": json.loads(row['tags']), "color": row['color'],
+                        "created_at": row['created_at'], "updated_at": row['updated_at'],
+                        "pinned": bool(row['pinned']),
+                    }
+        finally:
+            conn.close()
+
+    def content_hashes(self) -> set:
+        """content_hash() of every body this owner has, filling in hashes missing from older rows."""
+        conn = self._connect()
+        try:
+            with conn:
+                missing = conn.execute(
+                    '''SELECT note_bodies.id, note_bodies.content FROM note_bodies
+                       JOIN notes ON notes.id = note_bodies.id
+                       WHERE notes.owner = ? AND note_bodies.content_hash IS NULL''', (self.owner,))
+                updates = [(content_hash(row['content']), row['id']) for row in missing]
+                conn.executemany('UPDATE note_bodies SET content_hash = ? WHERE id = ?', updates)
+            rows = conn.execute(
+                '''SELECT note_bodies.content_hash FROM note_bodies JOIN notes ON notes.id = note_bodies.id
+                   WHERE notes.owner = ?''', (self.owner,))
+            return {row[0] for row in rows}
+        finally:
+            conn.close()
+
+    def existing_ids(self, note_ids: List[str]) -> set:
+        """The given ids already taken by any owner's note (ids are global)."""
+        conn = self._connect()
+        try:
+            taken = set()
+            for start in range(0, len(note_ids), 500):
+                chunk = note_ids[start:start + 500]
+                rows = conn.execute(f"SELECT id FROM notes WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+                taken.update(row[0] for row in rows)
+            return taken
+        finally:
+            conn.close()
+
+    def load_previews(self, note_ids: List[str], length: int = 100) -> Dict[str, str]:
+        """The first `length` characters of each body, without loading whole bodies into notes."""
+        if not note_ids:
+            return {}
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                f"SELECT id, substr(content, 1, ?) AS preview, length(content) > ? AS truncated "
+                f"FROM note_bodies WHERE id IN ({','.join('?' * len(note_ids))})",
+                [length, length, *note_ids]).fetchall()
+            return {row['id']: row['preview'] + ('...' if row['truncated'] else '') for row in rows}
+        finally:
+            conn.close()
+
+
+def benchmark_open(count: int = 50_000) -> Dict:
+    """Time opening a workspace, which reads metadata only and leaves every body on disk."""
+    from note_fixtures import make_synthetic_notes   # benchmark data stays out of the app's imports
+    notes = make_synthetic_notes(count)
+    with tempfile.TemporaryDirectory() as directory:
+        db = NoteDatabase(os.path.join(directory, 'notes.db'))
+        start = time.perf_counter()
+        db.save_many(notes)
+        write_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        repository = db.load_repository()
+        open_ms = (time.perf_counter() - start) * 1000
+
+        conn = db._connect()
+        try:
+            body_bytes = conn.execute('SELECT SUM(LENGTH(content)) FROM note_bodies').fetchone()[0]
+        finally:
+            conn.close()
+        loaded = sum(1 for note in repository if note.content_loaded)
+        return {'notes': len(repository), 'bulk_write_ms': write_ms, 'open_ms': open_ms,
+                'bodies_loaded': loaded, 'body_bytes_left_on_disk': body_bytes}
+
+
+def benchmark_search(counts=(10_000, 100_000), queries: int = 100, seed: int = 5) -> List[Dict]:
+    """Index build time and mean FTS5 latency for single-term, multi-term and phrase queries."""
+    from note_fixtures import make_synthetic_notes
+    rng = random.Random(seed)
+    results = []
+    for count in counts:
+        notes = make_synthetic_notes(count, seed=seed)
+        with tempfile.TemporaryDirectory() as directory:
+            db = NoteDatabase(os.path.join(directory, 'notes.db'))
+            start = time.perf_counter()
+            db.save_many(notes)
+            build_ms = (time.perf_counter() - start) * 1000
+
+            def mean_ms(make_query):
+                batch = [make_query() for _ in range(queries)]
+                start = time.perf_counter()
+                for query in batch:
+                    db.search(query)
+                return (time.perf_counter() - start) * 1000 / queries
+
+            def phrase():
+                tokens = tokenize(rng.choice(notes).content)
+                i = rng.randrange(len(tokens) - 1)
+                return f'"{tokens[i]} {tokens[i + 1]}"'
+
+            results.append({
+                'notes': count,
+                'build_ms': build_ms,
+                'term_ms': mean_ms(lambda: f"w{rng.randint(50, 5000)}"),
+                'common_term_ms': mean_ms(lambda: f"w{rng.randint(0, 10)}"),
+                'multi_term_ms': mean_ms(lambda: f"w{rng.randint(0, 200)} w{rng.randint(200, 5000)}"),
+                'phrase_ms': mean_ms(phrase),
+            })
+    return results
+
+
+if __name__ == "__main__":
+    print(benchmark_open())
+    for row in benchmark_search():
+        print(row)
@@ -0,0 +1,19 @@
+import itertools
+import random
+from typing import List
+
+from note_store import Note
+
+
+def make_synthetic_notes(count: int, words_per_note: int = 60, vocabulary: int = 20_000,
+                         seed: int = 5) -> List[Note]:
+    """Notes with a Zipf-like word distribution, so a few words are everywhere and most are rare."""
+    rng = random.Random(seed)
+    words = [f"w{i}" for i in range(vocabulary)]
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(vocabulary)))
+    notes = []
+    for i in range(count):
+        sample = rng.choices(words, cum_weights=cum_weights, k=words_per_note + 4)
+        notes.append(Note(title=' '.join(sample[:4]), content=' '.join(sample[4:]),
+                          notebook=rng.choice(["Default", "Work", "Personal"])))
+    return notes
@@ -0,0 +1,307 @@
+import io
+import json
+import logging
+import os
+import posixpath
+import tempfile
+import time
+import uuid
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import repeat
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from note_db import NoteDatabase, content_hash
+from note_store import Note
+
+logger = logging.getLogger(__name__)
+
+TEXT_EXTENSIONS = ('.md', '.markdown', '.txt')
+RECORD_EXTENSIONS = ('.ndjson', '.jsonl', '.json')
+IMPORT_EXTENSIONS = TEXT_EXTENSIONS + RECORD_EXTENSIONS + ('.zip',)
+
+FILES_PER_TASK = 200
+BYTES_PER_TASK = 4 * 1024 * 1024
+MAX_REPORTED_ERRORS = 20
+# Decompressed size limits, so a zip bomb cannot exhaust memory
+MAX_MEMBER_BYTES = 64 * 1024 * 1024
+MAX_ARCHIVE_BYTES = 512 * 1024 * 1024
+
+
+def iter_sources(paths: Iterable[str]) -> Iterator[Tuple[str, bytes]]:
+    """(name, bytes) for files and for supported files under folders, named relative to the folder."""
+    for path in paths:
+        if not os.path.isdir(path):
+            with open(path, 'rb') as f:
+                yield os.path.basename(path), f.read()
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for file_name in sorted(files):
+                if file_name.lower().endswith(IMPORT_EXTENSIONS):
+                    full_path = os.path.join(root, file_name)
+                    with open(full_path, 'rb') as f:
+                        yield os.path.relpath(full_path, path).replace(os.sep, '/'), f.read()
+
+
+def _unzip(name: str, data: bytes, errors: List[str]) -> Iterator[Tuple[str, bytes]]:
+    """Supported members of an archive; a corrupt archive or oversized member is reported, not raised."""
+    try:
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            remaining = MAX_ARCHIVE_BYTES
+            for info in archive.infolist():
+                member = info.filename
+                if info.is_dir() or member.startswith('__MACOSX/') \
+                        or posixpath.basename(member).startswith('.') \
+                        or not member.lower().endswith(TEXT_EXTENSIONS + RECORD_EXTENSIONS):
+                    continue
+                limit = min(MAX_MEMBER_BYTES, remaining)
+                if info.file_size > limit:
+                    errors.append(f"{name}:{member}: unpacks to more than {limit:,} bytes")
+                    continue
+                # file_size is only what the archive claims; never read past the limit
+                with archive.open(info) as f:
+                    content = f.read(limit + 1)
+                if len(content) > limit:
+                    errors.append(f"{name}:{member}: unpacks to more than {limit:,} bytes")
+                    continue
+                remaining -= len(content)
+                yield member, content
+    except (zipfile.BadZipFile, zlib.error, EOFError, NotImplementedError, RuntimeError) as e:
+        # Corrupt or truncated data, unsupported compression, encrypted members
+        errors.append(f"{name}: cannot read zip archive: {e}")
+
+
+def _expand(sources: Iterable[Tuple[str, bytes]], errors: List[str]) -> Iterator[Tuple[str, bytes]]:
+    """Unpack zip archives and split NDJSON into line chunks, so each can go to a different worker."""
+    for name, data in sources:
+        lower = name.lower()
+        if lower.endswith('.zip'):
+            yield from _expand(_unzip(name, data, errors), errors)
+        elif lower.endswith(('.ndjson', '.jsonl')) and len(data) > BYTES_PER_TASK:
+            start = 0
+            while start < len(data):
+                end = data.find(b'\n', start + BYTES_PER_TASK)
+                end = len(data) if end == -1 else end + 1
+                yield name, data[start:end]
+                start = end
+        else:
+            yield name, data
+
+
+def _tasks(items: Iterable[Tuple[str, bytes]]) -> List[List[Tuple[str, bytes]]]:
+    """Group files so each worker call carries enough work to be worth the pickling."""
+    tasks, current, size = [], [], 0
+    for item in items:
+        current.append(item)
+        size += len(item[1])
+        if len(current) >= FILES_PER_TASK or size >= BYTES_PER_TASK:
+            tasks.append(current)
+            current, size = [], 0
+    if current:
+        tasks.append(current)
+    return tasks
+
+
+def _timestamp(value) -> Optional[str]:
+    try:
+        return datetime.fromisoformat(str(value)).isoformat()
+    except ValueError:
+        return None
+
+
+def _tag_list(value) -> List[str]:
+    if isinstance(value, str):
+        value = value.strip().strip('[]').split(',')
+    if not isinstance(value, list):
+        return []
+    return [tag for tag in (str(item).strip().strip('"\'') for item in value) if tag]
+
+
+def _flag(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ('true', 'yes', '1')
+    return bool(value)
+
+
+def _clean(data, default_notebook: str) -> Dict:
+    """Coerce one imported record into the to_dict() shape, with usable defaults."""
+    if not isinstance(data, dict):
+        raise ValueError("expected a JSON object per note")
+    created_at = _timestamp(data.get("created_at")) or datetime.now().isoformat()
+    cleaned = {
+        "title": str(data.get("title") or ""),
+        "content": str(data.get("content") or ""),
+        "notebook": str(data.get("notebook") or default_notebook),
+        "tags": _tag_list(data.get("tags", [])),
+        "created_at": created_at,
+        "updated_at": _timestamp(data.get("updated_at")) or created_at,
+        "pinned": _flag(data.get("pinned", False)),
+    }
+    if isinstance(data.get("id"), str) and data["id"]:
+        cleaned["id"] = data["id"]
+    if isinstance(data.get("color"), str):
+        cleaned["color"] = data["color"]
+    return cleaned
+
+
+def _parse_markdown(name: str, text: str, default_notebook: str) -> Dict:
+    """One note per file: optional `key: value` front matter, title from it, the first heading or the file name."""
+    data = {}
+    if text.startswith('---\n'):
+        end = text.find('\n---', 4)
+        if end != -1:
+            for line in text[4:end].splitlines():
+                key, sep, value = line.partition(':')
+                if sep:
+                    data[key.strip().lower()] = value.strip()
+            text = text[end + 4:].lstrip('\n')
+    if 'title' not in data:
+        for line in text.splitlines():
+            if line.startswith('# '):
+                data['title'] = line[2:].strip()
+                break
+            if line.strip():
+                break
+    data.setdefault('title', posixpath.splitext(posixpath.basename(name))[0])
+    # The enclosing folder names the notebook, as in an exported or hand-organised tree
+    folder = posixpath.basename(posixpath.dirname(name))
+    if folder and 'notebook' not in data:
+        data['notebook'] = folder
+    data.setdefault('created_at', data.pop('date', None))
+    data['content'] = text
+    return _clean(data, default_notebook)
+
+
+def _parse_records(name: str, text: str, default_notebook: str, errors: List[str]) -> Iterator[Dict]:
+    """A JSON array or single object (e.g. our JSON export), otherwise one object per line.
+
+    A bad NDJSON line is reported and skipped without losing the rest of the file.
+    """
+    try:
+        document = json.loads(text)
+    except json.JSONDecodeError:
+        lines = enumerate(text.splitlines(), 1)
+    else:
+        lines = enumerate(document if isinstance(document, list) else [document], 1)
+    for number, record in lines:
+        try:
+            if isinstance(record, str):
+                if not record.strip():
+                    continue
+                record = json.loads(record)
+            yield _clean(record, default_notebook)
+        except ValueError as e:   # json.JSONDecodeError included
+            errors.append(f"{name}:{number}: {e}")
+
+
+def parse_items(items: List[Tuple[str, bytes]], default_notebook: str) -> Tuple[List[Tuple[Note, str]], List[str]]:
+    """Worker entry point: (note, content hash) pairs for every record, plus error messages."""
+    parsed, errors = [], []
+    for name, data in items:
+        text = data.decode('utf-8-sig', errors='replace').replace('\r\n', '\n')
+        if name.lower().endswith(RECORD_EXTENSIONS):
+            records = _parse_records(name, text, default_notebook, errors)
+        else:
+            records = [_parse_markdown(name, text, default_notebook)]
+        for record in records:
+            note = Note.from_dict(record)
+            parsed.append((note, content_hash(note.content)))
+    return parsed, errors
+
+
+def import_notes(sources: Iterable[Tuple[str, bytes]], db: NoteDatabase, default_notebook: str = "Imported",
+                 workers: Optional[int] = None, batch_size: int = 1000) -> Tuple[List[Note], Dict]:
+    """Parse (name, bytes) sources in a process pool and insert new notes in batches.
+
+    Notes whose body matches one already stored for this owner, or one earlier in the
+    same import, are skipped; empty bodies never count as duplicates. Ids that are
+    already taken get a fresh one. `workers=0` parses in-process.
+    Returns the inserted notes and a stats dict.
+    """
+    start = time.perf_counter()
+    errors = []
+    tasks = _tasks(_expand(sources, errors))
+    seen = db.content_hashes()
+    seen.discard(content_hash(""))
+    stats = {'files': sum(len(task) for task in tasks), 'parsed': 0, 'imported': 0,
+             'duplicates': 0, 'errors': errors}
+    imported, batch, batch_ids = [], [], set()
+
+    def write_batch():
+        taken = db.existing_ids([note.id for note in batch])
+        for note in batch:
+            if note.id in taken:
+                note.id = str(uuid.uuid4())
+        stats['imported'] += db.save_many(batch)
+        imported.extend(batch)
+        batch.clear()
+        batch_ids.clear()
+
+    if workers == 0 or len(tasks) <= 1:
+        results = map(parse_items, tasks, repeat(default_notebook))
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(parse_items, tasks, repeat(default_notebook))
+    try:
+        for parsed, errors in results:
+            stats['errors'].extend(errors)
+            stats['parsed'] += len(parsed)
+            for note, digest in parsed:
+                if digest in seen:
+                    stats['duplicates'] += 1
+                    continue
+                if note.content.strip():
+                    seen.add(digest)
+                if note.id in batch_ids:
+                    note.id = str(uuid.uuid4())
+                batch_ids.add(note.id)
+                batch.append(note)
+                if len(batch) >= batch_size:
+                    write_batch()
+        if batch:
+            write_batch()
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    if stats['errors']:
+        logger.warning("Note import skipped %d records: %s", len(stats['errors']), stats['errors'][:3])
+        stats['errors'] = stats['errors'][:MAX_REPORTED_ERRORS]
+    stats['seconds'] = time.perf_counter() - start
+    stats['notes_per_sec'] = stats['imported'] / stats['seconds'] if stats['seconds'] else 0.0
+    return imported, stats
+
+
+def benchmark_import(count: int = 20_000, worker_counts=(0, None)) -> List[Dict]:
+    """Import a folder of Markdown files (one sub-folder per notebook) into a fresh database,
+    then again into the same one to show every note skipped as a duplicate."""
+    from note_fixtures import make_synthetic_notes   # benchmark data stays out of the app's imports
+    notes = make_synthetic_notes(count)
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, 'vault')
+        for i, note in enumerate(notes):
+            folder = os.path.join(source, note.notebook)
+            os.makedirs(folder, exist_ok=True)
+            with open(os.path.join(folder, f'note_{i}.md'), 'w', encoding='utf-8') as f:
+                f.write(f"---\ntags: [bench, {note.notebook.lower()}]\n---\n# {note.title}\n\n{note.content}\n")
+
+        for workers in worker_counts:
+            db = NoteDatabase(os.path.join(directory, f'notes_{workers}.db'))
+            _, first = import_notes(iter_sources([source]), db, workers=workers)
+            _, second = import_notes(iter_sources([source]), db, workers=workers)
+            results.append({'workers': workers if workers is not None else os.cpu_count(),
+                            'notes': first['imported'], 'seconds': first['seconds'],
+                            'notes_per_sec': first['notes_per_sec'],
+                            'reimport_duplicates': second['duplicates'],
+                            'reimport_seconds': second['seconds']})
+    return results
+
+
+if __name__ == "__main__":
+    for row in benchmark_import():
+        print(row)
@@ -0,0 +1,61 @@
+import html
+import re
+from typing import List, Tuple
+
+_WORD_RE = re.compile(r'\w+')
+_QUERY_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def tokenize(text: str) -> List[str]:
+    return _WORD_RE.findall(text.lower())
+
+
+def parse_query(query: str) -> Tuple[List[str], List[List[str]]]:
+    """Split a query into bare terms and "quoted phrases" (each a token list)."""
+    terms, phrases = [], []
+    for phrase, word in _QUERY_RE.findall(query):
+        if phrase:
+            tokens = tokenize(phrase)
+            if len(tokens) > 1:
+                phrases.append(tokens)
+            else:
+                terms.extend(tokens)
+        else:
+            terms.extend(tokenize(word))
+    return terms, phrases
+
+
+def _phrase_pattern(phrase: List[str]):
+    """Matches the phrase's words in order, separated only by non-word characters."""
+    return re.compile(r'(?<!\w)' + r'\W+'.join(map(re.escape, phrase)) + r'(?!\w)', re.IGNORECASE)
+
+
+def highlight_snippet(text: str, query: str, width: int = 160) -> str:
+    """HTML-escaped excerpt around the densest cluster of query matches, with <mark> highlights."""
+    terms, phrases = parse_query(query)
+    wanted = set(terms) | {token for phrase in phrases for token in phrase}
+    hits = [m for m in _WORD_RE.finditer(text)
+            if any(m.group().lower().startswith(term) for term in wanted)]
+    if not hits:
+        excerpt = text[:width]
+        return html.escape(excerpt) + ('...' if len(text) > width else '')
+
+    # Slide a window over the hits and keep the one covering the most of them
+    best_start, best_count, right = hits[0].start(), 0, 0
+    for left, hit in enumerate(hits):
+        while right < len(hits) and hits[right].end() - hit.start() <= width:
+            right += 1
+        if right - left > best_count:
+            best_start, best_count = hit.start(), right - left
+    start = max(0, best_start - width // 4)
+    end = min(len(text), start + width)
+
+    parts, cursor = [], start
+    for hit in hits:
+        if hit.start() < start or hit.end() > end:
+            continue
+        parts.append(html.escape(text[cursor:hit.start()]))
+        parts.append(f"<mark>{html.escape(hit.group())}</mark>")
+        cursor = hit.end()
+    parts.append(html.escape(text[cursor:end]))
+    return ('...' if start > 0 else '') + ''.join(parts) + ('...' if end < len(text) else '')
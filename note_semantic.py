@@ -0,0 +1,435 @@
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from note_db import NoteDatabase, content_loaded
+from note_store import Note
+
+try:
+    import faiss
+except ImportError:  # exact numpy search over the same fp16 vectors
+    faiss = None
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # semantic search is hidden unless an encoder is passed in
+    SentenceTransformer = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = 'all-MiniLM-L6-v2'
+MAX_TEXT_CHARS = 2000      # the model truncates long inputs anyway
+QUERY_CACHE_SIZE = 64
+# Cosine similarity below which a note is unrelated to the query (MiniLM scores noise around 0.0-0.2)
+MIN_SCORE = 0.3
+
+
+def semantic_available() -> bool:
+    return SentenceTransformer is not None
+
+
+class _NumpyVectors:
+    """fp16 vectors in one growable matrix; deletes move the last row into the gap."""
+
+    def __init__(self, dim: int, capacity: int = 1024):
+        self.dim = dim
+        self._matrix = np.zeros((capacity, dim), dtype=np.float16)
+        self._labels = np.zeros(capacity, dtype=np.int64)
+        self._rows = {}   # label -> row
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, labels: np.ndarray, vectors: np.ndarray) -> None:
+        needed = self._size + len(labels)
+        if needed > len(self._matrix):
+            capacity = max(needed, 2 * len(self._matrix))
+            self._matrix = np.resize(self._matrix, (capacity, self.dim))
+            self._labels = np.resize(self._labels, capacity)
+        rows = slice(self._size, needed)
+        self._matrix[rows] = vectors
+        self._labels[rows] = labels
+        for offset, label in enumerate(labels.tolist()):
+            self._rows[label] = self._size + offset
+        self._size = needed
+
+    def remove(self, labels: Iterable[int]) -> None:
+        for label in labels:
+            row = self._rows.pop(label, None)
+            if row is None:
+                continue
+            last = self._size - 1
+            if row != last:
+                self._matrix[row] = self._matrix[last]
+                moved = int(self._labels[last])
+                self._labels[row] = moved
+                self._rows[moved] = row
+            self._size = last
+
+    def vector(self, label: int) -> Optional[np.ndarray]:
+        row = self._rows.get(label)
+        return None if row is None else self._matrix[row].astype(np.float32)
+
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        if not self._size:
+            return []
+        scores = np.empty(self._size, dtype=np.float32)
+        block = 16384   # bounds the float32 copy of the fp16 matrix
+        for start in range(0, self._size, block):
+            end = min(start + block, self._size)
+            scores[start:end] = self._matrix[start:end].astype(np.float32) @ query
+        k = min(k, self._size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(self._labels[row]), float(scores[row])) for row in top]
+
+    def nbytes(self) -> int:
+        return self._size * self.dim * 2
+
+
+class _FaissVectors:
+    """faiss fp16 scalar-quantized inner-product index with stable 64-bit ids."""
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self._quantized = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_fp16,
+                                                     faiss.METRIC_INNER_PRODUCT)
+        self._index = faiss.IndexIDMap2(self._quantized)
+
+    def __len__(self):
+        return self._index.ntotal
+
+    def add(self, labels: np.ndarray, vectors: np.ndarray) -> None:
+        self._index.add_with_ids(np.ascontiguousarray(vectors, dtype=np.float32), labels)
+
+    def remove(self, labels: Iterable[int]) -> None:
+        labels = np.fromiter(labels, dtype=np.int64)
+        if len(labels):
+            self._index.remove_ids(labels)
+
+    def vector(self, label: int) -> Optional[np.ndarray]:
+        try:
+            return self._index.reconstruct(int(label))
+        except RuntimeError:
+            return None
+
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        if not self._index.ntotal:
+            return []
+        scores, labels = self._index.search(query.reshape(1, -1).astype(np.float32), min(k, self._index.ntotal))
+        return [(int(label), float(score)) for label, score in zip(labels[0], scores[0]) if label != -1]
+
+    def nbytes(self) -> int:
+        return self._index.ntotal * self.dim * 2
+
+
+def _make_vectors(dim: int):
+    return _FaissVectors(dim) if faiss is not None else _NumpyVectors(dim)
+
+
+class _EmbeddingCache:
+    """Embeddings stored next to the notes, so reopening a workspace only embeds what changed."""
+
+    def __init__(self, db_path: str, model: str):
+        self.db_path = db_path
+        self.model = model
+        conn = self._connect()
+        try:
+            conn.execute('''CREATE TABLE IF NOT EXISTS note_embeddings (
+                                id TEXT PRIMARY KEY,
+                                model TEXT NOT NULL,
+                                version REAL NOT NULL,
+                                vector BLOB NOT NULL)''')
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def load(self, versions: Dict[str, float]) -> Tuple[List[str], Optional[np.ndarray]]:
+        """Cached vectors still current for `versions` (note id -> updated_ts)."""
+        ids, blobs = [], []
+        conn = self._connect()
+        try:
+            rows = conn.execute('SELECT id, version, vector FROM note_embeddings WHERE model = ?', (self.model,))
+            for note_id, version, blob in rows:
+                if versions.get(note_id) == version:
+                    ids.append(note_id)
+                    blobs.append(blob)
+        finally:
+            conn.close()
+        if not ids:
+            return [], None
+        return ids, np.frombuffer(b''.join(blobs), dtype=np.float16).reshape(len(ids), -1)
+
+    def save(self, rows: List[Tuple[str, float, np.ndarray]]) -> None:
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    'INSERT OR REPLACE INTO note_embeddings (id, model, version, vector) VALUES (?, ?, ?, ?)',
+                    [(note_id, self.model, version, vector.astype(np.float16).tobytes())
+                     for note_id, version, vector in rows])
+        finally:
+            conn.close()
+
+    def delete(self, note_id: str) -> None:
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute('DELETE FROM note_embeddings WHERE id = ?', (note_id,))
+        finally:
+            conn.close()
+
+
+class SemanticNoteIndex:
+    """Embedding index over note titles and bodies for "notes about..." and related-note lookups.
+
+    Changed notes are queued and embedded in batches on a background thread once
+    edits have been quiet for `debounce` seconds, so the page never waits on the
+    model; the same thread loads the model at startup, and searches return nothing
+    until ready() is true. Vectors are unit-normalised and kept as fp16 (faiss when
+    installed), so inner product is cosine similarity.
+    """
+
+    def __init__(self, db: NoteDatabase, model_name: str = DEFAULT_MODEL, batch_size: int = 64,
+                 debounce: float = 1.0, encoder: Callable[[List[str]], np.ndarray] = None):
+        self.db = db
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.debounce = debounce
+        self._encoder = encoder
+        self._model = None
+        self._model_ready = threading.Event()
+        if encoder is not None:
+            self._model_ready.set()
+        self._cache = _EmbeddingCache(db.db_path, model_name)
+        self._vectors = None
+        self._labels: Dict[str, int] = {}      # note id -> vector label
+        self._embedded: Dict[str, float] = {}  # note id -> updated_ts its vector was made from
+        self._note_ids: Dict[int, str] = {}
+        self._next_label = 0
+        self._versions: Dict[str, float] = {}  # latest updated_ts of every live note
+        self._pending: Dict[str, Tuple[str, Optional[str]]] = {}   # note id -> (title, content or None)
+        self._last_change = 0.0
+        self._queries = OrderedDict()
+        self._counters = {'embedded': 0, 'encode_seconds': 0.0, 'failures': 0}
+        self._cond = threading.Condition()
+        threading.Thread(target=self._run, name=f'note-embed-{db.owner}', daemon=True).start()
+
+    def sync(self, notes: Iterable[Note]) -> None:
+        """Start tracking a workspace: reuse cached vectors that are current and queue the rest."""
+        notes = list(notes)
+        with self._cond:
+            stale = {note.id: note.updated_ts for note in notes
+                     if self._embedded.get(note.id) != note.updated_ts}
+        cached_ids, vectors = self._cache.load(stale) if stale else ([], None)
+        with self._cond:
+            self._versions.update((note.id, note.updated_ts) for note in notes)
+            if cached_ids:
+                self._store(cached_ids, vectors, [stale[note_id] for note_id in cached_ids])
+            cached = set(cached_ids)
+            for note in notes:
+                if note.id in stale and note.id not in cached:
+                    self._pending[note.id] = (note.title, note.content if content_loaded(note) else None)
+            self._cond.notify()
+
+    def update(self, note: Note) -> None:
+        self.update_many([note])
+
+    def update_many(self, notes: Iterable[Note]) -> None:
+        """Queue notes whose title or content changed; bodies not in memory are read by the worker."""
+        with self._cond:
+            for note in notes:
+                self._versions[note.id] = note.updated_ts
+                self._pending[note.id] = (note.title, note.content if content_loaded(note) else None)
+            self._last_change = time.monotonic()
+            self._cond.notify()
+
+    def remove(self, note_id: str) -> None:
+        with self._cond:
+            self._versions.pop(note_id, None)
+            self._pending.pop(note_id, None)
+            self._drop(note_id)
+        self._cache.delete(note_id)
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def ready(self) -> bool:
+        """True once the model is loaded and queries can be encoded."""
+        return self._model_ready.is_set()
+
+    def search(self, query: str, limit: int = 20, min_score: float = MIN_SCORE) -> List[Tuple[str, float]]:
+        """(note id, cosine similarity) of the notes closest in meaning to the query, at least min_score."""
+        query = query.strip()
+        if not query or not self.ready():
+            return []
+        with self._cond:
+            vector = self._queries.get(query)
+            if vector is not None:
+                self._queries.move_to_end(query)
+        if vector is None:
+            # Encoded outside the lock; reruns with the same query reuse it
+            vector = self._encode([query])[0]
+        with self._cond:
+            self._queries[query] = vector
+            while len(self._queries) > QUERY_CACHE_SIZE:
+                self._queries.popitem(last=False)
+            if self._vectors is None:
+                return []
+            return [(self._note_ids[label], score) for label, score in self._vectors.search(vector, limit)
+                    if score >= min_score]
+
+    def related(self, note_id: str, limit: int = 5, min_score: float = MIN_SCORE) -> List[Tuple[str, float]]:
+        """Nearest notes to an already embedded note; no model call."""
+        with self._cond:
+            label = self._labels.get(note_id)
+            if label is None:
+                return []
+            vector = self._vectors.vector(label)
+            hits = self._vectors.search(vector, limit + 1)
+            return [(self._note_ids[hit], score) for hit, score in hits
+                    if hit != label and score >= min_score][:limit]
+
+    def stats(self) -> Dict:
+        with self._cond:
+            counters = dict(self._counters)
+            return {
+                'embedded': len(self._labels),
+                'pending': len(self._pending),
+                'backend': 'faiss' if faiss is not None else 'numpy',
+                'index_bytes': self._vectors.nbytes() if self._vectors is not None else 0,
+                'notes_per_sec': (counters['embedded'] / counters['encode_seconds']
+                                  if counters['encode_seconds'] else 0.0),
+                'failures': counters['failures'],
+            }
+
+    def _load_model(self) -> None:
+        """Load the model on the worker thread (seconds, and a download on first use)."""
+        if self._model_ready.is_set():
+            return
+        start = time.perf_counter()
+        self._model = SentenceTransformer(self.model_name)
+        self._model_ready.set()
+        logger.info("Loaded %s in %.1fs", self.model_name, time.perf_counter() - start)
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        if self._encoder is not None:
+            vectors = np.asarray(self._encoder(texts), dtype=np.float32)
+        else:
+            vectors = self._model.encode(texts, batch_size=self.batch_size, convert_to_numpy=True,
+                                         show_progress_bar=False).astype(np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def _store(self, note_ids: List[str], vectors: np.ndarray, versions: List[float]) -> None:
+        """Replace the vectors of these notes (called with the lock held)."""
+        if self._vectors is None:
+            self._vectors = _make_vectors(vectors.shape[1])
+        for note_id in note_ids:
+            self._drop(note_id)
+        labels = np.arange(self._next_label, self._next_label + len(note_ids), dtype=np.int64)
+        self._next_label += len(note_ids)
+        for note_id, label, version in zip(note_ids, labels.tolist(), versions):
+            self._labels[note_id] = label
+            self._note_ids[label] = note_id
+            self._embedded[note_id] = version
+        self._vectors.add(labels, vectors)
+
+    def _drop(self, note_id: str) -> None:
+        label = self._labels.pop(note_id, None)
+        self._embedded.pop(note_id, None)
+        if label is not None:
+            del self._note_ids[label]
+            self._vectors.remove([label])
+
+    def _next_batch(self) -> List[Tuple[str, float, str, Optional[str]]]:
+        with self._cond:
+            while True:
+                if self._pending:
+                    wait = self._last_change + self.debounce - time.monotonic()
+                    if wait <= 0 or len(self._pending) >= self.batch_size:
+                        break
+                    self._cond.wait(wait)
+                else:
+                    self._cond.wait()
+            batch = []
+            for note_id in list(self._pending)[:self.batch_size]:
+                title, content = self._pending.pop(note_id)
+                batch.append((note_id, self._versions[note_id], title, content))
+            return batch
+
+    def _run(self) -> None:
+        try:
+            self._load_model()
+        except Exception:
+            # Retried with the first batch; searches stay empty until then
+            logger.exception("Loading %s failed", self.model_name)
+        while True:
+            batch = self._next_batch()
+            try:
+                self._load_model()
+                missing = [note_id for note_id, _, _, content in batch if content is None]
+                bodies = {row['id']: row['content'] for row in self.db.iter_notes(note_ids=missing)} if missing else {}
+                texts = [f"{title}\n\n{content if content is not None else bodies.get(note_id, '')}"[:MAX_TEXT_CHARS]
+                         for note_id, _, title, content in batch]
+                start = time.perf_counter()
+                vectors = self._encode(texts)
+                elapsed = time.perf_counter() - start
+            except Exception:
+                logger.exception("Embedding %d notes failed", len(batch))
+                with self._cond:
+                    self._counters['failures'] += len(batch)
+                continue
+
+            with self._cond:
+                # Skip notes deleted or edited again while this batch was being encoded
+                current = [i for i, (note_id, version, _, _) in enumerate(batch)
+                           if self._versions.get(note_id) == version]
+                if current:
+                    self._store([batch[i][0] for i in current], vectors[current], [batch[i][1] for i in current])
+                self._counters['embedded'] += len(batch)
+                self._counters['encode_seconds'] += elapsed
+            try:
+                self._cache.save([(batch[i][0], batch[i][1], vectors[i]) for i in current])
+            except sqlite3.Error:
+                logger.exception("Could not cache note embeddings")
+
+
+def benchmark_vectors(counts=(10_000, 100_000), dim: int = 384, queries: int = 100, seed: int = 7) -> List[Dict]:
+    """Add throughput, memory and top-10 query latency of the vector store, with random unit vectors."""
+    rng = np.random.default_rng(seed)
+    results = []
+    for count in counts:
+        vectors = rng.standard_normal((count, dim), dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        store = _make_vectors(dim)
+        start = time.perf_counter()
+        for offset in range(0, count, 1000):
+            chunk = vectors[offset:offset + 1000]
+            store.add(np.arange(offset, offset + len(chunk), dtype=np.int64), chunk)
+        add_s = time.perf_counter() - start
+
+        probes = vectors[rng.integers(0, count, queries)]
+        start = time.perf_counter()
+        for probe in probes:
+            store.search(probe, 10)
+        query_ms = (time.perf_counter() - start) * 1000 / queries
+        results.append({'backend': type(store).__name__, 'vectors': count, 'adds_per_sec': count / add_s,
+                        'bytes_per_note': store.nbytes() / count,
+                        'float32_bytes_per_note': dim * 4, 'query_ms': query_ms})
+    return results
+
+
+if __name__ == "__main__":
+    for row in benchmark_vectors():
+        print(row)
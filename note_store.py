@@ -0,0 +1,335 @@
+import bisect
+import json
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+FIELDS = ("id", "title", "content", "notebook", "tags", "color", "created_at", "updated_at", "pinned")
+
+
+def _epoch(timestamp: str) -> float:
+    return datetime.fromisoformat(timestamp).timestamp()
+
+
+def _intern_tags(tags) -> List[str]:
+    return [sys.intern(tag) for tag in tags] if tags else []
+
+
+class Note:
+    """A note with slot storage instead of a per-instance __dict__.
+
+    Timestamps are kept as epoch seconds (created_ts/updated_ts), parsed once when
+    set; created_at/updated_at read and write them as ISO strings for storage and
+    export. The ISO string is kept once known (as loaded, or formatted on first
+    read) and dropped when the epoch value changes, so exports don't re-format
+    every timestamp. Notebook and tag names are interned, so thousands of notes
+    share one string per name.
+    """
+
+    __slots__ = ('id', 'title', 'content', '_notebook', '_tags', 'color',
+                 '_created_ts', '_updated_ts', '_created_at', '_updated_at', 'pinned')
+
+    def __init__(self, title="", content="", notebook="Default", tags=None, color="#1E88E5"):
+        self.id = str(uuid.uuid4())
+        self.title = title
+        self.content = content
+        self.notebook = notebook
+        self.tags = tags
+        self.color = color
+        self.created_ts = self.updated_ts = time.time()
+        self.pinned = False
+
+    @property
+    def notebook(self) -> str:
+        return self._notebook
+
+    @notebook.setter
+    def notebook(self, value: str):
+        self._notebook = sys.intern(value)
+
+    @property
+    def tags(self) -> List[str]:
+        return self._tags
+
+    @tags.setter
+    def tags(self, value):
+        self._tags = _intern_tags(value)
+
+    @property
+    def created_ts(self) -> float:
+        return self._created_ts
+
+    @created_ts.setter
+    def created_ts(self, value: float):
+        self._created_ts = value
+        self._created_at = None
+
+    @property
+    def updated_ts(self) -> float:
+        return self._updated_ts
+
+    @updated_ts.setter
+    def updated_ts(self, value: float):
+        self._updated_ts = value
+        self._updated_at = None
+
+    @property
+    def created_at(self) -> str:
+        if self._created_at is None:
+            self._created_at = datetime.fromtimestamp(self._created_ts).isoformat()
+        return self._created_at
+
+    @created_at.setter
+    def created_at(self, value: str):
+        self._created_ts = _epoch(value)
+        self._created_at = value
+
+    @property
+    def updated_at(self) -> str:
+        if self._updated_at is None:
+            self._updated_at = datetime.fromtimestamp(self._updated_ts).isoformat()
+        return self._updated_at
+
+    @updated_at.setter
+    def updated_at(self, value: str):
+        self._updated_ts = _epoch(value)
+        self._updated_at = value
+
+    def to_dict(self):
+        """ISO-timestamped dict for export and interchange."""
+        return {"id": self.id, "title": self.title, "content": self.content, "notebook": self._notebook,
+                "tags": self._tags, "color": self.color, "created_at": self.created_at,
+                "updated_at": self.updated_at, "pinned": self.pinned}
+
+    @classmethod
+    def from_dict(cls, data):
+        # Skips __init__: no throwaway uuid or clock read when the record has them
+        note = cls.__new__(cls)
+        note.id = data.get("id") or str(uuid.uuid4())
+        note.title = data.get("title", "")
+        note.content = data.get("content", "")
+        note.notebook = data.get("notebook", "Default")
+        note.tags = data.get("tags", [])
+        note.color = sys.intern(data.get("color", "#1E88E5"))
+        created_at = data.get("created_at")
+        if created_at:
+            note.created_at = created_at
+        else:
+            note.created_ts = time.time()
+        updated_at = data.get("updated_at")
+        if updated_at:
+            note.updated_at = updated_at
+        else:
+            note.updated_ts = note.created_ts
+        note.pinned = data.get("pinned", False)
+        return note
+
+
+def sort_key(note: Note):
+    """Pinned first, then most recently updated; the id keeps keys unique."""
+    return (not note.pinned, -note.updated_ts, note.id)
+
+
+class NoteRepository:
+    """Notes by id, with per-notebook and per-tag indexes kept in display order.
+
+    Every index is a sorted list of sort keys maintained with bisect, so lookups are
+    O(1), edits are O(log n + index size) and listing a notebook or tag only touches
+    the notes in it. Tag lookups are case-insensitive.
+    """
+
+    def __init__(self, notes: List[Note] = None):
+        self._notes: Dict[str, Note] = {}
+        self._keys = {}          # note id -> current sort key
+        self._order = []         # every note
+        self._by_notebook = {}   # notebook -> sorted keys
+        self._by_tag = {}        # lowercased tag -> sorted keys
+        self._tag_names = {}     # lowercased tag -> display name
+        if notes:
+            self.add_many(notes)
+
+    def __len__(self):
+        return len(self._notes)
+
+    def __contains__(self, note_id):
+        return note_id in self._notes
+
+    def __iter__(self) -> Iterator[Note]:
+        return iter(self._resolve(self._order))
+
+    def _resolve(self, keys) -> List[Note]:
+        return [self._notes[key[-1]] for key in keys]
+
+    def _index(self, note: Note) -> None:
+        key = sort_key(note)
+        self._keys[note.id] = key
+        bisect.insort(self._order, key)
+        bisect.insort(self._by_notebook.setdefault(note.notebook, []), key)
+        for tag in set(t.lower() for t in note.tags):
+            bisect.insort(self._by_tag.setdefault(tag, []), key)
+        for tag in note.tags:
+            self._tag_names.setdefault(tag.lower(), tag)
+
+    def _unindex(self, note: Note) -> None:
+        key = self._keys.pop(note.id)
+        _discard(self._order, key)
+        _discard_from(self._by_notebook, note.notebook, key)
+        for tag in set(t.lower() for t in note.tags):
+            if _discard_from(self._by_tag, tag, key):
+                self._tag_names.pop(tag, None)
+
+    def add(self, note: Note) -> Note:
+        if note.id in self._notes:
+            raise ValueError(f"Note {note.id} already exists")
+        self._notes[note.id] = note
+        self._index(note)
+        return note
+
+    def add_many(self, notes: List[Note]) -> None:
+        """Bulk insert: append everything, then sort each touched index once."""
+        touched = set()
+        for note in notes:
+            if note.id in self._notes:
+                raise ValueError(f"Note {note.id} already exists")
+            self._notes[note.id] = note
+            key = self._keys[note.id] = sort_key(note)
+            self._order.append(key)
+            self._by_notebook.setdefault(note.notebook, []).append(key)
+            touched.add(('notebook', note.notebook))
+            for tag in set(t.lower() for t in note.tags):
+                self._by_tag.setdefault(tag, []).append(key)
+                touched.add(('tag', tag))
+            for tag in note.tags:
+                self._tag_names.setdefault(tag.lower(), tag)
+        self._order.sort()
+        for kind, name in touched:
+            (self._by_notebook if kind == 'notebook' else self._by_tag)[name].sort()
+
+    def get(self, note_id: str) -> Optional[Note]:
+        return self._notes.get(note_id)
+
+    def update(self, note_id: str, updates: Dict) -> Optional[Note]:
+        """Apply field updates, bump updated_at and re-position the note in every index."""
+        note = self._notes.get(note_id)
+        if note is None:
+            return None
+        self._unindex(note)
+        for key, value in updates.items():
+            setattr(note, key, value)
+        note.updated_ts = time.time()
+        self._index(note)
+        return note
+
+    def delete(self, note_id: str) -> Optional[Note]:
+        note = self._notes.pop(note_id, None)
+        if note is not None:
+            self._unindex(note)
+        return note
+
+    def list_notebook(self, notebook: str, offset: int = 0, limit: int = None) -> List[Note]:
+        keys = self._by_notebook.get(notebook, [])
+        return self._resolve(keys[offset:None if limit is None else offset + limit])
+
+    def list_tag(self, tag: str, offset: int = 0, limit: int = None) -> List[Note]:
+        keys = self._by_tag.get(tag.strip().lower(), [])
+        return self._resolve(keys[offset:None if limit is None else offset + limit])
+
+    def count_notebook(self, notebook: str) -> int:
+        return len(self._by_notebook.get(notebook, ()))
+
+    def count_tag(self, tag: str) -> int:
+        return len(self._by_tag.get(tag.strip().lower(), ()))
+
+    def tags(self) -> List[str]:
+        return sorted(self._tag_names.values())
+
+    def notebooks(self) -> List[str]:
+        return list(self._by_notebook)
+
+
+def _discard(keys: list, key) -> None:
+    index = bisect.bisect_left(keys, key)
+    if index < len(keys) and keys[index] == key:
+        keys.pop(index)
+
+
+def _discard_from(index: Dict[str, list], name: str, key) -> bool:
+    """Remove key from index[name], dropping the entry once empty; True if it was dropped."""
+    keys = index.get(name)
+    if keys is None:
+        return False
+    _discard(keys, key)
+    if not keys:
+        del index[name]
+        return True
+    return False
+
+
+class _DictNote:
+    """The previous representation (per-instance __dict__, ISO timestamp strings), for benchmark_notes."""
+
+    def __init__(self, data):
+        self.id = data["id"]
+        self.title = data["title"]
+        self.content = data["content"]
+        self.notebook = data["notebook"]
+        self.tags = data["tags"]
+        self.color = data["color"]
+        self.created_at = data["created_at"]
+        self.updated_at = data["updated_at"]
+        self.pinned = data["pinned"]
+
+    def to_dict(self):
+        return {"id": self.id, "title": self.title, "content": self.content, "notebook": self.notebook,
+                "tags": self.tags, "color": self.color, "created_at": self.created_at,
+                "updated_at": self.updated_at, "pinned": self.pinned}
+
+
+def benchmark_notes(count: int = 100_000) -> List[Dict]:
+    """Memory per note, sort-key and to_dict() export throughput: old dict-based notes vs slotted ones.
+
+    Records come from json.loads, like rows read back from storage, so every
+    notebook and tag name starts out as its own string object.
+    """
+    base = datetime(2024, 1, 1).timestamp()
+    payload = json.dumps([{
+        "id": str(uuid.UUID(int=i)), "title": f"Note {i}", "content": "",
+        "notebook": ("Default", "Work", "Personal")[i % 3], "tags": ["study", f"topic{i % 50}"],
+        "color": "#1E88E5", "created_at": datetime.fromtimestamp(base + i).isoformat(),
+        "updated_at": datetime.fromtimestamp(base + 2 * i).isoformat(), "pinned": i % 100 == 0,
+    } for i in range(count)])
+
+    def old_sort_key(note):
+        return (not note.pinned, -datetime.fromisoformat(note.updated_at).timestamp(), note.id)
+
+    results = []
+    for name, build, key in (("dict", _DictNote, old_sort_key), ("slots", Note.from_dict, sort_key)):
+        tracemalloc.start()
+        records = json.loads(payload)
+        start = time.perf_counter()
+        notes = [build(record) for record in records]
+        build_s = time.perf_counter() - start
+        del records
+        # What the notes keep alive, strings included, once the parsed records are gone
+        used, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        sorted(notes, key=key)
+        sort_s = time.perf_counter() - start
+        start = time.perf_counter()
+        json.dumps([note.to_dict() for note in notes])
+        serialize_s = time.perf_counter() - start
+        results.append({'model': name, 'notes': count, 'bytes_per_note': used / count,
+                        'build_per_sec': count / build_s, 'sort_ms': sort_s * 1000,
+                        'serialize_per_sec': count / serialize_s})
+        del notes
+    return results
+
+
+if __name__ == "__main__":
+    for row in benchmark_notes():
+        print(row)
@@ -8,11 +8,12 @@ import google.generativeai as genai  # Ensure you have Gemini AI configured
 
 import streamlit as st
 import google.generativeai as genai
-from datetime import datetime
 import json
 import os
 import re
+import uuid
 import pandas as pd
+from quiz_history_store import QuizHistoryStore
 
 # # Check if the user is logged in
 # if 'signed_in' not in st.session_state or not st.session_state.signed_in:
@@ -27,6 +28,21 @@ genai.configure(api_key=API_KEY)
 
 model = genai.GenerativeModel("gemini-pro")
 
+HISTORY_PAGE_SIZE = 5
+
+@st.cache_resource
+def get_history_store():
+    """Share one quiz history store across reruns and sessions."""
+    return QuizHistoryStore()
+
+def current_user_id():
+    """The signed-in user, or an id private to this browser session for anonymous visitors"""
+    if st.session_state.get('username'):
+        return st.session_state.username
+    if 'anonymous_id' not in st.session_state:
+        st.session_state.anonymous_id = f"anonymous-{uuid.uuid4().hex}"
+    return st.session_state.anonymous_id
+
 def set_page_config():
     st.set_page_config(
         page_title="🇦​​🇮​ ​🇶​​🇺​​🇮​​🇿​ ​🇬​​🇪​​🇳​​🇪​​🇷​​🇦​​🇹​​🇴​​🇷​",
@@ -43,10 +59,12 @@ def initialize_session():
         st.session_state.user_answers = {}
     if 'quiz_completed' not in st.session_state:
         st.session_state.quiz_completed = False
-    if 'quiz_history' not in st.session_state:
-        st.session_state.quiz_history = []  # Changed to list instead of QuizHistory object
+    if 'quiz_history_page' not in st.session_state:
+        st.session_state.quiz_history_page = 0
     if 'current_topic' not in st.session_state:
         st.session_state.current_topic = ""
+    if 'current_difficulty' not in st.session_state:
+        st.session_state.current_difficulty = ""
 
 
 
@@ -223,12 +241,14 @@ def display_results():
             st.info(f"**Explanation:** {answer['explanation']}")
 
     # Save to history
-    st.session_state.quiz_history.append({
-        'topic': st.session_state.current_topic,
-        'score': score,
-        'total': total,
-        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    })
+    get_history_store().record_attempt(
+        current_user_id(),
+        st.session_state.current_topic,
+        score,
+        total,
+        difficulty=st.session_state.current_difficulty
+    )
+    st.session_state.quiz_history_page = 0
 
     # Action buttons
     col1, col2 = st.columns(2)
@@ -244,24 +264,52 @@ def display_results():
             st.session_state.quiz_completed = False
             st.experimental_rerun()
 
+def display_history_sidebar():
+    """Show one page of stored quiz history plus the daily score trend."""
+    store = get_history_store()
+    user_id = current_user_id()
+
+    st.markdown("### 📊 Quiz History")
+    total_attempts = store.count_attempts(user_id)
+    if not total_attempts:
+        st.info("No quiz history yet!")
+        return
+
+    last_page = (total_attempts - 1) // HISTORY_PAGE_SIZE
+    page = min(st.session_state.quiz_history_page, last_page)
+    for quiz in store.recent_attempts(user_id, limit=HISTORY_PAGE_SIZE, offset=page * HISTORY_PAGE_SIZE):
+        st.markdown(f"""
+            **Topic:** {quiz['topic']}  
+            **Score:** {quiz['score']}/{quiz['total']}  
+            **Date:** {quiz['timestamp']}  
+            ---
+        """)
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if st.button("◀", key="history_prev", disabled=page == 0):
+            st.session_state.quiz_history_page = page - 1
+            st.rerun()
+    with col2:
+        st.caption(f"Page {page + 1} of {last_page + 1}")
+    with col3:
+        if st.button("▶", key="history_next", disabled=page >= last_page):
+            st.session_state.quiz_history_page = page + 1
+            st.rerun()
+
+    trend = store.score_trend(user_id)
+    if trend:
+        st.markdown("#### 📈 Score Trend")
+        trend_df = pd.DataFrame(trend).set_index('day')
+        st.line_chart(trend_df['avg_percentage'])
+
 def main():
     set_page_config()
     initialize_session()
 
     # Sidebar with history
     with st.sidebar:
-        st.markdown("### 📊 Quiz History")
-        if st.session_state.quiz_history:
-            # Show last 5 quizzes from the list
-            for quiz in list(reversed(st.session_state.quiz_history))[:5]:
-                st.markdown(f"""
-                    **Topic:** {quiz['topic']}  
-                    **Score:** {quiz['score']}/{quiz['total']}  
-                    **Date:** {quiz['timestamp']}  
-                    ---
-                """)
-        else:
-            st.info("No quiz history yet!")
+        display_history_sidebar()
 
     # Main content
     st.title("🎓 AI-Powered Quiz Generator")
@@ -291,6 +339,7 @@ def main():
             st.warning("Please enter a topic!")
         else:
             st.session_state.current_topic = topic
+            st.session_state.current_difficulty = difficulty
             with st.spinner("🤖 Generating your quiz..."):
                 st.session_state.quiz_questions = generate_mcq(topic, difficulty, num_questions)
                 if st.session_state.quiz_questions:
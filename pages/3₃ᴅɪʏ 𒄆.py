@@ -1,11 +1,21 @@
 import streamlit as st
-import google.generativeai as genai
 import json
 from typing import List, Dict
-import ast
 import random
 import textwrap
 import re
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import pandas as pd
+from code_sandbox import SandboxPool
+from solution_benchmark import compare_with_reference
+from challenge_pool import ChallengePool, ChallengeRefiller, validate_challenge
+from code_policy import CodePolicy
+from gemini_registry import GeminiRegistry
 
 
 
@@ -19,6 +29,84 @@ import re
 
 
 
+TEST_STAGE_TIMEOUT = 30
+REVIEW_STAGE_TIMEOUT = 45
+
+
+@st.cache_resource
+def get_sandbox_pool() -> SandboxPool:
+    """One pre-started sandbox pool per server process, shared by every session"""
+    return SandboxPool()
+
+
+@st.cache_resource
+def get_evaluation_executor() -> ThreadPoolExecutor:
+    """Threads that run the test and review stages of a submission side by side"""
+    return ThreadPoolExecutor(max_workers=8, thread_name_prefix='evaluate')
+
+
+class ReviewCache:
+    """Small thread-safe LRU of code reviews keyed by challenge + code hash"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(code: str, challenge_desc: str) -> str:
+        return hashlib.sha256(f"{challenge_desc}\0{code}".encode()).hexdigest()
+
+    def get(self, key: str):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key: str, review: Dict) -> None:
+        with self._lock:
+            self._entries[key] = review
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+@st.cache_resource
+def get_review_cache() -> ReviewCache:
+    return ReviewCache()
+
+
+@st.cache_resource
+def get_gemini_registry() -> GeminiRegistry:
+    return GeminiRegistry()
+
+
+@st.cache_resource
+def get_code_policy() -> CodePolicy:
+    return CodePolicy()
+
+
+def current_user_id():
+    """The signed-in user, or an id private to this browser session for anonymous visitors"""
+    if st.session_state.get('username'):
+        return st.session_state.username
+    if 'anonymous_id' not in st.session_state:
+        st.session_state.anonymous_id = f"anonymous-{uuid.uuid4().hex}"
+    return st.session_state.anonymous_id
+
+
+@st.cache_resource
+def get_challenge_pool() -> ChallengePool:
+    return ChallengePool()
+
+
+@st.cache_resource
+def get_challenge_refiller() -> ChallengeRefiller:
+    """Background generation that keeps each watched topic/difficulty bucket stocked"""
+    return ChallengeRefiller(get_challenge_pool())
+
+
 class CodingChallengeManager:
     def __init__(self):
         """Initialize the coding challenge manager with improved configuration"""
@@ -52,31 +140,53 @@ class CodingChallengeManager:
             st.stop()
 
     def configure_gemini(self, api_key: str) -> None:
-        """Configure Gemini API with improved error handling"""
+        """Configure Gemini API, reusing the validated handle for this key when there is one"""
+        start = time.perf_counter()
         try:
-            # Configure with safety options
-            genai.configure(api_key=api_key, transport="rest")
-            
-            # Initialize model with safety settings
-            model = genai.GenerativeModel('gemini-pro')
-            
-            # Test the configuration with a simple prompt
-            test_prompt = "Return the word 'test' if you can read this."
-            try:
-                response = model.generate_content(test_prompt)
-                if response and response.text:
-                    self.model = model
-                    st.sidebar.success("✅ API Configuration Successful!")
-                else:
-                    raise Exception("Failed to get valid response from API")
-            except Exception as e:
-                raise Exception(f"API test failed: {str(e)}")
-                
+            handle, cached = get_gemini_registry().get(api_key)
         except Exception as e:
             st.sidebar.error(f"❌ API Configuration Failed: {str(e)}")
             st.stop()
+
+        self.model = handle.model
+        setup_ms = (time.perf_counter() - start) * 1000
+        st.sidebar.success("✅ API Configuration Successful!")
+        if cached:
+            st.sidebar.metric(
+                "Gemini setup latency",
+                f"{setup_ms:.1f} ms",
+                delta=f"-{max(handle.validation_ms - setup_ms, 0):.0f} ms vs live probe",
+                delta_color="inverse"
+            )
+        else:
+            st.sidebar.metric("Gemini setup latency", f"{setup_ms:.0f} ms")
+
     def generate_challenge(self, topic: str, difficulty: str) -> Dict:
-        """Generate coding challenge using Gemini API with improved JSON handling"""
+        """Serve a challenge from the local pool, generating one inline only when the pool is empty"""
+        user_id = current_user_id()
+        pool = get_challenge_pool()
+        refiller = get_challenge_refiller()
+
+        challenge = pool.take(user_id, topic, difficulty)
+        if challenge is None:
+            try:
+                challenge = self._request_challenge(topic, difficulty)
+            except Exception as e:
+                st.error(f"Error generating challenge: {str(e)}")
+                return self._get_fallback_challenge(difficulty)
+            challenge_id = pool.add(topic, difficulty, challenge)
+            if challenge_id is not None:
+                pool.mark_served(user_id, challenge_id)
+
+        # Top the bucket back up in the background for the next click
+        refiller.watch(user_id, topic, difficulty, self._request_challenge)
+        return challenge
+
+    def _request_challenge(self, topic: str, difficulty: str) -> Dict:
+        """Generate coding challenge using Gemini API with improved JSON handling.
+
+        Runs on refill threads as well, so it raises ValueError instead of calling st.
+        """
         concepts = {
             'beginner': ['loops', 'conditionals', 'basic data structures', 'string manipulation', 'basic math operations'],
             'intermediate': ['recursion', 'advanced data structures', 'algorithms', 'file handling', 'object-oriented programming'],
@@ -96,70 +206,44 @@ class CodingChallengeManager:
             ],
             "hints": ["hint1", "hint2"],
             "constraints": ["constraint1", "constraint2"],
-            "examples": ["example1", "example2"]
+            "examples": ["example1", "example2"],
+            "reference_solution": "def solution(input):\\n    efficient model answer"
         }}
         Do not include any text before or after the JSON object. No trailing commas in arrays."""
 
-        try:
-            # Get response from Gemini
-            response = self.model.generate_content(prompt)
-            response_text = response.text.strip()
+        # Get response from Gemini
+        response = self.model.generate_content(prompt)
+        response_text = response.text.strip()
+        
+        # Clean up common JSON issues
+        def clean_json(json_str):
+            # Remove any text before the first {
+            start = json_str.find('{')
+            end = json_str.rfind('}') + 1
+            if start == -1 or end == 0:
+                raise ValueError("No JSON object found")
+            json_str = json_str[start:end]
             
-            # Clean up common JSON issues
-            def clean_json(json_str):
-                # Remove any text before the first {
-                start = json_str.find('{')
-                end = json_str.rfind('}') + 1
-                if start == -1 or end == 0:
-                    raise ValueError("No JSON object found")
-                json_str = json_str[start:end]
-                
-                # Remove trailing commas in arrays
-                json_str = re.sub(r',(\s*[\]}])', r'\1', json_str)
-                
-                # Fix possible missing quotes around keys
-                json_str = re.sub(r'(\w+)(:)', r'"\1"\2', json_str)
-                
-                return json_str
+            # Remove trailing commas in arrays
+            json_str = re.sub(r',(\s*[\]}])', r'\1', json_str)
+            
+            # Fix possible missing quotes around keys
+            json_str = re.sub(r'(\w+)(:)', r'"\1"\2', json_str)
+            
+            return json_str
 
+        try:
+            # First try direct JSON parsing
+            challenge_data = json.loads(response_text)
+        except json.JSONDecodeError:
+            # If direct parsing fails, try cleaning the JSON
             try:
-                # First try direct JSON parsing
-                challenge_data = json.loads(response_text)
-            except json.JSONDecodeError:
-                # If direct parsing fails, try cleaning the JSON
-                cleaned_json = clean_json(response_text)
-                try:
-                    challenge_data = json.loads(cleaned_json)
-                except json.JSONDecodeError as e:
-                    st.error("Failed to parse challenge after cleaning. Error details:")
-                    st.error(str(e))
-                    st.code(cleaned_json)
-                    return self._get_fallback_challenge(difficulty)
-
-            # Validate the challenge data
-            required_fields = ['challenge', 'starter_code', 'test_cases', 'hints', 'constraints', 'examples']
-            if not all(field in challenge_data for field in required_fields):
-                missing_fields = [field for field in required_fields if field not in challenge_data]
-                st.error(f"Missing required fields: {', '.join(missing_fields)}")
-                return self._get_fallback_challenge(difficulty)
-
-            # Ensure lists have at least one item
-            for field in ['test_cases', 'hints', 'constraints', 'examples']:
-                if not isinstance(challenge_data[field], list) or not challenge_data[field]:
-                    st.error(f"Field '{field}' must be a non-empty list")
-                    return self._get_fallback_challenge(difficulty)
-
-            # Validate test cases structure
-            for test_case in challenge_data['test_cases']:
-                if not all(k in test_case for k in ['input', 'expected', 'explanation']):
-                    st.error("Invalid test case format")
-                    return self._get_fallback_challenge(difficulty)
+                challenge_data = json.loads(clean_json(response_text))
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Failed to parse challenge after cleaning: {str(e)}")
 
-            return challenge_data
-
-        except Exception as e:
-            st.error(f"Error generating challenge: {str(e)}")
-            return self._get_fallback_challenge(difficulty)
+        # Validate the challenge data
+        return validate_challenge(challenge_data)
 
     def _get_fallback_challenge(self, difficulty: str) -> Dict:
             """Provide fallback coding challenges with multiple variations"""
@@ -277,7 +361,8 @@ class CodingChallengeManager:
                     ],
                     "hints": ["Consider converting numbers to strings to check digits", "Use list comprehension for elegant solution"],
                     "constraints": ["Input will be a positive integer", "Return results as a string representation of a list"],
-                    "examples": ["For input 5, check numbers 1-5 and return those with even digit sums"]
+                    "examples": ["For input 5, check numbers 1-5 and return those with even digit sums"],
+                    "reference_solution": "def solution(number):\n    return str([i for i in range(1, int(number) + 1) if sum(int(d) for d in str(i)) % 2 == 0])"
                 },
                 {
                     "challenge": "Create a function that generates a pattern of alternating characters",
@@ -288,7 +373,8 @@ class CodingChallengeManager:
                     ],
                     "hints": ["Consider using nested loops", "Remember to alternate starting character for each row"],
                     "constraints": ["Input will be a positive integer", "Return pattern as a string with newlines"],
-                    "examples": ["For input 2, create a 2x2 grid of alternating X and O"]
+                    "examples": ["For input 2, create a 2x2 grid of alternating X and O"],
+                    "reference_solution": "def solution(n):\n    n = int(n)\n    return '\\n'.join(''.join('XO'[(r + c) % 2] for c in range(n)) for r in range(n))"
                 }
             ],
             'intermediate': [
@@ -301,7 +387,8 @@ class CodingChallengeManager:
                     ],
                     "hints": ["Keep track of current character and count", "Handle transitions between different characters"],
                     "constraints": ["Input will be uppercase letters only", "Output format: count followed by character"],
-                    "examples": ["AAAA becomes 4A", "AABBB becomes 2A3B"]
+                    "examples": ["AAAA becomes 4A", "AABBB becomes 2A3B"],
+                    "reference_solution": "from itertools import groupby\n\ndef solution(text):\n    return ''.join(f'{len(list(group))}{char}' for char, group in groupby(text))"
                 }
             ],
             'advanced': [
@@ -314,7 +401,8 @@ class CodingChallengeManager:
                     ],
                     "hints": ["Consider using dynamic programming", "Keep track of sequences ending at each position"],
                     "constraints": ["Input will be comma-separated numbers", "Return length as string"],
-                    "examples": ["For 1,2,3 the answer is 3 as the entire sequence is increasing"]
+                    "examples": ["For 1,2,3 the answer is 3 as the entire sequence is increasing"],
+                    "reference_solution": "from bisect import bisect_left\n\ndef solution(sequence):\n    tails = []\n    for value in map(int, sequence.split(',')):\n        i = bisect_left(tails, value)\n        if i == len(tails):\n            tails.append(value)\n        else:\n            tails[i] = value\n    return str(len(tails))"
                 }
             ]
         }
@@ -323,38 +411,80 @@ class CodingChallengeManager:
         return random.choice(challenges[difficulty])
 
     def evaluate_code(self, user_code: str, test_cases: List[Dict], challenge_desc: str) -> None:
-        """Evaluate user's code using both test cases and Gemini LLM"""
+        """Evaluate user's code using both test cases and Gemini LLM, running the two stages concurrently"""
         # First, validate code structure and safety
         if not self._validate_code_safety(user_code):
             st.error("❌ Code validation failed. Please check for unsafe operations.")
             return
 
-        # Use Gemini to analyze code quality
-        self._analyze_code_quality(user_code, challenge_desc)
+        executor = get_evaluation_executor()
+        review_cache = get_review_cache()
+        review_key = ReviewCache.key_for(user_code, challenge_desc)
+
+        # Start both stages before waiting on either
+        cached_review = review_cache.get(review_key)
+        review_future = None
+        if cached_review is None:
+            review_future = executor.submit(self._cached_code_review, review_cache, user_code,
+                                            challenge_desc, review_key)
+        tests_future = executor.submit(get_sandbox_pool().run_tests, user_code, test_cases)
+
+        tests_container = st.container()
+        review_placeholder = st.empty()
+        review_placeholder.info("🤖 Code review in progress...")
+
+        # Test results render as soon as the sandbox finishes
+        with tests_container:
+            try:
+                results = tests_future.result(timeout=TEST_STAGE_TIMEOUT)
+                self._render_test_results(test_cases, results)
+            except FutureTimeoutError:
+                st.error(f"❌ Test execution did not finish within {TEST_STAGE_TIMEOUT}s")
+            except Exception as e:
+                st.error(f"❌ Error executing code: {str(e)}")
 
-        # Run test cases
-        self._run_test_cases(user_code, test_cases)
+        # The review fills its placeholder whenever it arrives
+        with review_placeholder.container():
+            if cached_review is not None:
+                self._render_code_review(cached_review)
+                st.caption("♻️ Review served from cache for identical code")
+                return
+            try:
+                self._render_code_review(review_future.result(timeout=REVIEW_STAGE_TIMEOUT))
+            except FutureTimeoutError:
+                st.warning("⚠️ Code analysis is taking too long. Submit again shortly to see it.")
+            except json.JSONDecodeError:
+                st.warning("⚠️ Could not parse code analysis results.")
+            except Exception:
+                st.warning("⚠️ Code analysis temporarily unavailable.")
 
     def _validate_code_safety(self, code: str) -> bool:
-        """Validate code for safety and structure"""
-        try:
-            # Parse the code to check for syntax
-            tree = ast.parse(code)
-            
-            # Check for unsafe operations
-            unsafe_ops = ['exec', 'eval', 'open', '__import__', 'subprocess']
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Call):
-                    if hasattr(node.func, 'id') and node.func.id in unsafe_ops:
-                        st.error(f"❌ Unsafe operation detected: {node.func.id}")
-                        return False
-            return True
-        except SyntaxError as e:
-            st.error(f"❌ Syntax Error: {str(e)}")
+        """Validate code for safety and structure against the static code policy"""
+        report = get_code_policy().analyze(code)
+        st.caption(f"🔎 Static analysis: {report.elapsed_ms:.2f} ms{' (cached)' if report.cached else ''}")
+
+        if report.syntax_error:
+            st.error(f"❌ Syntax Error: {report.syntax_error}")
             return False
+        for violation in report.violations[:10]:
+            st.error(f"❌ Unsafe operation detected: {violation.detail} (line {violation.line})")
+        if len(report.violations) > 10:
+            st.error(f"❌ ...and {len(report.violations) - 10} more unsafe operations")
+        return report.allowed
 
-    def _analyze_code_quality(self, code: str, challenge_desc: str) -> None:
-        """Analyze code quality using Gemini LLM with improved error handling"""
+    def _cached_code_review(self, review_cache: ReviewCache, code: str, challenge_desc: str,
+                            review_key: str) -> Dict:
+        """Request a review and cache it, even if the page stopped waiting for it.
+
+        Runs on an executor thread, which has no script context, so the cache is
+        looked up on the script thread and passed in.
+        """
+        review = self._request_code_review(code, challenge_desc)
+        review_cache.put(review_key, review)
+        return review
+
+    def _request_code_review(self, code: str, challenge_desc: str) -> Dict:
+        """Ask Gemini for a code quality review; runs off the render thread so no st calls here"""
         prompt = f"""
         Analyze this Python code solution for the following challenge:
         Challenge: {challenge_desc}
@@ -380,105 +510,119 @@ class CodingChallengeManager:
         Keep each field's content concise and focused.
         """
         
-        try:
-            # Add retry mechanism
-            max_retries = 3
-            retry_count = 0
+        # Add retry mechanism
+        max_retries = 3
+        for retry_count in range(1, max_retries + 1):
+            try:
+                response = self.model.generate_content(prompt)
+                response_text = response.text.strip()
+                
+                # Clean and parse JSON response
+                # Remove any markdown formatting or extra text
+                json_start = response_text.find('{')
+                json_end = response_text.rfind('}') + 1
+                if json_start == -1 or json_end == 0:
+                    raise ValueError("Invalid JSON format in response")
+                return json.loads(response_text[json_start:json_end])
+            except Exception:
+                if retry_count == max_retries:
+                    raise
+
+    def _render_code_review(self, analysis: Dict) -> None:
+        """Display code analysis results"""
+        st.markdown("### 📊 Code Analysis")
+        
+        # Use columns for better layout
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.info(f"**Correctness:** {analysis.get('correctness', 'n/a')}")
+            st.info(f"**Efficiency:** {analysis.get('efficiency', 'n/a')}")
+            st.info(f"**Style:** {analysis.get('style', 'n/a')}")
             
-            while retry_count < max_retries:
-                try:
-                    response = self.model.generate_content(prompt)
-                    response_text = response.text.strip()
-                    
-                    # Clean and parse JSON response
-                    # Remove any markdown formatting or extra text
-                    json_start = response_text.find('{')
-                    json_end = response_text.rfind('}') + 1
-                    if json_start != -1 and json_end != 0:
-                        clean_json = response_text[json_start:json_end]
-                        analysis = json.loads(clean_json)
-                        
-                        # Display analysis results
-                        st.markdown("### 📊 Code Analysis")
-                        
-                        # Use columns for better layout
-                        col1, col2 = st.columns(2)
-                        
-                        with col1:
-                            st.info(f"**Correctness:** {analysis['correctness']}")
-                            st.info(f"**Efficiency:** {analysis['efficiency']}")
-                            st.info(f"**Style:** {analysis['style']}")
-                            
-                        with col2:
-                            if analysis.get('suggestions'):
-                                st.markdown("**💡 Suggestions:**")
-                                for suggestion in analysis['suggestions']:
-                                    st.markdown(f"- {suggestion}")
-                            
-                            if analysis.get('best_practices'):
-                                st.markdown("**✨ Best Practices:**")
-                                for practice in analysis['best_practices']:
-                                    st.markdown(f"- {practice}")
-                        
-                        break  # Success, exit retry loop
-                    else:
-                        raise ValueError("Invalid JSON format in response")
-                        
-                except json.JSONDecodeError as je:
-                    retry_count += 1
-                    if retry_count == max_retries:
-                        st.warning("⚠️ Could not parse code analysis results. Proceeding with test cases.")
-                        return
-                    continue
-                    
-                except Exception as e:
-                    retry_count += 1
-                    if retry_count == max_retries:
-                        st.warning("⚠️ Code analysis temporarily unavailable. Proceeding with test cases.")
-                        return
-                    continue
-                    
-        except Exception as e:
-            st.warning("⚠️ Code analysis service unavailable. Proceeding with test cases.")
-            return
-    def _run_test_cases(self, user_code: str, test_cases: List[Dict]) -> None:
-        """Run test cases with detailed feedback"""
-        try:
-            # Create safe execution environment
-            globals_dict = {'__builtins__': __builtins__}
-            exec(user_code, globals_dict)
+        with col2:
+            if analysis.get('suggestions'):
+                st.markdown("**💡 Suggestions:**")
+                for suggestion in analysis['suggestions']:
+                    st.markdown(f"- {suggestion}")
             
-            all_passed = True
-            for i, test in enumerate(test_cases, 1):
-                try:
-                    result = globals_dict['solution'](test['input'])
-                    
-                    if str(result).strip() == str(test['expected']).strip():
-                        st.success(f"✅ Test case {i} passed!")
-                        with st.expander(f"Test Case {i} Details"):
-                            st.code(f"""Input: {test['input']}
+            if analysis.get('best_practices'):
+                st.markdown("**✨ Best Practices:**")
+                for practice in analysis['best_practices']:
+                    st.markdown(f"- {practice}")
+
+    def _render_test_results(self, test_cases: List[Dict], results: List[Dict]) -> None:
+        """Show sandbox results per test case with detailed feedback"""
+        all_passed = True
+        for i, (test, result) in enumerate(zip(test_cases, results), 1):
+            timing = f"{result['elapsed_ms']:.2f} ms"
+            if result['passed']:
+                st.success(f"✅ Test case {i} passed! ⏱️ {timing}")
+                with st.expander(f"Test Case {i} Details"):
+                    st.code(f"""Input: {test['input']}
 Expected: {test['expected']}
-Your Output: {result}
+Your Output: {result['output']}
+Time: {timing}
 Explanation: {test.get('explanation', 'Test case passed successfully')}""")
-                    else:
-                        all_passed = False
-                        st.error(f"❌ Test case {i} failed")
-                        with st.expander(f"Test Case {i} Details"):
-                            st.code(f"""Input: {test['input']}
+            elif result['status'] == 'ok':
+                all_passed = False
+                st.error(f"❌ Test case {i} failed ⏱️ {timing}")
+                with st.expander(f"Test Case {i} Details"):
+                    st.code(f"""Input: {test['input']}
 Expected: {test['expected']}
-Your Output: {result}
+Your Output: {result['output']}
+Time: {timing}
 Explanation: {test.get('explanation', 'Output does not match expected result')}""")
-                            
-                except Exception as e:
-                    all_passed = False
-                    st.error(f"❌ Error in test case {i}: {str(e)}")
-            
-            if all_passed:
-                st.balloons()
-                st.success("🎉 All test cases passed! Excellent work!")
-            
-        except Exception as e:
-            st.error(f"❌ Error executing code: {str(e)}")
+            else:
+                all_passed = False
+                st.error(f"❌ Error in test case {i}: {result['error']} ⏱️ {timing}")
+
+        if all_passed:
+            st.balloons()
+            st.success("🎉 All test cases passed! Excellent work!")
+
+    def benchmark_code(self, user_code: str, challenge: Dict) -> None:
+        """Time the solution on scaled inputs and compare it with the reference solution"""
+        if not self._validate_code_safety(user_code):
+            st.error("❌ Code validation failed. Please check for unsafe operations.")
+            return
+
+        with st.spinner("⚡ Benchmarking your solution on growing inputs..."):
+            report = compare_with_reference(
+                get_sandbox_pool(),
+                user_code,
+                challenge.get('reference_solution'),
+                challenge['test_cases']
+            )
+
+        st.markdown("### ⚡ Performance Benchmark")
+        solution = report['solution']
+        reference = report.get('reference')
+        if not solution['points']:
+            st.error(f"❌ Benchmark failed: {solution['error']}")
+            return
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Your empirical complexity", solution['complexity'])
+        with col2:
+            if reference and reference['points']:
+                st.metric("Reference complexity", reference['complexity'])
+            else:
+                st.info("No reference solution available for this challenge.")
+        if solution['error']:
+            st.warning(f"⚠️ Scaling stopped early at {solution['error']}")
+
+        results = pd.DataFrame(solution['points']).rename(
+            columns={'time_ms': 'Your time (ms)', 'peak_kb': 'Your peak memory (KB)'})
+        if reference and reference['points']:
+            reference_df = pd.DataFrame(reference['points']).rename(
+                columns={'time_ms': 'Reference time (ms)', 'peak_kb': 'Reference peak memory (KB)'})
+            results = results.merge(reference_df, on='n', how='left')
+        results = results.set_index('n')
+
+        st.line_chart(results[[c for c in results.columns if c.endswith('(ms)')]])
+        st.dataframe(results.round(3), use_container_width=True)
 
     def display_challenge_interface(self) -> None:
         """Display the main coding challenge interface"""
@@ -515,7 +659,7 @@ Explanation: {test.get('explanation', 'Output does not match expected result')}"
             key="code_editor"
         )
         
-        col1, col2 = st.columns([1, 1])
+        col1, col2, col3 = st.columns([1, 1, 1])
         with col1:
             if st.button("▶️ Submit & Evaluate"):
                 self.evaluate_code(user_code, challenge['test_cases'], challenge['challenge'])
@@ -523,6 +667,11 @@ Explanation: {test.get('explanation', 'Output does not match expected result')}"
             if st.button("💡 Get Hint"):
                 st.info(f"💡 {challenge['hints'][st.session_state.get('hint_index', 0)]}")
                 st.session_state.hint_index = (st.session_state.get('hint_index', 0) + 1) % len(challenge['hints'])
+        with col3:
+            run_benchmark = st.button("⚡ Benchmark")
+
+        if run_benchmark:
+            self.benchmark_code(user_code, challenge)
 
 def main():
     st.set_page_config(
@@ -1,16 +1,45 @@
 import streamlit as st
-import pandas as pd
-import requests
-from bs4 import BeautifulSoup
-import random
 from datetime import datetime
 import json
+import time
+from library_catalog import CatalogLoader, build_catalog
+from resource_discovery import ResourceDiscovery
+from link_health import LinkHealthChecker, LinkHealthIndex, is_dead, is_slow
+from resource_ranking import ResourceRanker, flatten_catalog
+from resource_search import ResourceSearchIndex
 
 # # Initial authentication check
 # if 'signed_in' not in st.session_state or not st.session_state.signed_in:
 #     st.warning("🔒 Please log in to access this page.")
 #     st.stop()
 
+@st.cache_resource
+def get_catalog_loader():
+    """One catalog loader per process; set CATALOG_PATH to use a different sheet or URL"""
+    return CatalogLoader()
+
+@st.cache_resource
+def get_resource_discovery():
+    """Background web discovery shared by all sessions, cached per subject with a TTL"""
+    return ResourceDiscovery()
+
+@st.cache_resource
+def get_link_health_checker():
+    """Background link checks for the catalog; results live in link_health.db"""
+    return LinkHealthChecker(LinkHealthIndex())
+
+@st.cache_resource(max_entries=2, ttl=900)
+def get_resource_ranker(catalog_version):
+    """Feature matrix for the current catalog version, with link health folded in"""
+    ranker = ResourceRanker.from_catalog(get_catalog_loader().catalog())
+    ranker.update_health(get_link_health_checker().index.get_many(ranker.rows_by_link))
+    return ranker
+
+@st.cache_resource
+def get_search_index():
+    """Type-ahead index over the whole catalog, patched in place when the catalog changes"""
+    return ResourceSearchIndex()
+
 class EnhancedAdaptiveLearning:
     def __init__(self):
         # Advanced page configuration
@@ -30,73 +59,51 @@ class EnhancedAdaptiveLearning:
         if 'user_profile' not in st.session_state:
             st.session_state.user_profile = {'preferences': [], 'history': []}
         
-        # Base data URL
-        self.EXCEL_URL = "https://raw.githubusercontent.com/Suriyakumarvijayanayagam/Personalized_learning_enhanced_with_AI/main/chennal.xlsx"
+        self.catalog_loader = get_catalog_loader()
         self.load_initial_data()
 
     def load_initial_data(self):
-        """Load base data and initialize dynamic content"""
+        """Load base data from the local catalog cache"""
         try:
-            self.df = pd.read_excel(self.EXCEL_URL)
-            self.categorized_content = self.process_content(self.df)
+            self.df = self.catalog_loader.load()
+            self.categorized_content = self.catalog_loader.catalog()
+            get_link_health_checker().refresh_in_background(self.categorized_content)
         except Exception as e:
             st.error(f"Data loading error: {e}")
             self.categorized_content = {}
 
     def process_content(self, df):
         """Process and categorize content with additional metadata"""
-        categorized = {}
-        for _, row in df.iterrows():
-            subject = str(row['subject ']).strip()
-            content = {
-                'videos': [{'name': str(row['channel name ']).strip(), 
-                          'link': str(row['channel link']).strip(), 
-                          'last_updated': datetime.now().isoformat()}],
-                'websites': [{'name': str(row[' website name ']).strip(), 
-                            'link': str(row['website link']).strip(),
-                            'last_updated': datetime.now().isoformat()}]
-            }
-            if subject not in categorized:
-                categorized[subject] = {'videos': [], 'websites': []}
-            categorized[subject]['videos'].extend([v for v in content['videos'] if v['name']])
-            categorized[subject]['websites'].extend([w for w in content['websites'] if w['name']])
-        return categorized
-
-    def fetch_dynamic_content(self, subject, content_type):
-        """Dynamically fetch additional content using web scraping"""
-        try:
-            search_query = f"{subject} educational {content_type}"
-            response = requests.get(f"https://www.google.com/search?q={search_query}")
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            new_resources = []
-            for link in soup.find_all('a', href=True)[:5]:  # Top 5 results
-                href = link['href']
-                if 'http' in href and 'google' not in href:
-                    new_resources.append({
-                        'name': link.text[:50] or f"{content_type.capitalize()} Resource",
-                        'link': href,
-                        'last_updated': datetime.now().isoformat(),
-                        'source': 'dynamic'
-                    })
-            return new_resources
-        except Exception as e:
-            st.warning(f"Dynamic fetch failed: {e}")
-            return []
+        return build_catalog(df)
 
-    def get_personalized_recommendations(self, subject, content_type):
+    def get_personalized_recommendations(self, subject, content_type, limit=10):
         """AI-driven content recommendations based on user profile"""
         base_content = self.categorized_content.get(subject, {}).get(content_type, [])
+        discovery = get_resource_discovery()
         
-        # Add dynamic content if less than 5 resources
+        # Look for dynamic content in the background if less than 5 resources
         if len(base_content) < 5:
-            dynamic_content = self.fetch_dynamic_content(subject, content_type)
-            base_content.extend(dynamic_content)
+            discovery.request(subject, content_type)
         
-        # Sort by relevance based on user preferences
-        if st.session_state.user_profile['preferences']:
-            base_content.sort(key=lambda x: random.random())  # Simple randomization for now
-        return base_content[:10]  # Return top 10 recommendations
+        # Rank the catalog by subject, preferences and link health
+        ranker = get_resource_ranker(self.catalog_loader.version)
+        resources = ranker.rank(subject, content_type, st.session_state.user_profile['preferences'], k=limit)
+        
+        # Discovered resources fill any remaining slots, minus dead ones and slow ones last
+        if len(resources) < limit:
+            overlay = discovery.get(subject, content_type)
+            health = get_link_health_checker().index.get_many(r['link'] for r in overlay)
+            overlay = [r for r in overlay if not is_dead(health.get(r['link']))]
+            overlay.sort(key=lambda r: is_slow(health.get(r['link'])))
+            resources += overlay[:limit - len(resources)]
+        return resources
+
+    def search_library(self, query, limit=20):
+        """Prefix/fuzzy search across every subject, syncing the index to the current catalog first"""
+        index = get_search_index()
+        if index.version != self.catalog_loader.version:
+            index.sync(flatten_catalog(self.categorized_content), self.catalog_loader.version)
+        return index.search(query, limit=limit)
 
     def render_ui(self):
         """Render enhanced UI with advanced features"""
@@ -130,6 +137,17 @@ class EnhancedAdaptiveLearning:
         # Main content
         st.markdown('<div class="subject-container">', unsafe_allow_html=True)
         
+        # Search across the whole library
+        query = st.text_input("🔎 Search the library", placeholder="e.g. pyth, geeksforgeeks, data sci...")
+        if query.strip():
+            start = time.perf_counter()
+            matches = self.search_library(query)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            st.caption(f"{len(matches)} matches in {elapsed_ms:.1f} ms")
+            for resource in matches:
+                icon = "🎥" if resource['type'] == 'videos' else "🌐"
+                st.markdown(f"{icon} [{resource['name']}]({resource['link']}) · {resource['subject']}")
+
         # Subject selection with autocomplete
         subjects = sorted(self.categorized_content.keys())
         subject = st.selectbox("Choose Your Subject", subjects, 
@@ -148,6 +166,8 @@ class EnhancedAdaptiveLearning:
             resources = self.get_personalized_recommendations(subject, content_type)
             
             st.markdown(f"### Recommended {content_type.capitalize()} for {subject}")
+            if get_resource_discovery().is_pending(subject, content_type):
+                st.caption("🔍 Looking for more resources in the background...")
             for resource in resources:
                 st.markdown(f"""
                 <div class="resource-card">
@@ -164,6 +184,7 @@ class EnhancedAdaptiveLearning:
                 st.session_state.user_profile['history'].append({
                     'subject': subject,
                     'resource': resource['name'],
+                    'link': resource['link'],
                     'type': content_type,
                     'timestamp': datetime.now().isoformat()
                 })
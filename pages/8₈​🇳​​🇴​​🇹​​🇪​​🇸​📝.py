@@ -1,19 +1,24 @@
 import streamlit as st
-import base64
 from datetime import datetime
-import json
-import uuid
+import os
 import pandas as pd
-import re
 import random
 from streamlit_ace import st_ace
-import time
+from note_store import Note
+from note_search import highlight_snippet
+from note_analytics import NoteAnalytics
+from collections import OrderedDict
+from note_db import NoteDatabase, content_loaded
+from note_autosave import NoteAutosaver
+from note_export import EXPORT_FORMATS, export_to_file
+from note_import import IMPORT_EXTENSIONS, import_notes
+from note_semantic import SemanticNoteIndex, semantic_available
 
 
-# # Check if the user is logged in
-# if 'signed_in' not in st.session_state or not st.session_state.signed_in:
-#     st.warning("🔒You must be logged in to access this page.")
-#     st.stop()  # Stop rendering the rest of the page
+# Notes persist per user, so the page needs a signed-in account to own them
+if not st.session_state.get('signed_in') or not st.session_state.get('username'):
+    st.warning("🔒You must be logged in to access this page.")
+    st.stop()  # Stop rendering the rest of the page
 
 # Set page configuration
 st.set_page_config(
@@ -252,52 +257,49 @@ def set_theme_variables():
         </style>
         """, unsafe_allow_html=True)
 
-# Note class
-class Note:
-    def __init__(self, title="", content="", notebook="Default", tags=None, color="#1E88E5"):
-        self.id = str(uuid.uuid4())
-        self.title = title
-        self.content = content
-        self.notebook = notebook
-        self.tags = tags or []
-        self.color = color
-        self.created_at = datetime.now().isoformat()
-        self.updated_at = self.created_at
-        self.pinned = False
-        
-    def to_dict(self):
-        return {
-            "id": self.id,
-            "title": self.title,
-            "content": self.content,
-            "notebook": self.notebook,
-            "tags": self.tags,
-            "color": self.color,
-            "created_at": self.created_at,
-            "updated_at": self.updated_at,
-            "pinned": self.pinned
-        }
-    
-    @classmethod
-    def from_dict(cls, data):
-        note = cls()
-        note.id = data.get("id", str(uuid.uuid4()))
-        note.title = data.get("title", "")
-        note.content = data.get("content", "")
-        note.notebook = data.get("notebook", "Default")
-        note.tags = data.get("tags", [])
-        note.color = data.get("color", "#1E88E5")
-        note.created_at = data.get("created_at", datetime.now().isoformat())
-        note.updated_at = data.get("updated_at", note.created_at)
-        note.pinned = data.get("pinned", False)
-        return note
+NOTES_PAGE_SIZE = 20
+PREVIEW_CACHE_SIZE = 500
+SEMANTIC_RESULTS = 100
+
+@st.cache_resource
+def get_note_database(owner):
+    """One handle per workspace owner; NOTES_DB points at the SQLite file"""
+    return NoteDatabase(os.environ.get('NOTES_DB', 'notes.db'), owner)
+
+@st.cache_resource
+def get_autosaver(owner):
+    """Background writer that debounces edits for this owner's notes"""
+    return NoteAutosaver(get_note_database(owner))
+
+@st.cache_resource
+def get_semantic_index(owner):
+    """Embedding index behind "about:" search and related notes; None without sentence-transformers"""
+    if not semantic_available():
+        return None
+    return SemanticNoteIndex(get_note_database(owner))
+
+def current_user_id():
+    return st.session_state.username
+
+def load_workspace():
+    """Load note metadata from the database; bodies are read when a note is opened or previewed"""
+    st.session_state.notes = get_note_database(current_user_id()).load_repository()
+    st.session_state.analytics = NoteAnalytics()
+    for note in st.session_state.notes:
+        st.session_state.analytics.add(note, word_count=note.word_count)
+    semantic = get_semantic_index(current_user_id())
+    if semantic:
+        # Reuses stored embeddings; only new or changed notes are embedded, in the background
+        semantic.sync(st.session_state.notes)
 
 # Initialize session state
 def initialize_session_state():
     if 'notes' not in st.session_state:
-        st.session_state.notes = []
+        load_workspace()
     if 'notebooks' not in st.session_state:
         st.session_state.notebooks = ["Default", "Work", "Personal"]
+        st.session_state.notebooks += [nb for nb in st.session_state.notes.notebooks()
+                                       if nb not in st.session_state.notebooks]
     if 'current_notebook' not in st.session_state:
         st.session_state.current_notebook = "Default"
     if 'current_note_id' not in st.session_state:
@@ -308,87 +310,52 @@ def initialize_session_state():
         st.session_state.editor_mode = "rich"  # "rich" or "code"
     if 'search_query' not in st.session_state:
         st.session_state.search_query = ""
-    if 'analytics_data' not in st.session_state:
-        st.session_state.analytics_data = {
-            "word_count": 0,
-            "notes_per_notebook": {},
-            "tags_frequency": {},
-            "activity_over_time": []
-        }
-
-# Update analytics data
-def update_analytics():
-    notebooks = {}
-    tags = {}
-    word_count = 0
-    activity = {}
-    
-    for note in st.session_state.notes:
-        # Update notebooks count
-        if note.notebook in notebooks:
-            notebooks[note.notebook] += 1
-        else:
-            notebooks[note.notebook] = 1
-        
-        # Update tags frequency
-        for tag in note.tags:
-            if tag in tags:
-                tags[tag] += 1
-            else:
-                tags[tag] = 1
-        
-        # Update word count
-        word_count += len(re.findall(r'\w+', note.content))
-        
-        # Update activity over time
-        date = datetime.fromisoformat(note.created_at).strftime("%Y-%m-%d")
-        if date in activity:
-            activity[date] += 1
-        else:
-            activity[date] = 1
-    
-    st.session_state.analytics_data = {
-        "word_count": word_count,
-        "notes_per_notebook": notebooks,
-        "tags_frequency": tags,
-        "activity_over_time": [{"date": k, "count": v} for k, v in activity.items()]
-    }
-
-# Save and load notes
-def save_notes():
-    notes_data = [note.to_dict() for note in st.session_state.notes]
-    return json.dumps(notes_data)
+    if 'note_list_page' not in st.session_state:
+        st.session_state.note_list_page = 0
+        st.session_state.note_list_scope = None
+    if 'note_previews' not in st.session_state:
+        st.session_state.note_previews = OrderedDict()
 
 def get_note_by_id(note_id):
-    for note in st.session_state.notes:
-        if note.id == note_id:
-            return note
-    return None
+    return st.session_state.notes.get(note_id)
 
 def update_note(note_id, updates):
-    for i, note in enumerate(st.session_state.notes):
-        if note.id == note_id:
-            for key, value in updates.items():
-                setattr(note, key, value)
-            note.updated_at = datetime.now().isoformat()
-            st.session_state.notes[i] = note
-            update_analytics()
-            return True
-    return False
+    note = st.session_state.notes.get(note_id)
+    if note is None:
+        return False
+    # Only fields that actually changed are applied and queued for autosave
+    changed = {key: value for key, value in updates.items() if getattr(note, key) != value}
+    if not changed:
+        return True
+    loaded_version = note.updated_at
+    st.session_state.notes.update(note_id, changed)
+    get_autosaver(current_user_id()).mark_dirty(note, changed, base_version=loaded_version)
+    st.session_state.analytics.update(note, content_changed="content" in changed)
+    semantic = get_semantic_index(current_user_id())
+    if semantic and ("title" in changed or "content" in changed):
+        semantic.update(note)
+    return True
 
 def delete_note(note_id):
-    for i, note in enumerate(st.session_state.notes):
-        if note.id == note_id:
-            st.session_state.notes.pop(i)
-            update_analytics()
-            return True
-    return False
+    if st.session_state.notes.delete(note_id) is None:
+        return False
+    get_autosaver(current_user_id()).mark_deleted(note_id)
+    st.session_state.analytics.remove(note_id)
+    semantic = get_semantic_index(current_user_id())
+    if semantic:
+        semantic.remove(note_id)
+    return True
 
 def create_new_note(title, content, notebook, tags, color):
     new_note = Note(title, content, notebook, tags, color)
-    st.session_state.notes.append(new_note)
+    get_autosaver(current_user_id()).mark_dirty(
+        new_note, ["title", "content", "notebook", "tags", "color", "pinned"], base_version=None)
+    st.session_state.notes.add(new_note)
+    st.session_state.analytics.add(new_note)
+    semantic = get_semantic_index(current_user_id())
+    if semantic:
+        semantic.update(new_note)
     st.session_state.current_note_id = new_note.id
-    update_analytics()
     return new_note.id
 
 # UI Components
@@ -425,7 +392,8 @@ def render_sidebar():
         
         # Search
         st.markdown("### Search")
-        search_query = st.text_input("Search notes", key="search_input", value=st.session_state.search_query)
+        search_query = st.text_input("Search notes", key="search_input", value=st.session_state.search_query,
+                                     help='Words and "quoted phrases"; tag:name for a tag; about:topic to find notes by meaning')
         if search_query != st.session_state.search_query:
             st.session_state.search_query = search_query
             st.rerun()
@@ -434,11 +402,7 @@ def render_sidebar():
         
         # All Tags
         st.markdown("### Tags")
-        all_tags = set()
-        for note in st.session_state.notes:
-            all_tags.update(note.tags)
-        
-        for tag in sorted(all_tags):
+        for tag in st.session_state.notes.tags():
             if st.button(f"🏷️ {tag}", key=f"tag_{tag}"):
                 st.session_state.search_query = f"tag:{tag}"
                 st.rerun()
@@ -447,54 +411,117 @@ def render_sidebar():
         
         # Export options
         st.markdown("### Export")
-        export_format = st.selectbox("Format", ["Text (.txt)", "Markdown (.md)", "JSON (.json)"], key="export_format")
+        export_format = st.selectbox("Format", list(EXPORT_FORMATS), key="export_format")
+        export_compression = st.selectbox("Compression", ["None", "gzip", "zip"], key="export_compression")
         export_scope = st.radio("Scope", ["All Notes", "Current Notebook", "Selected Note"], key="export_scope")
         
         if st.button("Export Notes", key="export_notes"):
-            if export_scope == "All Notes":
-                notes_to_export = st.session_state.notes
-            elif export_scope == "Current Notebook":
-                notes_to_export = [note for note in st.session_state.notes if note.notebook == st.session_state.current_notebook]
-            else:  # Selected Note
-                if st.session_state.current_note_id:
-                    notes_to_export = [get_note_by_id(st.session_state.current_note_id)]
-                else:
-                    st.error("No note selected!")
-                    notes_to_export = []
-            
-            if notes_to_export:
-                export_notes(notes_to_export, export_format)
+            if export_scope == "Selected Note" and not st.session_state.current_note_id:
+                st.error("No note selected!")
+            else:
+                export_notes(export_scope, export_format,
+                             None if export_compression == "None" else export_compression)
+        
+        export_file = st.session_state.get('export_file')
+        if export_file and os.path.exists(export_file['path']):
+            with open(export_file['path'], 'rb') as f:
+                st.download_button(f"📥 Download {export_file['name']}", f,
+                                   file_name=export_file['name'], mime=export_file['mime'],
+                                   key="download_export")
+        
+        # Import options
+        st.markdown("### Import")
+        uploads = st.file_uploader("Markdown, zip or NDJSON files", type=[ext.lstrip('.') for ext in IMPORT_EXTENSIONS],
+                                   accept_multiple_files=True, key="import_files")
+        if st.button("Import Notes", key="import_notes", disabled=not uploads):
+            import_uploaded_notes(uploads)
+
+def get_previews(notes):
+    """Card previews keyed by (id, updated_ts); unloaded bodies are previewed straight from the database"""
+    cache = st.session_state.note_previews
+    missing = [note for note in notes if (note.id, note.updated_ts) not in cache]
+    if missing:
+        stored = get_note_database(current_user_id()).load_previews(
+            [note.id for note in missing if not content_loaded(note)])
+        for note in missing:
+            if content_loaded(note):
+                preview = note.content[:100] + '...' if len(note.content) > 100 else note.content
             else:
-                st.error("No notes to export!")
+                preview = stored.get(note.id, "")
+            cache[(note.id, note.updated_ts)] = preview
+    previews = {}
+    for note in notes:
+        key = (note.id, note.updated_ts)
+        cache.move_to_end(key)
+        previews[note.id] = cache[key]
+    while len(cache) > PREVIEW_CACHE_SIZE:
+        cache.popitem(last=False)
+    return previews
 
 def render_note_list():
     st.markdown("### Your Notes")
     
-    # Filter notes
-    filtered_notes = st.session_state.notes
-    
-    if st.session_state.search_query:
-        search_term = st.session_state.search_query.lower()
-        if search_term.startswith("tag:"):
-            tag = search_term[4:].strip()
-            filtered_notes = [note for note in filtered_notes if tag in [t.lower() for t in note.tags]]
+    # Filter notes; the repository already keeps them pinned first, then by updated date
+    notes = st.session_state.notes
+    text_query = None
+    
+    # Back to the first page whenever the notebook or search changes
+    scope = (st.session_state.current_notebook, st.session_state.search_query)
+    if st.session_state.note_list_scope != scope:
+        st.session_state.note_list_scope = scope
+        st.session_state.note_list_page = 0
+    
+    # Only the current page of notes is resolved and rendered
+    search_term = st.session_state.search_query.lower()
+    if search_term.startswith("tag:"):
+        total = notes.count_tag(search_term[4:])
+        fetch_page = lambda offset: notes.list_tag(search_term[4:], offset, NOTES_PAGE_SIZE)
+    elif search_term.startswith("about:"):
+        # Nearest notes by embedding, most similar first
+        semantic = get_semantic_index(current_user_id())
+        if semantic is None:
+            st.info("Semantic search needs the sentence-transformers package")
+            matches = []
+        elif not semantic.ready():
+            # The model loads on the index's own thread; the page never waits for it
+            st.info("The semantic search model is still loading; try again in a moment")
+            matches = []
         else:
-            filtered_notes = [note for note in filtered_notes if 
-                            search_term in note.title.lower() or 
-                            search_term in note.content.lower()]
+            # Only notes above the index's similarity cutoff, at most SEMANTIC_RESULTS
+            matches = [note_id for note_id, _ in semantic.search(st.session_state.search_query[6:], limit=SEMANTIC_RESULTS)
+                       if note_id in notes]
+            if semantic.pending():
+                st.caption(f"Still indexing {semantic.pending()} notes; results may be incomplete")
+        total = len(matches)
+        fetch_page = lambda offset: [notes.get(note_id) for note_id in matches[offset:offset + NOTES_PAGE_SIZE]]
+    elif search_term:
+        # Ranked by relevance instead (SQLite FTS5); supports multiple terms and "quoted phrases"
+        text_query = st.session_state.search_query
+        db = get_note_database(current_user_id())
+        total = db.count_matches(text_query)
+        fetch_page = lambda offset: [notes.get(note_id) for note_id in
+                                     db.search(text_query, limit=NOTES_PAGE_SIZE, offset=offset)
+                                     if note_id in notes]
     else:
-        filtered_notes = [note for note in filtered_notes if note.notebook == st.session_state.current_notebook]
+        total = notes.count_notebook(st.session_state.current_notebook)
+        fetch_page = lambda offset: notes.list_notebook(st.session_state.current_notebook, offset, NOTES_PAGE_SIZE)
     
-    # Sort notes (pinned first, then by updated date)
-    filtered_notes.sort(key=lambda x: (not x.pinned, x.updated_at), reverse=True)
+    last_page = max(0, (total - 1) // NOTES_PAGE_SIZE)
+    page = min(st.session_state.note_list_page, last_page)
+    filtered_notes = fetch_page(page * NOTES_PAGE_SIZE)
     
     if not filtered_notes:
         st.markdown('<div class="info-message">No notes found. Create a new note to get started!</div>', unsafe_allow_html=True)
+    previews = {} if text_query else get_previews(filtered_notes)
     
     # Display notes
     for note in filtered_notes:
-        created_date = datetime.fromisoformat(note.created_at).strftime("%b %d, %Y")
-        updated_date = datetime.fromisoformat(note.updated_at).strftime("%b %d, %Y at %H:%M")
+        created_date = datetime.fromtimestamp(note.created_ts).strftime("%b %d, %Y")
+        updated_date = datetime.fromtimestamp(note.updated_ts).strftime("%b %d, %Y at %H:%M")
+        if text_query:
+            preview = highlight_snippet(note.content, text_query)
+        else:
+            preview = previews[note.id]
         
         st.markdown(f"""
         <div class="card" style="border-left: 5px solid {note.color};">
@@ -504,7 +531,7 @@ def render_note_list():
                 {''.join([f'<span class="tag" style="background-color: {get_tag_color(tag)}; color: white;">{tag}</span>' for tag in note.tags])}
             </div>
             <div style="margin-top: 10px;">
-                {note.content[:100] + '...' if len(note.content) > 100 else note.content}
+                {preview}
             </div>
         </div>
         """, unsafe_allow_html=True)
@@ -524,6 +551,20 @@ def render_note_list():
                 if st.session_state.current_note_id == note.id:
                     st.session_state.current_note_id = None
                 st.rerun()
+    
+    # Pager
+    if last_page > 0:
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col1:
+            if st.button("◀", key="notes_prev", disabled=page == 0):
+                st.session_state.note_list_page = page - 1
+                st.rerun()
+        with col2:
+            st.caption(f"Page {page + 1} of {last_page + 1} · {total} notes")
+        with col3:
+            if st.button("▶", key="notes_next", disabled=page >= last_page):
+                st.session_state.note_list_page = page + 1
+                st.rerun()
 
 def render_note_editor():
     # Handle new note creation
@@ -539,30 +580,33 @@ def render_note_editor():
     # Note editor
     st.markdown("### 📝 Note Editor")
     
+    # Widget keys are per note so one note's unsaved text never leaks into another
+    editor_key = current_note.id if current_note else "new"
+    
     # Title
-    note_title = st.text_input("Title", value=current_note.title if current_note else "", key="note_title")
+    note_title = st.text_input("Title", value=current_note.title if current_note else "", key=f"note_title_{editor_key}")
     
     # Note content
     editor_tabs = ["Rich Text", "Code Editor"]
     selected_tab = st.radio("Editor Type", editor_tabs, horizontal=True, key="editor_type")
     
     if selected_tab == "Rich Text":
-        note_content = st.text_area("Content", value=current_note.content if current_note else "", height=400, key="note_content")
+        note_content = st.text_area("Content", value=current_note.content if current_note else "", height=400, key=f"note_content_{editor_key}")
     else:
         editor_language = st.selectbox("Language", ["markdown", "python", "javascript", "html", "css", "json", "sql"], key="editor_language")
         note_content = st_ace(
             value=current_note.content if current_note else "",
             language=editor_language,
             theme="monokai" if st.session_state.dark_mode else "github",
-            key="ace_editor",
+            key=f"ace_editor_{editor_key}",
             height=400
         )
     
     # Notebook selection
-    note_notebook = st.selectbox("Notebook", st.session_state.notebooks, index=st.session_state.notebooks.index(current_note.notebook if current_note else st.session_state.current_notebook), key="note_notebook")
+    note_notebook = st.selectbox("Notebook", st.session_state.notebooks, index=st.session_state.notebooks.index(current_note.notebook if current_note else st.session_state.current_notebook), key=f"note_notebook_{editor_key}")
     
     # Tags
-    note_tags = st.text_input("Tags (comma separated)", value=", ".join(current_note.tags) if current_note and current_note.tags else "", key="note_tags")
+    note_tags = st.text_input("Tags (comma separated)", value=", ".join(current_note.tags) if current_note and current_note.tags else "", key=f"note_tags_{editor_key}")
     tags_list = [tag.strip() for tag in note_tags.split(",") if tag.strip()]
     
     # Color picker
@@ -579,25 +623,27 @@ def render_note_editor():
                        args=(color,)):
                 selected_color = color
     
+    # Existing notes autosave: edits are queued here and written in the background
+    if current_note and (note_title.strip() or note_content.strip()):
+        update_note(current_note.id, {
+            "title": note_title,
+            "content": note_content,
+            "notebook": note_notebook,
+            "tags": tags_list,
+            "color": selected_color
+        })
+        if get_autosaver(current_user_id()).is_pending(current_note.id):
+            st.caption("💾 Saving...")
+        else:
+            st.caption("✓ All changes saved")
+    
     # Save and cancel buttons
     col1, col2 = st.columns(2)
     with col1:
-        if st.button("Save Note", key="save_note"):
+        if not current_note and st.button("Save Note", key="save_note"):
             if note_title.strip() or note_content.strip():
-                if current_note:
-                    update_note(current_note.id, {
-                        "title": note_title,
-                        "content": note_content,
-                        "notebook": note_notebook,
-                        "tags": tags_list,
-                        "color": selected_color
-                    })
-                    st.success("Note updated successfully!")
-                else:
-                    new_note_id = create_new_note(note_title, note_content, note_notebook, tags_list, selected_color)
-                    st.session_state.current_note_id = new_note_id
-                    st.success("Note created successfully!")
-                time.sleep(1)
+                new_note_id = create_new_note(note_title, note_content, note_notebook, tags_list, selected_color)
+                st.session_state.current_note_id = new_note_id
                 st.rerun()
             else:
                 st.error("Title or content cannot be empty!")
@@ -607,35 +653,63 @@ def render_note_editor():
             st.session_state.current_note_id = None
             st.rerun()
 
+    if current_note:
+        render_related_notes(current_note)
+
     # Preview
     if note_content:
         st.markdown("### Preview")
         st.markdown('<div class="note-preview">' + note_content + '</div>', unsafe_allow_html=True)
 
+def render_related_notes(note):
+    """Notes closest in meaning to the open one, from its stored embedding"""
+    semantic = get_semantic_index(current_user_id())
+    if semantic is None:
+        return
+    with st.expander("🔗 Related notes"):
+        related = [(st.session_state.notes.get(note_id), score) for note_id, score in semantic.related(note.id)
+                   if note_id in st.session_state.notes]
+        if not related:
+            st.caption("Related notes appear once this note has been indexed")
+        for other, score in related:
+            if st.button(f"{other.title or 'Untitled'} · {score:.0%}", key=f"related_{other.id}"):
+                st.session_state.current_note_id = other.id
+                st.rerun()
+
 def render_dashboard():
     st.markdown("### 📊 Dashboard")
     
-    # Update analytics
-    update_analytics()
+    # Counters are kept up to date by create/update/delete, so this is just a read
+    analytics = st.session_state.analytics
     
     # KPI Cards
     col1, col2, col3 = st.columns(3)
     with col1:
         st.metric("Total Notes", len(st.session_state.notes))
     with col2:
-        st.metric("Total Words", st.session_state.analytics_data["word_count"])
+        st.metric("Total Words", analytics.word_count)
     with col3:
         st.metric("Notebooks", len(st.session_state.notebooks))
     
+    # Autosave health
+    autosave = get_autosaver(current_user_id()).stats()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Save Latency (p95)", f"{autosave['save_p95_ms']:.1f} ms")
+    with col2:
+        st.metric("Edits per Write", f"{autosave['edits_per_save']:.1f}")
+    with col3:
+        st.metric("Write Amplification", f"{autosave['write_amplification']:.2f}x")
+    
     # Charts
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("#### Notes per Notebook")
-        if st.session_state.analytics_data["notes_per_notebook"]:
+        if analytics.notes_per_notebook:
             notebooks_df = pd.DataFrame({
-                "Notebook": list(st.session_state.analytics_data["notes_per_notebook"].keys()),
-                "Count": list(st.session_state.analytics_data["notes_per_notebook"].values())
+                "Notebook": list(analytics.notes_per_notebook.keys()),
+                "Count": list(analytics.notes_per_notebook.values())
             })
             st.bar_chart(notebooks_df.set_index("Notebook"))
         else:
@@ -643,53 +717,62 @@ def render_dashboard():
     
     with col2:
         st.markdown("#### Popular Tags")
-        if st.session_state.analytics_data["tags_frequency"]:
-            tags_df = pd.DataFrame({
-                "Tag": list(st.session_state.analytics_data["tags_frequency"].keys()),
-                "Count": list(st.session_state.analytics_data["tags_frequency"].values())
-            }).sort_values("Count", ascending=False).head(10)
+        if analytics.tags_frequency:
+            tags_df = pd.DataFrame(analytics.tags_frequency.most_common(10), columns=["Tag", "Count"])
             st.bar_chart(tags_df.set_index("Tag"))
         else:
             st.info("No tags available")
 
 # Helper functions
-def export_notes(notes, format_type):
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    
-    if format_type == "Text (.txt)":
-        content = ""
-        for note in notes:
-            content += f"Title: {note.title}\n"
-            content += f"Date: {datetime.fromisoformat(note.created_at).strftime('%Y-%m-%d %H:%M:%S')}\n"
-            content += f"Notebook: {note.notebook}\n"
-            content += f"Tags: {', '.join(note.tags)}\n"
-            content += f"\n{note.content}\n"
-            content += f"\n{'=' * 50}\n\n"
-        
-        file_name = f"notes_export_{timestamp}.txt"
-        mime_type = "text/plain"
-    
-    elif format_type == "Markdown (.md)":
-        content = ""
-        for note in notes:
-            content += f"# {note.title}\n\n"
-            content += f"*Date: {datetime.fromisoformat(note.created_at).strftime('%Y-%m-%d %H:%M:%S')}*\n\n"
-            content += f"**Notebook:** {note.notebook}\n\n"
-            content += f"**Tags:** {', '.join(note.tags)}\n\n"
-            content += f"{note.content}\n\n"
-            content += f"---\n\n"
-        
-        file_name = f"notes_export_{timestamp}.md"
-        mime_type = "text/markdown"
-    
-    else:  # JSON
-        content = json.dumps([note.to_dict() for note in notes], indent=2)
-        file_name = f"notes_export_{timestamp}.json"
-        mime_type = "application/json"
-    
-    b64 = base64.b64encode(content.encode()).decode()
-    href = f'<a href="data:{mime_type};base64,{b64}" download="{file_name}">📥 Download {file_name}</a>'
-    st.markdown(href, unsafe_allow_html=True)
+def export_notes(scope, format_type, compression=None):
+    """Stream the notes in scope from the database into a temp file offered for download"""
+    owner = current_user_id()
+    # Unsaved edits would otherwise be missing from the export
+    if not get_autosaver(owner).flush():
+        st.warning("Some recent edits are still being saved and may be missing from the export")
+    
+    db = get_note_database(owner)
+    if scope == "All Notes":
+        rows = db.iter_notes()
+    elif scope == "Current Notebook":
+        rows = db.iter_notes(notebook=st.session_state.current_notebook)
+    else:  # Selected Note
+        rows = db.iter_notes(note_ids=[st.session_state.current_note_id])
+    
+    discard_export_file()
+    path, file_name, mime_type, count = export_to_file(rows, format_type, compression)
+    if not count:
+        os.remove(path)
+        st.error("No notes to export!")
+        return
+    st.session_state.export_file = {'path': path, 'name': file_name, 'mime': mime_type}
+    st.success(f"Exported {count} notes ({os.path.getsize(path) / 1024:.1f} KB)")
+
+def import_uploaded_notes(uploads):
+    """Parse uploads in the worker pool, store new notes and add them to the open workspace"""
+    with st.spinner("Importing notes..."):
+        notes, stats = import_notes(((upload.name, upload.getvalue()) for upload in uploads),
+                                    get_note_database(current_user_id()),
+                                    default_notebook=st.session_state.current_notebook)
+    st.session_state.notes.add_many(notes)
+    for note in notes:
+        st.session_state.analytics.add(note)
+        if note.notebook not in st.session_state.notebooks:
+            st.session_state.notebooks.append(note.notebook)
+    semantic = get_semantic_index(current_user_id())
+    if semantic:
+        semantic.update_many(notes)
+    
+    st.success(f"Imported {stats['imported']} notes in {stats['seconds']:.1f}s "
+               f"({stats['notes_per_sec']:.0f} notes/sec); skipped {stats['duplicates']} duplicates")
+    for error in stats['errors']:
+        st.warning(f"Skipped {error}")
+
+def discard_export_file():
+    """Remove the previous export from disk; only the latest one is kept per session"""
+    export_file = st.session_state.pop('export_file', None)
+    if export_file and os.path.exists(export_file['path']):
+        os.remove(export_file['path'])
 
 def get_tag_color(tag):
     # Generate a consistent color for each tag
@@ -727,10 +810,10 @@ def generate_sample_data():
             )
         ]
         
+        get_note_database(current_user_id()).save_many(sample_notes)
         for note in sample_notes:
-            st.session_state.notes.append(note)
-        
-        update_analytics()
+            st.session_state.notes.add(note)
+            st.session_state.analytics.add(note)
 
 def main():
     # Initialize
@@ -739,6 +822,13 @@ def main():
     set_theme_variables()
     generate_sample_data()
     
+    # Background saves that lost an update race: show what happened and reload from the database
+    conflicts = get_autosaver(current_user_id()).pop_conflicts()
+    if conflicts:
+        for message in conflicts.values():
+            st.error(f"{message}. Reloaded the latest version.")
+        load_workspace()
+    
     # Render header
     render_header()
     
@@ -0,0 +1,96 @@
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+
+# Append-only store for quiz attempts, kept next to the other learning history tables
+class QuizHistoryStore:
+    def __init__(self, db_path='learning_history.db'):
+        self.db_path = db_path
+        self._init_db()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        conn = self._connect()
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''CREATE TABLE IF NOT EXISTS quiz_attempts (
+                                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                                user_id TEXT NOT NULL,
+                                topic TEXT NOT NULL,
+                                difficulty TEXT,
+                                score INTEGER NOT NULL,
+                                total INTEGER NOT NULL,
+                                taken_at TEXT NOT NULL,
+                                day TEXT NOT NULL)''')
+            # Recent-history pages walk this index backwards instead of sorting
+            conn.execute('''CREATE INDEX IF NOT EXISTS idx_quiz_attempts_user_time
+                            ON quiz_attempts (user_id, taken_at)''')
+            # Covering index so score trends never touch the table rows
+            conn.execute('''CREATE INDEX IF NOT EXISTS idx_quiz_attempts_user_day
+                            ON quiz_attempts (user_id, day, score, total)''')
+            conn.commit()
+        finally:
+            conn.close()
+
+    def record_attempt(self, user_id: str, topic: str, score: int, total: int,
+                       difficulty: str = None, taken_at: datetime = None) -> int:
+        """Append a quiz attempt and return its row id."""
+        taken_at = taken_at or datetime.now()
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                '''INSERT INTO quiz_attempts (user_id, topic, difficulty, score, total, taken_at, day)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                (user_id, topic, difficulty, score, total,
+                 taken_at.strftime("%Y-%m-%d %H:%M:%S"), taken_at.strftime("%Y-%m-%d")))
+            conn.commit()
+            return cursor.lastrowid
+        finally:
+            conn.close()
+
+    def recent_attempts(self, user_id: str, limit: int = 5, offset: int = 0) -> List[Dict]:
+        """Return one page of a user's attempts, newest first."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                '''SELECT topic, difficulty, score, total, taken_at AS timestamp
+                   FROM quiz_attempts
+                   WHERE user_id = ?
+                   ORDER BY taken_at DESC, id DESC
+                   LIMIT ? OFFSET ?''',
+                (user_id, limit, offset)).fetchall()
+            return [dict(row) for row in rows]
+        finally:
+            conn.close()
+
+    def count_attempts(self, user_id: str) -> int:
+        conn = self._connect()
+        try:
+            return conn.execute('SELECT COUNT(*) FROM quiz_attempts WHERE user_id = ?',
+                                (user_id,)).fetchone()[0]
+        finally:
+            conn.close()
+
+    def score_trend(self, user_id: str, days: int = 30) -> List[Dict]:
+        """Aggregate attempts per day; the averaging happens inside SQLite."""
+        since = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                '''SELECT day,
+                          COUNT(*) AS attempts,
+                          ROUND(AVG(100.0 * score / total), 1) AS avg_percentage,
+                          MAX(100.0 * score / total) AS best_percentage
+                   FROM quiz_attempts
+                   WHERE user_id = ? AND day >= ? AND total > 0
+                   GROUP BY day
+                   ORDER BY day''',
+                (user_id, since)).fetchall()
+            return [dict(row) for row in rows]
+        finally:
+            conn.close()
@@ -0,0 +1,173 @@
+import random
+import re
+import time
+from typing import Dict, List
+
+import numpy as np
+
+
+FEATURES = ['subject_match', 'preference_overlap', 'link_health']
+DEFAULT_WEIGHTS = np.array([3.0, 1.5, 1.0], dtype=np.float32)
+
+# Learning preferences from the sidebar -> what a matching resource looks like
+PREFERENCE_RULES = {
+    'Quick Videos': {'type': 'videos', 'keywords': ['short', 'quick', 'minutes', 'shorts']},
+    'In-depth Articles': {'type': 'websites', 'keywords': ['guide', 'docs', 'documentation', 'tutorial', 'learn']},
+    'Interactive Content': {'type': None, 'keywords': ['interactive', 'practice', 'exercise', 'playground',
+                                                        'w3schools', 'kaggle', 'leetcode', 'hackerrank']},
+    'Beginner': {'type': None, 'keywords': ['beginner', 'beginners', 'intro', 'introduction', 'basics',
+                                             'fundamentals', 'what', 'simplilearn', 'freecodecamp']},
+    'Advanced': {'type': None, 'keywords': ['advanced', 'deep', 'expert', 'masterclass', 'research']},
+}
+SLOW_LATENCY_MS = 2000
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def _tokens(text: str) -> set:
+    return set(_TOKEN_RE.findall(str(text).lower()))
+
+
+def flatten_catalog(categorized_content: Dict) -> List[Dict]:
+    """{subject: {type: [resource]}} -> flat rows tagged with subject and type."""
+    return [
+        dict(resource, subject=subject, type=content_type)
+        for subject, content in categorized_content.items()
+        for content_type, resources in content.items()
+        for resource in resources
+    ]
+
+
+class ResourceRanker:
+    """Scores resources with a vectorized feature matrix and returns the top-k.
+
+    Static columns (subject, type, preference keywords) are computed once
+    per catalog; a query only builds the per-user columns and does one mat-vec.
+    """
+
+    def __init__(self, resources: List[Dict], weights: np.ndarray = None):
+        self.resources = resources
+        self.weights = DEFAULT_WEIGHTS if weights is None else np.asarray(weights, dtype=np.float32)
+        self.preference_names = list(PREFERENCE_RULES)
+
+        self.subject_names = sorted({r['subject'] for r in resources})
+        subject_codes = {name: i for i, name in enumerate(self.subject_names)}
+        self.subject_tokens = [_tokens(name) for name in self.subject_names]
+        self.subjects = np.array([subject_codes[r['subject']] for r in resources], dtype=np.int32)
+
+        self.type_names = sorted({r['type'] for r in resources})
+        type_codes = {name: i for i, name in enumerate(self.type_names)}
+        self.types = np.array([type_codes[r['type']] for r in resources], dtype=np.int32)
+
+        self.preference_matrix = self._preference_matrix(resources)
+        self.health = np.ones(len(resources), dtype=np.float32)
+
+        self.rows_by_link = {}
+        for i, resource in enumerate(resources):
+            self.rows_by_link.setdefault(resource['link'], []).append(i)
+
+    @classmethod
+    def from_catalog(cls, categorized_content: Dict, weights: np.ndarray = None) -> 'ResourceRanker':
+        return cls(flatten_catalog(categorized_content), weights)
+
+    def _preference_matrix(self, resources: List[Dict]) -> np.ndarray:
+        matrix = np.zeros((len(resources), len(self.preference_names)), dtype=np.float32)
+        for i, resource in enumerate(resources):
+            words = _tokens(resource['name']) | _tokens(resource['link'])
+            for j, name in enumerate(self.preference_names):
+                rule = PREFERENCE_RULES[name]
+                if rule['type'] == resource['type'] or words.intersection(rule['keywords']):
+                    matrix[i, j] = 1.0
+        return matrix
+
+    def update_health(self, records: Dict[str, Dict]) -> None:
+        """Fold link-health records into the health column: dead=-inf, slow=0, ok/unknown=1."""
+        for link, record in records.items():
+            rows = self.rows_by_link.get(link)
+            if not rows or record is None:
+                continue
+            if not record['ok']:
+                value = -np.inf
+            elif (record['latency_ms'] or 0) > SLOW_LATENCY_MS:
+                value = 0.0
+            else:
+                value = 1.0
+            self.health[rows] = value
+
+    def _subject_similarity(self, subject: str) -> np.ndarray:
+        """Exact subject = 1, related subjects by token Jaccard, unrelated = 0."""
+        query = _tokens(subject)
+        similarity = np.zeros(len(self.subject_names), dtype=np.float32)
+        for i, (name, words) in enumerate(zip(self.subject_names, self.subject_tokens)):
+            if name == subject:
+                similarity[i] = 1.0
+            elif query and words:
+                similarity[i] = 0.5 * len(query & words) / len(query | words)
+        return similarity
+
+    def feature_matrix(self, subject: str, content_type: str, preferences: List[str]) -> np.ndarray:
+        n = len(self.resources)
+        features = np.empty((n, len(FEATURES)), dtype=np.float32)
+        features[:, 0] = self._subject_similarity(subject)[self.subjects]
+
+        wanted = np.array([name in preferences for name in self.preference_names], dtype=np.float32)
+        if wanted.any():
+            features[:, 1] = self.preference_matrix @ wanted / wanted.sum()
+        else:
+            features[:, 1] = 0.0
+
+        features[:, 2] = self.health
+        return features
+
+    def rank(self, subject: str, content_type: str, preferences: List[str] = None,
+             k: int = 10) -> List[Dict]:
+        """Top-k resources of the given type for the subject (or related subjects), best first."""
+        if not self.resources:
+            return []
+        features = self.feature_matrix(subject, content_type, preferences or [])
+        with np.errstate(invalid='ignore'):
+            scores = features @ self.weights
+
+        # Only the requested type from a related subject, and never dead links
+        type_code = self.type_names.index(content_type) if content_type in self.type_names else -1
+        eligible = (self.types == type_code) & (features[:, 0] > 0) & np.isfinite(scores)
+        scores = np.where(eligible, scores, -np.inf)
+
+        k = min(k, int(eligible.sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [self.resources[i] for i in top.tolist()]
+
+
+def benchmark_ranking(n: int = 50_000, subjects: int = 500, queries: int = 50, seed: int = 3) -> Dict:
+    """Average rank() latency over a synthetic catalog of n resources."""
+    rng = random.Random(seed)
+    words = ['data', 'science', 'python', 'web', 'machine', 'learning', 'cloud', 'design', 'network', 'security']
+    subject_names = [f"{rng.choice(words).title()} {rng.choice(words)} {i}" for i in range(subjects)]
+    resources = [
+        {
+            'subject': rng.choice(subject_names),
+            'type': rng.choice(['videos', 'websites']),
+            'name': f"{rng.choice(['Intro to', 'Advanced', 'Quick', 'Practice'])} {rng.choice(words)} {i}",
+            'link': f"https://example.org/{i}",
+        }
+        for i in range(n)
+    ]
+    build_start = time.perf_counter()
+    ranker = ResourceRanker(resources)
+    build_ms = (time.perf_counter() - build_start) * 1000
+
+    start = time.perf_counter()
+    for _ in range(queries):
+        ranker.rank(rng.choice(subject_names), 'videos', ['Beginner', 'Quick Videos'])
+    return {
+        'resources': n,
+        'build_ms': build_ms,
+        'rank_ms': (time.perf_counter() - start) * 1000 / queries,
+    }
+
+
+if __name__ == "__main__":
+    print(benchmark_ranking())
@@ -0,0 +1,260 @@
+import bisect
+import heapq
+import random
+import re
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+# URL noise that would otherwise match almost everything
+LINK_STOPWORDS = {'http', 'https', 'www', 'com', 'org', 'net', 'html', 'watch', 'v'}
+FIELD_BOOSTS = {'name': 2.0, 'subject': 1.0, 'link': 0.5}
+MATCH_WEIGHTS = {'exact': 3.0, 'prefix': 2.0, 'fuzzy': 1.0}
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(str(text).lower())
+
+
+def _trigrams(token: str) -> set:
+    padded = f"^{token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _within_distance(a: str, b: str, limit: int) -> bool:
+    """Levenshtein distance <= limit, bailing out as soon as a row exceeds it."""
+    if abs(len(a) - len(b)) > limit:
+        return False
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return False
+        previous = current
+    return previous[-1] <= limit
+
+
+def resource_key(resource: Dict) -> Tuple:
+    return (resource.get('subject'), resource.get('type'), resource['name'], resource['link'])
+
+
+class ResourceSearchIndex:
+    """In-memory inverted index over resource names, subjects and links.
+
+    Supports exact, prefix (type-ahead) and fuzzy term matching. `sync` applies only
+    the difference against the previous catalog, optionally mirroring it into an
+    SQLite FTS5 table.
+    """
+
+    def __init__(self, persist_path: str = None):
+        self.version = None
+        self._lock = threading.Lock()
+        self._docs = {}                      # doc id -> resource
+        self._ids_by_key = {}                # resource key -> doc id
+        self._doc_terms = {}                 # doc id -> {token: field weight}
+        self._postings = defaultdict(dict)   # token -> {doc id: field weight}
+        self._vocabulary = []                # sorted tokens, for prefix lookups
+        self._trigram_index = defaultdict(set)
+        self._next_id = 0
+        self._fts = _FTSMirror(persist_path) if persist_path else None
+
+    def __len__(self):
+        return len(self._docs)
+
+    def sync(self, resources: List[Dict], version=None) -> Tuple[int, int]:
+        """Make the index match `resources`; returns (added, removed)."""
+        incoming = {resource_key(r): r for r in resources}
+        with self._lock:
+            removed = [key for key in self._ids_by_key if key not in incoming]
+            added = [key for key in incoming if key not in self._ids_by_key]
+            for key in removed:
+                self._remove(key)
+            for key in added:
+                self._add(key, incoming[key])
+            self.version = version
+        if self._fts is not None and (added or removed):
+            self._fts.apply([incoming[key] for key in added], removed)
+        return len(added), len(removed)
+
+    def _add(self, key: Tuple, resource: Dict) -> None:
+        doc_id = self._next_id
+        self._next_id += 1
+        self._docs[doc_id] = resource
+        self._ids_by_key[key] = doc_id
+
+        terms = {}
+        for field, boost in FIELD_BOOSTS.items():
+            text = resource.get(field, '')
+            for token in tokenize(text):
+                if field == 'link' and token in LINK_STOPWORDS:
+                    continue
+                terms[token] = max(terms.get(token, 0.0), boost)
+        self._doc_terms[doc_id] = terms
+        for token, weight in terms.items():
+            postings = self._postings[token]
+            if not postings:
+                bisect.insort(self._vocabulary, token)
+                for gram in _trigrams(token):
+                    self._trigram_index[gram].add(token)
+            postings[doc_id] = weight
+
+    def _remove(self, key: Tuple) -> None:
+        doc_id = self._ids_by_key.pop(key)
+        del self._docs[doc_id]
+        for token in self._doc_terms.pop(doc_id):
+            postings = self._postings[token]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[token]
+                index = bisect.bisect_left(self._vocabulary, token)
+                if index < len(self._vocabulary) and self._vocabulary[index] == token:
+                    self._vocabulary.pop(index)
+                for gram in _trigrams(token):
+                    self._trigram_index[gram].discard(token)
+
+    def _expand(self, term: str, allow_prefix: bool) -> Dict[str, float]:
+        """Vocabulary tokens matching a query term, with the match-type weight."""
+        matches = {}
+        if term in self._postings:
+            matches[term] = MATCH_WEIGHTS['exact']
+        if allow_prefix:
+            start = bisect.bisect_left(self._vocabulary, term)
+            for token in self._vocabulary[start:start + 50]:
+                if not token.startswith(term):
+                    break
+                matches.setdefault(token, MATCH_WEIGHTS['prefix'])
+        if not matches and len(term) >= 3:
+            limit = 1 if len(term) <= 4 else 2
+            grams = _trigrams(term)
+            counts = defaultdict(int)
+            for gram in grams:
+                for token in self._trigram_index.get(gram, ()):
+                    counts[token] += 1
+            # Tokens within the edit limit must share a minimum number of trigrams
+            needed = max(1, len(grams) - 3 * limit)
+            for token, shared in counts.items():
+                if shared >= needed and _within_distance(term, token, limit):
+                    matches[token] = MATCH_WEIGHTS['fuzzy']
+        return matches
+
+    def search(self, query: str, limit: int = 20, content_type: str = None) -> List[Dict]:
+        """All query terms must match; the last one also matches as a prefix (type-ahead)."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+        with self._lock:
+            scores = None
+            for position, term in enumerate(terms):
+                term_scores = {}
+                for token, match_weight in self._expand(term, position == len(terms) - 1).items():
+                    postings = self._postings[token]
+                    if not term_scores:
+                        term_scores = {doc_id: match_weight * weight for doc_id, weight in postings.items()}
+                        continue
+                    for doc_id, weight in postings.items():
+                        score = match_weight * weight
+                        if score > term_scores.get(doc_id, 0.0):
+                            term_scores[doc_id] = score
+                if scores is None:
+                    scores = term_scores
+                else:
+                    if len(term_scores) < len(scores):
+                        scores, term_scores = term_scores, scores
+                    scores = {doc_id: score + term_scores[doc_id]
+                              for doc_id, score in scores.items() if doc_id in term_scores}
+                if not scores:
+                    return []
+            if content_type:
+                scores = {doc_id: score for doc_id, score in scores.items()
+                          if self._docs[doc_id].get('type') == content_type}
+            best = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+            return [self._docs[doc_id] for doc_id, _ in best]
+
+    def search_fts(self, query: str, limit: int = 20) -> List[Dict]:
+        """Prefix search straight from the FTS5 mirror (used when persistence is enabled)."""
+        if self._fts is None:
+            raise RuntimeError("FTS5 persistence is not enabled for this index")
+        return self._fts.search(query, limit)
+
+
+class _FTSMirror:
+    """Keeps an SQLite FTS5 copy of the indexed resources"""
+
+    def __init__(self, path: str):
+        self.path = path
+        conn = sqlite3.connect(path)
+        try:
+            conn.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS resources_fts USING fts5(
+                                name, subject, link, type UNINDEXED, tokenize = 'unicode61')''')
+            conn.commit()
+        finally:
+            conn.close()
+
+    def apply(self, added: List[Dict], removed_keys: List[Tuple]) -> None:
+        conn = sqlite3.connect(self.path)
+        try:
+            conn.executemany(
+                'DELETE FROM resources_fts WHERE subject = ? AND type = ? AND name = ? AND link = ?',
+                removed_keys)
+            conn.executemany(
+                'INSERT INTO resources_fts (name, subject, link, type) VALUES (?, ?, ?, ?)',
+                [(r['name'], r.get('subject'), r['link'], r.get('type')) for r in added])
+            conn.commit()
+        finally:
+            conn.close()
+
+    def search(self, query: str, limit: int) -> List[Dict]:
+        terms = tokenize(query)
+        if not terms:
+            return []
+        match = ' '.join(f'"{term}"*' for term in terms)
+        conn = sqlite3.connect(self.path)
+        conn.row_factory = sqlite3.Row
+        try:
+            rows = conn.execute(
+                '''SELECT name, subject, link, type FROM resources_fts
+                   WHERE resources_fts MATCH ? ORDER BY bm25(resources_fts, 2.0, 1.0, 0.5) LIMIT ?''',
+                (match, limit)).fetchall()
+            return [dict(row) for row in rows]
+        finally:
+            conn.close()
+
+
+def benchmark_search(n: int = 50_000, vocabulary: int = 5_000, queries: int = 200, seed: int = 11) -> Dict:
+    """Build time and average query latency on a synthetic catalog."""
+    rng = random.Random(seed)
+    common = ['python', 'java', 'flutter', 'data', 'science', 'structure', 'web', 'development',
+              'machine', 'learning', 'tutorial', 'course', 'academy', 'crash', 'bootcamp', 'guide']
+    # A long tail of channel/site names next to a handful of very common words
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    words = common + [''.join(rng.choice(letters) for _ in range(rng.randint(4, 10))) for _ in range(vocabulary)]
+    resources = [
+        {'subject': f"{rng.choice(common)} {rng.choice(common)}", 'type': rng.choice(['videos', 'websites']),
+         'name': f"{rng.choice(words)} {rng.choice(words)}", 'link': f"https://example.org/{rng.choice(words)}/{i}"}
+        for i in range(n)
+    ]
+    index = ResourceSearchIndex()
+    start = time.perf_counter()
+    index.sync(resources)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    typed = [rng.choice(words)[:rng.randint(2, 6)] for _ in range(queries)]
+    typos = [w[:2] + w[3:] for w in (rng.choice(words) for _ in range(queries))]
+    start = time.perf_counter()
+    for query in typed:
+        index.search(query)
+    prefix_ms = (time.perf_counter() - start) * 1000 / queries
+    start = time.perf_counter()
+    for query in typos:
+        index.search(f"data {query}")
+    fuzzy_ms = (time.perf_counter() - start) * 1000 / queries
+    return {'resources': n, 'build_ms': build_ms, 'prefix_query_ms': prefix_ms, 'fuzzy_query_ms': fuzzy_ms}
+
+
+if __name__ == "__main__":
+    print(benchmark_search())
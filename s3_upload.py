@@ -0,0 +1,374 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import BinaryIO, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MiB = 1024 * 1024
+PART_SIZE = 16 * MiB
+MIN_PART_SIZE = 5 * MiB        # S3 minimum for every part but the last
+MAX_PARTS = 10_000
+MULTIPART_THRESHOLD = 16 * MiB
+# Errors that another attempt cannot fix
+NON_RETRYABLE_CODES = {'NoSuchBucket', 'NoSuchUpload', 'AccessDenied', 'InvalidAccessKeyId',
+                       'SignatureDoesNotMatch'}
+
+
+class UploadError(Exception):
+    """An upload failed after retries; a file upload can be resumed by calling upload_file again."""
+
+
+def _error_code(error: Exception) -> Optional[str]:
+    # botocore ClientError carries the S3 error code; anything else (timeouts, resets) has none
+    return getattr(error, 'response', {}).get('Error', {}).get('Code')
+
+
+def _sha256(data: bytes) -> bytes:
+    return hashlib.sha256(data).digest()
+
+
+def _b64(digest: bytes) -> str:
+    return base64.b64encode(digest).decode()
+
+
+def composite_checksum(part_digests: List[bytes]) -> str:
+    """S3's ChecksumSHA256 for a multipart object: sha256 of the part digests, then "-<parts>"."""
+    return f"{_b64(hashlib.sha256(b''.join(part_digests)).digest())}-{len(part_digests)}"
+
+
+def choose_part_size(size: int, part_size: int = PART_SIZE) -> int:
+    """The requested part size, grown when needed so the file fits in S3's 10,000 parts."""
+    return max(part_size, MIN_PART_SIZE, -(-size // MAX_PARTS))
+
+
+class MultipartUploader:
+    """Uploads files to S3 in parallel parts with per-part SHA-256 checksums.
+
+    Parts are read straight from the file by the worker that sends them, so memory is
+    bounded by `max_workers` parts whatever the file size. Failed parts are retried
+    with exponential backoff. For path uploads, finished parts are recorded in a state
+    file under `state_dir`; after a crash or an UploadError, calling upload_file again
+    only sends the parts S3 does not already have. Uploads that cannot be resumed
+    (file objects) are aborted when they fail, so their parts are not left billed.
+    """
+
+    def __init__(self, client, bucket: str, part_size: int = PART_SIZE, max_workers: int = 8,
+                 max_attempts: int = 5, state_dir: str = None):
+        self.client = client
+        self.bucket = bucket
+        self.part_size = part_size
+        self.max_workers = max_workers
+        self.max_attempts = max_attempts
+        self.state_dir = state_dir or os.path.join(tempfile.gettempdir(), 's3_upload_state')
+
+    def upload_file(self, path: str, key: str, metadata: Dict[str, str] = None,
+                    progress: Callable[[int, int], None] = None) -> Dict:
+        stat = os.stat(path)
+        with open(path, 'rb') as f:
+            fd = f.fileno()
+            read = lambda offset, length: os.pread(fd, length, offset)
+            state_path = self._state_path(path, key, stat)
+            return self._upload(read, stat.st_size, key, metadata, progress, state_path)
+
+    def upload_fileobj(self, fileobj: BinaryIO, size: int, key: str, metadata: Dict[str, str] = None,
+                       progress: Callable[[int, int], None] = None) -> Dict:
+        """Upload a seekable file object (e.g. a Streamlit upload); retried but not resumable."""
+        lock = threading.Lock()
+
+        def read(offset, length):
+            with lock:
+                fileobj.seek(offset)
+                return fileobj.read(length)
+        return self._upload(read, size, key, metadata, progress, None)
+
+    def _state_path(self, path: str, key: str, stat) -> str:
+        # A changed file (size or mtime) gets a new state file and so a fresh upload
+        identity = json.dumps([self.bucket, key, os.path.abspath(path), stat.st_size, stat.st_mtime_ns])
+        return os.path.join(self.state_dir, hashlib.sha256(identity.encode()).hexdigest() + '.json')
+
+    def _upload(self, read, size: int, key: str, metadata, progress, state_path) -> Dict:
+        start = time.perf_counter()
+        extra = {'Metadata': metadata} if metadata else {}
+        if size < MULTIPART_THRESHOLD:
+            data = read(0, size)
+            digest = _sha256(data)
+            self._with_retries(lambda: self.client.put_object(
+                Bucket=self.bucket, Key=key, Body=data, ChecksumAlgorithm='SHA256',
+                ChecksumSHA256=_b64(digest), **extra), f"{key} (single part)")
+            if progress:
+                progress(size, size)
+            return self._result(key, size, start, parts=1, resumed=0, checksum=_b64(digest))
+
+        part_size = choose_part_size(size, self.part_size)
+        part_count = -(-size // part_size)
+        state = self._load_state(state_path, key, part_size)
+        if state is None:
+            response = self._with_retries(lambda: self.client.create_multipart_upload(
+                Bucket=self.bucket, Key=key, ChecksumAlgorithm='SHA256', **extra), f"{key} (create)")
+            state = {'upload_id': response['UploadId'], 'part_size': part_size, 'parts': {}}
+            self._save_state(state_path, state)
+        upload_id = state['upload_id']
+        done = state['parts']   # str(part number) -> {'ETag', 'ChecksumSHA256'}
+        resumed = len(done)
+        uploaded = sum(min(part_size, size - (int(n) - 1) * part_size) for n in done)
+        if progress:
+            progress(uploaded, size)
+
+        def send(number: int) -> Dict:
+            offset = (number - 1) * part_size
+            data = read(offset, min(part_size, size - offset))
+            checksum = _b64(_sha256(data))
+            response = self._with_retries(lambda: self.client.upload_part(
+                Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=number, Body=data,
+                ChecksumAlgorithm='SHA256', ChecksumSHA256=checksum), f"{key} part {number}")
+            return {'ETag': response['ETag'], 'ChecksumSHA256': checksum, 'size': len(data)}
+
+        todo = iter([n for n in range(1, part_count + 1) if str(n) not in done])
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='s3-part') as pool:
+                # Keep the pool busy without queuing (and reading) more parts than it can send
+                running = {}
+                for number in todo:
+                    running[pool.submit(send, number)] = number
+                    if len(running) >= self.max_workers:
+                        break
+                while running:
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        number = running.pop(future)
+                        part = future.result()
+                        done[str(number)] = {'ETag': part['ETag'], 'ChecksumSHA256': part['ChecksumSHA256']}
+                        uploaded += part['size']
+                        next_number = next(todo, None)
+                        if next_number is not None:
+                            running[pool.submit(send, next_number)] = next_number
+                    # Progress and state are handled on the calling thread only
+                    self._save_state(state_path, state)
+                    if progress:
+                        progress(uploaded, size)
+
+            parts = [{'PartNumber': n, 'ETag': done[str(n)]['ETag'], 'ChecksumSHA256': done[str(n)]['ChecksumSHA256']}
+                     for n in range(1, part_count + 1)]
+            response = self._with_retries(lambda: self.client.complete_multipart_upload(
+                Bucket=self.bucket, Key=key, UploadId=upload_id, MultipartUpload={'Parts': parts}),
+                f"{key} (complete)")
+        except BaseException:
+            # The pool has finished every in-flight part by now, so an abort is final
+            if state_path is None:
+                self._abort(key, upload_id)
+            else:
+                self._save_state(state_path, state)
+            raise
+        expected = composite_checksum([base64.b64decode(part['ChecksumSHA256']) for part in parts])
+        if response.get('ChecksumSHA256') not in (None, expected):
+            raise UploadError(f"Checksum mismatch for {key}: S3 has {response['ChecksumSHA256']}, "
+                              f"expected {expected}")
+        self._clear_state(state_path)
+        return self._result(key, size, start, parts=part_count, resumed=resumed, checksum=expected)
+
+    def _with_retries(self, call: Callable, what: str):
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                return call()
+            except Exception as e:
+                code = _error_code(e)
+                if code in NON_RETRYABLE_CODES or attempt == self.max_attempts:
+                    raise UploadError(f"Uploading {what} failed after {attempt} attempts: {e}") from e
+                delay = min(20.0, 0.5 * 2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+                logger.info("Retrying %s in %.1fs (%s)", what, delay, e)
+                time.sleep(delay)
+
+    def _abort(self, key: str, upload_id: str) -> None:
+        try:
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+        except Exception as e:
+            # A lifecycle rule for incomplete uploads is the backstop
+            logger.warning("Could not abort upload of %s (%s): %s", key, upload_id, e)
+
+    def _load_state(self, state_path: Optional[str], key: str, part_size: int) -> Optional[Dict]:
+        """A previous attempt's state, reconciled with the parts S3 actually holds."""
+        if state_path is None or not os.path.exists(state_path):
+            return None
+        with open(state_path) as f:
+            state = json.load(f)
+        if state['part_size'] != part_size:
+            return None
+        try:
+            listed = {}
+            kwargs = {'Bucket': self.bucket, 'Key': key, 'UploadId': state['upload_id']}
+            while True:
+                page = self.client.list_parts(**kwargs)
+                for part in page.get('Parts', []):
+                    listed[str(part['PartNumber'])] = part['ETag']
+                if not page.get('IsTruncated'):
+                    break
+                kwargs['PartNumberMarker'] = page['NextPartNumberMarker']
+        except Exception as e:
+            # Typically NoSuchUpload: aborted or expired by a lifecycle rule; start over
+            logger.info("Cannot resume upload of %s: %s", key, e)
+            return None
+        state['parts'] = {n: part for n, part in state['parts'].items() if listed.get(n) == part['ETag']}
+        return state
+
+    def _save_state(self, state_path: Optional[str], state: Dict) -> None:
+        if state_path is None:
+            return
+        os.makedirs(os.path.dirname(state_path), exist_ok=True)
+        temp_path = state_path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(temp_path, state_path)
+
+    def _clear_state(self, state_path: Optional[str]) -> None:
+        if state_path is not None and os.path.exists(state_path):
+            os.remove(state_path)
+
+    @staticmethod
+    def _result(key: str, size: int, start: float, parts: int, resumed: int, checksum: str) -> Dict:
+        seconds = time.perf_counter() - start
+        return {'key': key, 'size': size, 'parts': parts, 'resumed_parts': resumed, 'seconds': seconds,
+                'mb_per_sec': size / MiB / seconds if seconds else 0.0, 'checksum_sha256': checksum}
+
+
+class LocalS3:
+    """In-process S3 stand-in for tests and benchmarks: checks part checksums and simulates a network.
+
+    Each request costs `latency` seconds plus its size over `bandwidth` bytes/s per
+    connection; `fail_after` makes every request after that many parts fail, to
+    exercise retries and resuming. Only part digests are kept, not the bytes;
+    `uploads` (open multipart uploads) and `objects` can be inspected by tests.
+    """
+
+    def __init__(self, latency: float = 0.02, bandwidth: float = 100 * MiB, fail_after: int = None):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.fail_after = fail_after
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.uploads = {}
+        self.objects = {}
+        self._parts_sent = 0
+
+    def _transfer(self, size: int = 0) -> None:
+        with self._lock:
+            self.requests += 1
+        time.sleep(self.latency + size / self.bandwidth)
+
+    @staticmethod
+    def _check(body: bytes, checksum: str) -> bytes:
+        digest = _sha256(body)
+        if _b64(digest) != checksum:
+            raise _LocalS3Error('BadDigest', "The SHA256 you specified did not match the calculated checksum")
+        return digest
+
+    def put_object(self, Bucket, Key, Body, ChecksumSHA256, **kwargs):
+        self._transfer(len(Body))
+        self._check(Body, ChecksumSHA256)
+        self.objects[(Bucket, Key)] = ChecksumSHA256
+        return {'ETag': f'"{ChecksumSHA256}"', 'ChecksumSHA256': ChecksumSHA256}
+
+    def create_multipart_upload(self, Bucket, Key, **kwargs):
+        self._transfer()
+        upload_id = os.urandom(8).hex()
+        self.uploads[upload_id] = {}
+        return {'UploadId': upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body, ChecksumSHA256, **kwargs):
+        with self._lock:
+            if self.fail_after is not None and self._parts_sent >= self.fail_after:
+                raise ConnectionError("Simulated connection reset")
+            self._parts_sent += 1
+        if UploadId not in self.uploads:
+            raise _LocalS3Error('NoSuchUpload', "The specified upload does not exist")
+        self._transfer(len(Body))
+        digest = self._check(Body, ChecksumSHA256)
+        etag = f'"{digest[:16].hex()}"'
+        with self._lock:
+            self.uploads[UploadId][PartNumber] = (etag, digest)
+        return {'ETag': etag, 'ChecksumSHA256': ChecksumSHA256}
+
+    def list_parts(self, Bucket, Key, UploadId, **kwargs):
+        self._transfer()
+        if UploadId not in self.uploads:
+            raise _LocalS3Error('NoSuchUpload', "The specified upload does not exist")
+        parts = self.uploads[UploadId]
+        return {'Parts': [{'PartNumber': n, 'ETag': etag} for n, (etag, _) in sorted(parts.items())],
+                'IsTruncated': False}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self._transfer()
+        stored = self.uploads.pop(UploadId)
+        digests = []
+        for part in MultipartUpload['Parts']:
+            etag, digest = stored[part['PartNumber']]
+            if etag != part['ETag']:
+                raise _LocalS3Error('InvalidPart', f"Part {part['PartNumber']} ETag mismatch")
+            digests.append(digest)
+        checksum = composite_checksum(digests)
+        self.objects[(Bucket, Key)] = checksum
+        return {'ETag': f'"{checksum}"', 'ChecksumSHA256': checksum}
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self._transfer()
+        if self.uploads.pop(UploadId, None) is None:
+            raise _LocalS3Error('NoSuchUpload', "The specified upload does not exist")
+        return {}
+
+
+class _LocalS3Error(Exception):
+    def __init__(self, code: str, message: str):
+        super().__init__(f"{code}: {message}")
+        self.response = {'Error': {'Code': code, 'Message': message}}
+
+
+def benchmark_upload(sizes_mb=(10, 100, 1024), worker_counts=(1, 8), latency: float = 0.02,
+                     bandwidth_mb: float = 100) -> List[Dict]:
+    """Throughput against LocalS3 for each file size, single-stream vs parallel parts,
+    plus one interrupted-then-resumed upload of the largest file."""
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for size_mb in sizes_mb:
+            path = os.path.join(directory, f'{size_mb}mb.bin')
+            with open(path, 'wb') as f:
+                block = os.urandom(MiB)
+                for _ in range(size_mb):
+                    f.write(block)
+            for workers in worker_counts:
+                client = LocalS3(latency, bandwidth_mb * MiB)
+                uploader = MultipartUploader(client, 'bench', max_workers=workers,
+                                             state_dir=os.path.join(directory, 'state'))
+                result = uploader.upload_file(path, f'bench/{size_mb}mb.bin')
+                results.append({'size_mb': size_mb, 'workers': workers, 'parts': result['parts'],
+                                'seconds': result['seconds'], 'mb_per_sec': result['mb_per_sec'],
+                                'requests': client.requests})
+
+        # Fail halfway through, then resume with a healthy connection
+        size_mb = max(sizes_mb)
+        path = os.path.join(directory, f'{size_mb}mb.bin')
+        half = -(-size_mb * MiB // choose_part_size(size_mb * MiB)) // 2
+        client = LocalS3(latency, bandwidth_mb * MiB, fail_after=half)
+        uploader = MultipartUploader(client, 'bench', max_workers=max(worker_counts), max_attempts=2,
+                                     state_dir=os.path.join(directory, 'state'))
+        try:
+            uploader.upload_file(path, f'bench/resume-{size_mb}mb.bin')
+        except UploadError:
+            pass
+        client.fail_after = None
+        result = uploader.upload_file(path, f'bench/resume-{size_mb}mb.bin')
+        results.append({'size_mb': size_mb, 'workers': max(worker_counts), 'parts': result['parts'],
+                        'resumed_parts': result['resumed_parts'], 'seconds': result['seconds'],
+                        'mb_per_sec': result['mb_per_sec'], 'requests': client.requests})
+    return results
+
+
+if __name__ == "__main__":
+    for row in benchmark_upload():
+        print(row)
@@ -0,0 +1,133 @@
+import random
+import re
+import string
+from typing import Dict, List
+
+import numpy as np
+
+from code_sandbox import SandboxPool
+
+
+DEFAULT_SIZES = [128, 256, 512, 1024, 2048, 4096]
+
+# Candidate growth curves for the empirical fit, simplest first so ties go to the simpler model
+COMPLEXITY_MODELS = {
+    'O(1)': lambda n: np.ones_like(n),
+    'O(log n)': lambda n: np.log2(n),
+    'O(n)': lambda n: n,
+    'O(n log n)': lambda n: n * np.log2(n),
+    'O(n²)': lambda n: n ** 2,
+    'O(n³)': lambda n: n ** 3,
+}
+
+
+def infer_input_shape(test_cases: List[Dict]) -> Dict:
+    """Guess how a challenge input scales from the first test case."""
+    sample = test_cases[0]['input'] if test_cases else ''
+
+    if isinstance(sample, bool):
+        return {'kind': 'text', 'sample': str(sample)}
+    if isinstance(sample, int):
+        return {'kind': 'integer', 'as_string': False}
+    if isinstance(sample, list):
+        return {'kind': 'int_list', 'as_string': False, 'separator': ','}
+
+    sample = str(sample)
+    if re.fullmatch(r'\s*\d+\s*', sample):
+        return {'kind': 'integer', 'as_string': True}
+    match = re.fullmatch(r'\s*-?\d+(\s*([,; ])\s*-?\d+)+\s*', sample)
+    if match:
+        return {'kind': 'int_list', 'as_string': True, 'separator': match.group(2)}
+    if sample.isalpha():
+        alphabet = ''.join(sorted(set(sample))) or string.ascii_lowercase
+        if len(alphabet) < 3:
+            alphabet = string.ascii_uppercase if sample.isupper() else string.ascii_lowercase
+        return {'kind': 'letters', 'alphabet': alphabet}
+    return {'kind': 'text', 'sample': sample or 'a'}
+
+
+def generate_input(shape: Dict, n: int, rng: random.Random):
+    """Build one input of size n that looks like the challenge's test inputs."""
+    kind = shape['kind']
+    if kind == 'integer':
+        return str(n) if shape['as_string'] else n
+    if kind == 'int_list':
+        values = [rng.randint(1, 10 * n) for _ in range(n)]
+        if not shape['as_string']:
+            return values
+        return shape['separator'].join(map(str, values))
+    if kind == 'letters':
+        # Short runs keep run-length style challenges meaningful
+        chars = []
+        while len(chars) < n:
+            chars.extend(rng.choice(shape['alphabet']) * rng.randint(1, 4))
+        return ''.join(chars[:n])
+    sample = shape['sample']
+    return (sample * (n // len(sample) + 1))[:n]
+
+
+def fit_complexity(sizes: List[int], times_ms: List[float]) -> Dict:
+    """Fit t = a + b*f(n) for every candidate model and keep the best one.
+
+    Residuals are relative to each measurement so the small sizes count as much
+    as the large ones.
+    """
+    if len(sizes) < 3:
+        return {'model': 'unknown', 'residual': None}
+
+    n = np.asarray(sizes, dtype=float)
+    t = np.maximum(np.asarray(times_ms, dtype=float), 1e-6)
+    best = {'model': 'unknown', 'residual': float('inf')}
+    for name, model in COMPLEXITY_MODELS.items():
+        features = np.column_stack([np.ones_like(n), model(n)]) / t[:, None]
+        coeffs, _, _, _ = np.linalg.lstsq(features, np.ones_like(t), rcond=None)
+        if coeffs[1] < 0 and name != 'O(1)':
+            continue
+        residual = float(np.sqrt(np.mean((features @ coeffs - 1) ** 2)))
+        # Only switch to a heavier model when it fits noticeably better
+        if residual < best['residual'] * 0.9:
+            best = {'model': name, 'residual': residual}
+    return best
+
+
+def benchmark_solution(pool: SandboxPool, code: str, test_cases: List[Dict],
+                       sizes: List[int] = None, time_budget_ms: float = 1500,
+                       seed: int = 42) -> Dict:
+    """Time `solution` over growing inputs in the sandbox and fit a complexity curve.
+
+    Scaling stops at the first size that errors, times out or exceeds the budget,
+    so quadratic solutions don't spend the whole wall-clock limit.
+    """
+    sizes = sizes or DEFAULT_SIZES
+    shape = infer_input_shape(test_cases)
+    rng = random.Random(seed)
+
+    points = []
+    error = None
+    for n in sizes:
+        result = pool.run_call(code, generate_input(shape, n, rng), mode='benchmark',
+                               cpu_seconds=pool.cpu_seconds * 3, wall_seconds=pool.wall_seconds * 2)
+        if result['status'] != 'ok':
+            error = f"n={n}: {result['error']}"
+            break
+        points.append({'n': n, 'time_ms': result['elapsed_ms'], 'peak_kb': result['peak_kb']})
+        if result['elapsed_ms'] > time_budget_ms:
+            break
+
+    fit = fit_complexity([p['n'] for p in points], [p['time_ms'] for p in points])
+    return {
+        'input_kind': shape['kind'],
+        'points': points,
+        'complexity': fit['model'],
+        'fit_residual': fit['residual'],
+        'error': error,
+    }
+
+
+def compare_with_reference(pool: SandboxPool, code: str, reference_code: str,
+                           test_cases: List[Dict], sizes: List[int] = None) -> Dict:
+    """Benchmark the submission and, when available, the reference on the same inputs."""
+    report = {'solution': benchmark_solution(pool, code, test_cases, sizes)}
+    if reference_code:
+        report['reference'] = benchmark_solution(pool, reference_code, test_cases, sizes)
+    return report
@@ -0,0 +1,83 @@
+from code_policy import CodePolicy
+
+
+def violations(code):
+    return CodePolicy().analyze(code).violations
+
+
+def test_list_and_set_methods_are_allowed():
+    code = (
+        "def solution(x):\n"
+        "    a = [1, 2, 3]\n"
+        "    a.remove(2)\n"
+        "    s = {1, 2}\n"
+        "    s.remove(1)\n"
+        "    return a, s\n"
+    )
+    assert violations(code) == []
+
+
+def test_private_module_attribute_is_flagged():
+    report = violations("import random\ndef solution(x):\n    return random._os.environ\n")
+    assert any(v.rule == 'attribute' and '_os' in v.detail for v in report)
+
+
+def test_private_attribute_of_aliased_and_dotted_modules_is_flagged():
+    assert violations("import collections as c\nc._sys\n")
+    assert violations("import collections.abc\ncollections.abc._collections_abc\n")
+
+
+def test_private_module_attribute_used_before_import_is_flagged():
+    code = "def solution(x):\n    return re._compiler\nimport re\n"
+    assert any('_compiler' in v.detail for v in violations(code))
+
+
+def test_private_self_attributes_are_allowed():
+    code = (
+        "class Counter:\n"
+        "    def __init__(self):\n"
+        "        self._count = 0\n"
+        "def solution(x):\n"
+        "    return Counter()._count\n"
+    )
+    assert violations(code) == []
+
+
+def test_private_from_import_is_flagged():
+    assert violations("from string import _re\n")
+
+
+def test_attrgetter_and_methodcaller_are_flagged():
+    assert violations("import operator\noperator.attrgetter('real')(1)\n")
+    assert violations("from operator import methodcaller\n")
+
+
+def test_dunder_lookups_by_string_are_flagged():
+    escape = "f = attrgetter('__class__.__base__.__subclasses__')\n"
+    report = violations(escape)
+    assert any(v.rule == 'name' and 'dunder' in v.detail for v in report)
+    assert violations("x = {}['__globals__']\n")
+    assert any('dunder' in v.detail for v in violations("getattr(1, '__class__')\n"))
+
+
+def test_main_guard_and_docstrings_are_allowed():
+    code = (
+        'class Point:\n'
+        '    """Built by __init__ from two coordinates; see also __repr__."""\n'
+        '    def __init__(self, x, y):\n'
+        '        self.x, self.y = x, y\n'
+        'def solution(x):\n'
+        '    """Wraps Point.__init__."""\n'
+        '    return Point(x, x).x\n'
+        "if __name__ == '__main__':\n"
+        '    print(solution(1))\n'
+    )
+    assert violations(code) == []
+
+
+def test_private_attribute_of_from_imported_module_is_flagged():
+    assert violations("from collections import abc\nabc._collections_abc\n")
+
+
+def test_plain_strings_are_allowed():
+    assert violations("def solution(x):\n    return 'snake_case_name' + '_' * 2\n") == []
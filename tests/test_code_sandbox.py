@@ -0,0 +1,23 @@
+from code_sandbox import _execute_job
+
+
+def run(code, call_input=3):
+    return _execute_job({'code': code, 'input': call_input})
+
+
+def test_classes_can_subclass_object_and_use_hasattr_and_callable():
+    code = (
+        'class Counter(object):\n'
+        '    def __init__(self, n):\n'
+        '        self.n = n\n'
+        'def solution(n):\n'
+        '    c = Counter(n)\n'
+        '    return hasattr(c, "n") and callable(solution) and c.n\n'
+    )
+    result = run(code)
+    assert (result['status'], result['output']) == ('ok', '3')
+
+
+def test_getattr_and_open_stay_unavailable():
+    assert 'getattr' in run('def solution(n):\n    return getattr(n, "real")\n')['error']
+    assert 'open' in run('def solution(n):\n    return open("/etc/passwd").read()\n')['error']
@@ -0,0 +1,63 @@
+import pytest
+
+import gemini_registry
+from gemini_registry import GeminiRegistry
+
+
+class FakeResponse:
+    text = 'test'
+
+
+class FakeGenai:
+    """Process-wide configure() like the real module: models use whichever key was set last."""
+
+    def __init__(self):
+        self.api_key = None
+        self.calls = []
+
+    def configure(self, api_key, transport=None):
+        self.api_key = api_key
+
+    def GenerativeModel(self, name):
+        genai = self
+
+        class Model:
+            def generate_content(self, prompt):
+                genai.calls.append(genai.api_key)
+                return FakeResponse()
+        return Model()
+
+    def get_model(self, name):
+        return name
+
+
+@pytest.fixture
+def genai(monkeypatch):
+    fake = FakeGenai()
+    monkeypatch.setattr(gemini_registry, 'genai', fake)
+    return fake
+
+
+def test_cached_handle_sends_requests_under_its_own_key(genai):
+    registry = GeminiRegistry()
+    first, cached = registry.get('key-a')
+    assert not cached
+    registry.get('key-b')
+    genai.configure(api_key='key-from-another-page')
+
+    handle, cached = registry.get('key-a')
+    assert cached and handle is first
+    handle.model.generate_content('hello')
+    assert genai.calls[-1] == 'key-a'
+
+    handle, _ = registry.get('key-b')
+    handle.model.generate_content('hello')
+    assert genai.calls[-1] == 'key-b'
+
+
+def test_cache_hit_makes_no_request(genai):
+    registry = GeminiRegistry()
+    registry.get('key-a')
+    probes = len(genai.calls)
+    registry.get('key-a')
+    assert len(genai.calls) == probes
@@ -0,0 +1,129 @@
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from link_health import DEAD_AFTER_FAILURES, LinkHealthChecker, LinkHealthIndex, is_dead
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    status = {'/gone': 404, '/broken': 500, '/busy': 429}
+
+    def _reply(self, body: bool):
+        code = self.status.get(self.path, 200)
+        if self.path == '/slow' or code == 'slow':
+            time.sleep(1)
+            code = 200
+        if self.path == '/no-head' and self.command == 'HEAD':
+            code = 405
+        elif self.path == '/cached' and self.headers.get('If-None-Match') == '"v1"':
+            code = 304
+        self.send_response(code)
+        if self.path == '/cached':
+            self.send_header('ETag', '"v1"')
+        self.send_header('Content-Length', '2' if body and code == 200 else '0')
+        self.end_headers()
+        if body and code == 200:
+            self.wfile.write(b'ok')
+
+    def do_HEAD(self):
+        self._reply(body=False)
+
+    def do_GET(self):
+        self._reply(body=True)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+@pytest.fixture
+def checker(tmp_path):
+    return LinkHealthChecker(LinkHealthIndex(str(tmp_path / 'health.db')), concurrency=4,
+                             min_host_interval=0, timeout=0.3)
+
+
+def closed_port_url():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return f"http://127.0.0.1:{s.getsockname()[1]}/"
+
+
+def check_one(checker, link):
+    return checker.check([link])[0]
+
+
+def test_healthy_links(server, checker):
+    records = {r['link']: r for r in checker.check([server + '/ok', server + '/no-head'])}
+    assert all(r['ok'] and r['status'] == 200 and r['error'] is None for r in records.values())
+
+
+def test_not_modified_keeps_the_previous_status(server, checker):
+    first = check_one(checker, server + '/cached')
+    second = check_one(checker, server + '/cached')
+    assert first['etag'] == '"v1"'
+    assert second['status'] == 200 and second['ok']
+
+
+@pytest.mark.parametrize('path', ['/gone', '/broken'])
+def test_link_is_dead_only_after_repeated_http_errors(server, checker, path):
+    for attempt in range(1, DEAD_AFTER_FAILURES + 1):
+        record = check_one(checker, server + path)
+        assert record['failures'] == attempt
+        assert is_dead(record) == (attempt == DEAD_AFTER_FAILURES)
+
+
+def test_success_resets_failures(server, checker):
+    link = server + '/flaky'
+    StubHandler.status['/flaky'] = 503
+    try:
+        assert check_one(checker, link)['failures'] == 1
+    finally:
+        del StubHandler.status['/flaky']
+    record = check_one(checker, link)
+    assert record['failures'] == 0 and record['ok']
+
+
+@pytest.mark.parametrize('path', ['/slow', '/busy'])
+def test_timeouts_and_rate_limits_never_hide_a_link(server, checker, path):
+    for _ in range(DEAD_AFTER_FAILURES + 1):
+        record = check_one(checker, server + path)
+        assert not is_dead(record)
+        assert record['error']
+
+
+def test_refused_connection_is_not_dead(checker):
+    record = check_one(checker, closed_port_url())
+    assert record['error'] == 'ConnectionError'
+    assert not is_dead(record)
+
+
+def test_timeout_keeps_the_last_known_state(server, checker):
+    link = server + '/moved'
+    StubHandler.status['/moved'] = 404
+    try:
+        for _ in range(DEAD_AFTER_FAILURES):
+            check_one(checker, link)
+        StubHandler.status['/moved'] = 'slow'
+        record = check_one(checker, link)
+    finally:
+        del StubHandler.status['/moved']
+    assert record['error'] == 'ReadTimeout'
+    assert is_dead(record) and record['failures'] == DEAD_AFTER_FAILURES and record['status'] == 404
+
+
+def test_unsettled_links_are_rechecked_before_max_age(server, checker):
+    checker.retry_interval = 0
+    ok, gone = server + '/ok', server + '/gone'
+    checker.check([ok, gone])
+    time.sleep(0.01)
+    assert [r['link'] for r in checker.check_stale([ok, gone])] == [gone]
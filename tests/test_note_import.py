@@ -0,0 +1,46 @@
+import io
+import zipfile
+
+import pytest
+
+import note_import
+from note_db import NoteDatabase
+
+
+@pytest.fixture
+def db(tmp_path):
+    return NoteDatabase(str(tmp_path / 'notes.db'))
+
+
+def make_zip(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def test_corrupt_zip_is_reported_and_other_files_still_import(db):
+    notes, stats = note_import.import_notes(
+        [('broken.zip', b'PK\x03\x04 not really a zip'), ('note.md', b'# Kept\nbody')], db, workers=0)
+    assert [note.title for note in notes] == ['Kept']
+    assert stats['errors'] and stats['errors'][0].startswith('broken.zip: cannot read zip archive')
+
+
+def test_oversized_zip_member_is_skipped(db, monkeypatch):
+    monkeypatch.setattr(note_import, 'MAX_MEMBER_BYTES', 1024)
+    archive = make_zip({'small.md': '# Small\nok', 'big.md': '# Big\n' + 'x' * 10_000})
+    notes, stats = note_import.import_notes([('vault.zip', archive)], db, workers=0)
+    assert [note.title for note in notes] == ['Small']
+    assert stats['errors'] == ['vault.zip:big.md: unpacks to more than 1,024 bytes']
+
+
+def test_member_lying_about_its_size_is_not_read_past_the_limit(db, monkeypatch):
+    monkeypatch.setattr(note_import, 'MAX_MEMBER_BYTES', 1024)
+    archive = bytearray(make_zip({'bomb.md': 'x' * 1_000_000}))
+    # Claim 10 bytes in the central directory; the real stream inflates to 1 MB
+    central = archive.rindex(b'PK\x01\x02')
+    archive[central + 24:central + 28] = (10).to_bytes(4, 'little')
+    notes, stats = note_import.import_notes([('bomb.zip', bytes(archive))], db, workers=0)
+    assert notes == []
+    assert stats['errors'][0].startswith('bomb.zip')
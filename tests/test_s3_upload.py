@@ -0,0 +1,111 @@
+import io
+import os
+
+import pytest
+
+from s3_upload import MiB, LocalS3, MultipartUploader, UploadError, _b64, _sha256, composite_checksum
+
+
+def make_uploader(client, tmp_path, **kwargs):
+    kwargs.setdefault('max_workers', 4)
+    kwargs.setdefault('max_attempts', 1)
+    return MultipartUploader(client, 'bucket', part_size=5 * MiB, state_dir=str(tmp_path / 'state'), **kwargs)
+
+
+@pytest.fixture
+def data():
+    return os.urandom(23 * MiB)   # five parts, the last one short
+
+
+@pytest.fixture
+def source(tmp_path, data):
+    path = tmp_path / 'upload.bin'
+    path.write_bytes(data)
+    return str(path)
+
+
+def part_checksum(data, part_size=5 * MiB):
+    return composite_checksum([_sha256(data[i:i + part_size]) for i in range(0, len(data), part_size)])
+
+
+def test_small_file_is_a_single_put(tmp_path):
+    client = LocalS3(latency=0, bandwidth=float('inf'))
+    body = b'hello world'
+    result = make_uploader(client, tmp_path).upload_fileobj(io.BytesIO(body), len(body), 'small.txt')
+    assert result['parts'] == 1
+    assert client.objects[('bucket', 'small.txt')] == _b64(_sha256(body))
+
+
+def test_empty_file_uploads_and_reports_zero_of_zero(tmp_path):
+    client = LocalS3(latency=0, bandwidth=float('inf'))
+    progress = []
+    result = make_uploader(client, tmp_path).upload_fileobj(
+        io.BytesIO(b''), 0, 'empty.txt', progress=lambda done, total: progress.append((done, total)))
+    assert result['size'] == 0
+    assert progress == [(0, 0)]   # callers must not divide by total
+    assert client.objects[('bucket', 'empty.txt')] == _b64(_sha256(b''))
+
+
+def test_multipart_upload_matches_composite_checksum(tmp_path, source, data):
+    client = LocalS3(latency=0, bandwidth=float('inf'))
+    progress = []
+    result = make_uploader(client, tmp_path).upload_file(source, 'big.bin',
+                                                         progress=lambda done, total: progress.append(done))
+    assert result['parts'] == 5
+    assert result['checksum_sha256'] == part_checksum(data)
+    assert client.objects[('bucket', 'big.bin')] == result['checksum_sha256']
+    assert progress[-1] == len(data)
+    assert client.uploads == {}
+    assert os.listdir(tmp_path / 'state') == []
+
+
+def test_failed_file_upload_resumes_without_resending_parts(tmp_path, source, data):
+    client = LocalS3(latency=0, bandwidth=float('inf'), fail_after=2)
+    uploader = make_uploader(client, tmp_path, max_workers=1)
+    with pytest.raises(UploadError):
+        uploader.upload_file(source, 'big.bin')
+    assert len(client.uploads) == 1   # kept open for the resume
+
+    client.fail_after = None
+    result = uploader.upload_file(source, 'big.bin')
+    assert result['resumed_parts'] == 2
+    assert result['checksum_sha256'] == part_checksum(data)
+    assert client.uploads == {}
+
+
+def test_failed_fileobj_upload_is_aborted(tmp_path, data):
+    client = LocalS3(latency=0, bandwidth=float('inf'), fail_after=2)
+    with pytest.raises(UploadError):
+        make_uploader(client, tmp_path).upload_fileobj(io.BytesIO(data), len(data), 'big.bin')
+    assert client.uploads == {}
+    assert ('bucket', 'big.bin') not in client.objects
+
+
+def test_interrupted_fileobj_upload_is_aborted(tmp_path, data):
+    client = LocalS3(latency=0, bandwidth=float('inf'))
+
+    def stop(done, total):
+        if done:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        make_uploader(client, tmp_path).upload_fileobj(io.BytesIO(data), len(data), 'big.bin', progress=stop)
+    assert client.uploads == {}
+
+
+def test_transient_errors_are_retried(tmp_path, source, data, monkeypatch):
+    monkeypatch.setattr('s3_upload.time.sleep', lambda seconds: None)
+    client = LocalS3(latency=0, bandwidth=float('inf'))
+    upload_part = client.upload_part
+    failures = []
+
+    def flaky(**kwargs):
+        if kwargs['PartNumber'] == 3 and not failures:
+            failures.append(kwargs['PartNumber'])
+            raise ConnectionError("reset")
+        return upload_part(**kwargs)
+
+    client.upload_part = flaky
+    result = make_uploader(client, tmp_path, max_attempts=3).upload_file(source, 'big.bin')
+    assert failures == [3]
+    assert result['checksum_sha256'] == part_checksum(data)
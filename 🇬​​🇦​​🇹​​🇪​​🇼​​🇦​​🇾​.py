@@ -1,17 +1,23 @@
 import streamlit as st
-import boto3
 import re  # For password validation
 from botocore.exceptions import ClientError
 import hashlib
 from datetime import datetime
 import io
+import json
 import logging
+import os
+import threading
 import docx
 from PyPDF2 import PdfReader
 from typing import Dict
+from aws_clients import decode_jwt_claims, ensure_fresh_tokens, get_client
+from s3_upload import MultipartUploader, UploadError
 
-import streamlit as st
-import boto3
+try:
+    import fcntl  # POSIX only; other platforms rely on the in-process lock
+except ImportError:
+    fcntl = None
 
 # Load AWS configuration from Streamlit secrets
 AWS_REGION = st.secrets["AWS_REGION"]
@@ -23,13 +29,8 @@ S3_BUCKET = st.secrets["S3_BUCKET"]
 AWS_ACCESS_KEY = st.secrets["AWS_ACCESS_KEY"]
 AWS_SECRET_KEY = st.secrets["AWS_SECRET_KEY"]
 
-# Initialize Boto3 client for S3
-s3_client = boto3.client(
-    "s3",
-    region_name=AWS_REGION,
-    aws_access_key_id=AWS_ACCESS_KEY,
-    aws_secret_access_key=AWS_SECRET_KEY,
-)
+# Process-wide S3 client, created once and reused by every rerun and session
+s3_client = get_client("s3", AWS_REGION, AWS_ACCESS_KEY, AWS_SECRET_KEY)
 
 # # List S3 buckets (for testing)
 # buckets = s3_client.list_buckets()
@@ -37,21 +38,14 @@ s3_client = boto3.client(
 
 # Page Configuration
 st.set_page_config(page_title="ᴀᴅᴀᴘᴛɪᴠᴇ ʟᴇᴀʀɴɪɴɢ ɢᴇɴᴇʀᴀᴛᴏʀ ", page_icon="🌎",layout="wide")
-# Initialize the Cognito client
-client = boto3.client(
-    'cognito-idp',
-    region_name=AWS_REGION,
-    aws_access_key_id=AWS_ACCESS_KEY,
-    aws_secret_access_key=AWS_SECRET_KEY
-)
-
-# Initialize S3 client
-s3_client = boto3.client(
-    's3',
-    aws_access_key_id=AWS_ACCESS_KEY,
-    aws_secret_access_key=AWS_SECRET_KEY,
-    region_name=AWS_REGION
-)
+# Cognito client (cached the same way)
+client = get_client('cognito-idp', AWS_REGION, AWS_ACCESS_KEY, AWS_SECRET_KEY)
+
+DOCUMENTS_METADATA = os.path.join("documents", "metadata.json")
+# Serialises read-modify-write of the metadata file across sessions (and, with fcntl, processes)
+_metadata_lock = threading.Lock()
+# Parallel multipart uploads with per-part SHA-256 checksums, on the shared client's connection pool
+uploader = MultipartUploader(s3_client, S3_BUCKET)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -105,6 +99,12 @@ def verify_email(email, verification_code):
 if 'signed_in' not in st.session_state:
     st.session_state.signed_in = False
 
+# Renew tokens a few minutes before they expire instead of failing on the next AWS call
+if st.session_state.signed_in and not ensure_fresh_tokens(st.session_state, client, CLIENT_ID):
+    st.session_state.signed_in = False
+    st.session_state.pop('tokens', None)
+    st.warning("Your session has expired. Please sign in again.")
+
 
     
 
@@ -122,11 +122,16 @@ def sign_in(email, password):
         st.session_state['signed_in'] = True
         st.session_state['username'] = email
         
-        # Retrieve user role
-        user_info = client.get_user(AccessToken=st.session_state['tokens']['AccessToken'])
-        for attribute in user_info['UserAttributes']:
-            if attribute['Name'] == 'custom:role':
-                st.session_state['role'] = attribute['Value']
+        # Role and profile come from the ID token's claims; no extra round trip to Cognito
+        st.session_state['claims'] = decode_jwt_claims(st.session_state['tokens']['IdToken'])
+        role = st.session_state['claims'].get('custom:role')
+        if role is None:
+            # App clients without read access to custom attributes leave them out of the token
+            user_info = client.get_user(AccessToken=st.session_state['tokens']['AccessToken'])
+            role = next((attribute['Value'] for attribute in user_info['UserAttributes']
+                         if attribute['Name'] == 'custom:role'), None)
+        if role is not None:
+            st.session_state['role'] = role
         
         st.success("Sign in successful! Redirecting...")
 
@@ -172,11 +177,16 @@ class StreamlitUI:
 
     def main(self):
 
-        choice = st.sidebar.selectbox("Choose Option", ["Sign Up", "Sign In"])
+        options = ["Sign Up", "Sign In"]
+        if st.session_state.signed_in:
+            options.append("Upload Documents")
+        choice = st.sidebar.selectbox("Choose Option", options)
         if choice == "Sign Up":
             sign_up_page()
         elif choice == "Sign In":
                 sign_in_page()
+        elif choice == "Upload Documents":
+            upload_documents_page()
    
 # Main function to manage Streamlit app flow
 def sign_up_page():
@@ -224,6 +234,61 @@ def sign_in_page():
         else:
             st.warning("Please provide both email and password.")
 
+def record_document(record):
+    """Append an upload to documents/metadata.json (written to a temp file, then swapped in)"""
+    os.makedirs(os.path.dirname(DOCUMENTS_METADATA), exist_ok=True)
+    # Concurrent uploads would otherwise read the same list and drop each other's entries
+    with _metadata_lock, open(DOCUMENTS_METADATA + ".lock", "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        documents = []
+        if os.path.exists(DOCUMENTS_METADATA):
+            with open(DOCUMENTS_METADATA) as f:
+                documents = json.load(f)
+        documents.append(record)
+        with open(DOCUMENTS_METADATA + ".tmp", "w") as f:
+            json.dump(documents, f)
+        os.replace(DOCUMENTS_METADATA + ".tmp", DOCUMENTS_METADATA)
+
+def upload_documents_page():
+    st.subheader("Upload Documents")
+    uploaded_files = st.file_uploader("Course documents", type=["pdf", "docx", "pptx", "txt"], accept_multiple_files=True)
+    category = st.selectbox("Category", ["Lecture Notes", "Assignments", "Reference", "Other"])
+    tags = st.text_input("Tags (comma separated)")
+    description = st.text_area("Description")
+
+    if st.button("Upload") and uploaded_files:
+        email = st.session_state['username']
+        for uploaded_file in uploaded_files:
+            key = f"documents/{email}/{uploaded_file.name}"
+            bar = st.progress(0.0, text=uploaded_file.name)
+            try:
+                result = uploader.upload_fileobj(
+                    uploaded_file, uploaded_file.size, key, metadata={"uploaded-by": email},
+                    progress=lambda done, total, name=uploaded_file.name: bar.progress(
+                        done / total if total else 1.0, text=name))
+            except UploadError as e:
+                logger.error("Upload of %s failed: %s", key, e)
+                st.error(f"Could not upload {uploaded_file.name}: {e}")
+                continue
+            except Exception as e:
+                # One bad file must not stop the rest of the batch
+                logger.exception("Unexpected error uploading %s", key)
+                st.error(f"Could not upload {uploaded_file.name}: {e}")
+                continue
+            record_document({
+                "title": uploaded_file.name,
+                "category": category,
+                "tags": [tag.strip() for tag in tags.split(",") if tag.strip()],
+                "description": description,
+                "uploaded_by": email,
+                "upload_date": datetime.now().isoformat(),
+                "file_path": f"s3://{S3_BUCKET}/{key}",
+                "size": result['size'],
+                "checksum_sha256": result['checksum_sha256'],
+            })
+            st.success(f"Uploaded {uploaded_file.name} ({result['size'] / 1e6:.1f} MB at {result['mb_per_sec']:.1f} MB/s)")
+
 
 disable_sidebar_nav_css = """
 <style>